@@ -1,5 +1,10 @@
+from profiling import start_page_profile
+page_profile = start_page_profile("Home")
+
 import streamlit as st
 
+page_profile.imports_done()
+
 st.set_page_config(
     layout="wide",
     page_title="Accueil - Analyse F1",
@@ -20,4 +25,6 @@ Nous espérons que cet outil vous sera utile pour vos analyses !
 
 st.sidebar.success("Navigation Principale")
 st.sidebar.markdown("---")
-st.sidebar.info("Sélectionnez une page ci-dessus pour commencer.")
\ No newline at end of file
+st.sidebar.info("Sélectionnez une page ci-dessus pour commencer.")
+
+page_profile.finish()
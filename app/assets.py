@@ -0,0 +1,173 @@
+# assets.py
+# Cache local des images (logos, photos des pilotes, tracés et drapeaux des circuits).
+#
+# À lancer une fois depuis le dossier `app`, sur une machine ayant accès à Internet :
+#     python assets.py
+# Les images sont téléchargées, réduites en miniatures WebP dans `static/assets/`
+# et servies par Streamlit (enableStaticServing) : l'application n'a plus besoin
+# d'accéder aux hébergeurs externes, y compris dans un environnement isolé.
+import hashlib
+import io
+import json
+import os
+import streamlit as st
+import pandas as pd
+from utils import (
+    TEAM_AESTHETICS,
+    TEAM_LOGOS,
+    PLACEHOLDER_DRIVER_IMAGE,
+    PLACEHOLDER_CIRCUIT_IMAGE
+)
+
+ASSETS_DIR = os.path.join("static", "assets")
+ASSETS_MANIFEST_PATH = os.path.join(ASSETS_DIR, "manifest.json")
+# URL sous laquelle Streamlit sert le dossier `static` situé à côté de Home.py
+STATIC_URL_PREFIX = "app/static/assets"
+
+DRIVERS_DATA_PATH = os.path.join("data", "f1_drivers_all.csv")
+CIRCUITS_DATA_PATHS = [os.path.join("data", "f1_circuits_2024.csv")]
+
+# Taille maximale (largeur, hauteur) des miniatures selon le type d'image
+THUMBNAIL_SIZES = {
+    'logo': (300, 150),
+    'driver': (480, 480),
+    'circuit': (800, 450),
+    'flag': (120, 80),
+    'placeholder': (600, 400),
+}
+WEBP_QUALITY = 85
+DOWNLOAD_TIMEOUT = 20
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36'
+
+
+# --- Côté application : résolution URL externe -> fichier local ---
+
+@st.cache_resource(show_spinner=False)
+def _load_asset_manifest(manifest_mtime):
+    """Charge le manifeste (URL d'origine -> URL locale). Rechargé si le fichier change."""
+    if not manifest_mtime:
+        return {}
+    try:
+        with open(ASSETS_MANIFEST_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def get_asset_manifest():
+    mtime = os.path.getmtime(ASSETS_MANIFEST_PATH) if os.path.exists(ASSETS_MANIFEST_PATH) else 0
+    return _load_asset_manifest(mtime)
+
+
+def asset_url(url):
+    """URL locale de l'image si elle est en cache, sinon l'URL d'origine."""
+    if not url:
+        return url
+    return get_asset_manifest().get(url, url)
+
+
+def asset_urls(urls):
+    """Version vectorisée de asset_url pour une colonne (Series) d'URLs."""
+    manifest = get_asset_manifest()
+    if not manifest:
+        return urls
+    return urls.map(manifest).fillna(urls)
+
+
+# --- Côté pipeline : téléchargement et génération des miniatures ---
+
+def asset_filename(url, kind):
+    """Nom de fichier stable pour une URL : type + empreinte de l'URL."""
+    return f"{kind}_{hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]}.webp"
+
+
+def collect_asset_urls():
+    """Rassemble toutes les URLs d'images utilisées par l'application, avec leur type."""
+    urls = {}
+    for style in TEAM_AESTHETICS.values():
+        urls[style['logo']] = 'logo'
+    for logo in TEAM_LOGOS.values():
+        urls[logo] = 'logo'
+    urls[PLACEHOLDER_DRIVER_IMAGE] = 'placeholder'
+    urls[PLACEHOLDER_CIRCUIT_IMAGE] = 'placeholder'
+
+    if os.path.exists(DRIVERS_DATA_PATH):
+        drivers = pd.read_csv(DRIVERS_DATA_PATH, usecols=['main_image_url'])
+        for url in drivers['main_image_url'].dropna():
+            urls[url] = 'driver'
+    for path in CIRCUITS_DATA_PATHS:
+        if os.path.exists(path):
+            circuits = pd.read_csv(path, usecols=['image_url', 'country_flag_url'])
+            for url in circuits['image_url'].dropna():
+                urls[url] = 'circuit'
+            for url in circuits['country_flag_url'].dropna():
+                urls[url] = 'flag'
+
+    urls.pop('', None)
+    return urls
+
+
+def make_thumbnail(content, kind):
+    """Réduit une image (octets) à la taille maximale de son type et l'encode en WebP."""
+    from PIL import Image
+
+    with Image.open(io.BytesIO(content)) as image:
+        image = image.convert('RGBA') if image.mode in ('P', 'LA', 'RGBA') else image.convert('RGB')
+        image.thumbnail(THUMBNAIL_SIZES.get(kind, THUMBNAIL_SIZES['placeholder']))
+        output = io.BytesIO()
+        image.save(output, format='WEBP', quality=WEBP_QUALITY, method=6)
+        return output.getvalue()
+
+
+def build_assets(force=False):
+    """
+    Télécharge chaque image une seule fois (sauf `force=True`), écrit sa miniature WebP
+    dans ASSETS_DIR et met à jour le manifeste utilisé par asset_url().
+    Les images en échec gardent leur URL d'origine.
+    """
+    import requests
+
+    os.makedirs(ASSETS_DIR, exist_ok=True)
+    manifest = {}
+    if os.path.exists(ASSETS_MANIFEST_PATH) and not force:
+        with open(ASSETS_MANIFEST_PATH, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+    urls = collect_asset_urls()
+    print(f"{len(urls)} image(s) référencée(s) par l'application.")
+    session = requests.Session()
+    session.headers.update({'User-Agent': USER_AGENT})
+
+    downloaded, skipped, failed = 0, 0, 0
+    for url, kind in urls.items():
+        filename = asset_filename(url, kind)
+        path = os.path.join(ASSETS_DIR, filename)
+        if not force and os.path.exists(path):
+            manifest[url] = f"{STATIC_URL_PREFIX}/{filename}"
+            skipped += 1
+            continue
+        try:
+            response = session.get(url, timeout=DOWNLOAD_TIMEOUT)
+            response.raise_for_status()
+            with open(path, 'wb') as f:
+                f.write(make_thumbnail(response.content, kind))
+            manifest[url] = f"{STATIC_URL_PREFIX}/{filename}"
+            downloaded += 1
+        except Exception as e:
+            print(f"  - Échec pour {url} : {type(e).__name__} - {e}")
+            failed += 1
+
+    tmp_path = ASSETS_MANIFEST_PATH + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, ASSETS_MANIFEST_PATH)
+    print(f"✅ {downloaded} téléchargée(s), {skipped} déjà en cache, {failed} en échec. Manifeste : {ASSETS_MANIFEST_PATH}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Met en cache local les images utilisées par l'application.")
+    parser.add_argument("--force", action="store_true", help="Retélécharge toutes les images.")
+    args = parser.parse_args()
+    build_assets(force=args.force)
@@ -0,0 +1,50 @@
+# bench_prediction_service.py
+# Client local de charge pour prediction_service.py (à lancer dans un autre terminal) :
+#     python prediction_service.py --port 8000
+#     python bench_prediction_service.py --url http://127.0.0.1:8000 --year 2024 --requests 2000 --concurrency 64
+import argparse
+import asyncio
+import time
+
+import httpx
+import numpy as np
+
+
+async def run_benchmark(url, year, n_requests, concurrency):
+    async with httpx.AsyncClient(base_url=url, timeout=60) as client:
+        season = (await client.get(f"/predict/season/{year}")).json()  # préchauffe le cache des features
+        rounds = [race['round'] for race in season['races']]
+        if not rounds:
+            print(f"Aucune course disponible pour {year}.")
+            return
+
+        latencies = []
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one_request(i):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(f"/predict/{year}/{rounds[i % len(rounds)]}")
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one_request(i) for i in range(n_requests)))
+        elapsed = time.perf_counter() - start
+        health = (await client.get("/health")).json()
+
+    latencies_ms = np.array(latencies) * 1000
+    print(f"{n_requests} requêtes en {elapsed:.2f}s -> {n_requests / elapsed:.0f} prédictions/s (concurrence {concurrency})")
+    print(f"Latence p50 {np.percentile(latencies_ms, 50):.1f} ms, p95 {np.percentile(latencies_ms, 95):.1f} ms, "
+          f"p99 {np.percentile(latencies_ms, 99):.1f} ms")
+    print(f"Lots model.predict : {health['batches']} pour {health['batched_requests']} requêtes")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mesure le débit du service de prédiction.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--year", type=int, default=2024)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.url, args.year, args.requests, args.concurrency))
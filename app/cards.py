@@ -0,0 +1,100 @@
+# cards.py
+import html
+import streamlit as st
+
+# Styles des cartes de galerie (pilotes, circuits), proches du rendu de st.container(border=True)
+GALLERY_CARD_STYLES = """
+<style>
+    .gallery-card {
+        border: 1px solid rgba(250, 250, 250, 0.2);
+        border-radius: 8px;
+        padding: 0 15px 15px 15px;
+        margin-bottom: 15px;
+        overflow: hidden;
+    }
+    .gallery-card-bar {
+        height: 10px;
+        margin: 0 -15px 15px -15px;
+    }
+    .gallery-card img.gallery-card-image {
+        width: 100%;
+        border-radius: 5px;
+    }
+    .gallery-card-caption {
+        text-align: center;
+        font-size: 14px;
+        opacity: 0.6;
+        margin: 5px 0 10px 0;
+    }
+    .gallery-card-header {
+        display: flex;
+        align-items: center;
+        gap: 15px;
+        margin: 15px 0 10px 0;
+    }
+    .gallery-card-header img {
+        width: 60px;
+    }
+    .gallery-card-metrics {
+        display: flex;
+        gap: 10px;
+        margin: 10px 0;
+    }
+    .gallery-card-metrics > div {
+        flex: 1;
+    }
+    .gallery-card-metric-label {
+        display: block;
+        font-size: 14px;
+        opacity: 0.7;
+    }
+    .gallery-card-metric-value {
+        display: block;
+        font-size: 28px;
+    }
+    .gallery-card details {
+        border: 1px solid rgba(250, 250, 250, 0.2);
+        border-radius: 8px;
+        padding: 8px 12px;
+    }
+    .gallery-card details summary {
+        cursor: pointer;
+    }
+</style>
+"""
+
+
+def escape_column(values):
+    """Échappe une colonne (Series) pour l'insérer dans du HTML. Les NaN deviennent des chaînes vides."""
+    return values.fillna('').astype(str).map(html.escape)
+
+
+def metric_html(label, values):
+    """Bloc "métrique" (libellé + valeur) pour chaque ligne, à partir d'une colonne déjà échappée."""
+    return (
+        f'<div><span class="gallery-card-metric-label">{html.escape(label)}</span>'
+        + '<span class="gallery-card-metric-value">' + values + '</span></div>'
+    )
+
+
+def card_grid_html(cards, n_columns=2, column_offsets=None, gap="1rem"):
+    """
+    Assemble des cartes HTML déjà construites (Series ou liste de chaînes, dans l'ordre
+    d'affichage) en une grille de `n_columns` colonnes, la carte i allant dans la colonne
+    i % n_columns comme avec st.columns.
+    `column_offsets` permet de décaler verticalement une colonne : {1: 30} -> 30px.
+    """
+    cards = list(cards)
+    column_offsets = column_offsets or {}
+    columns_html = [
+        f'<div style="flex: 1; min-width: 0; margin-top: {column_offsets.get(i, 0)}px;">'
+        + ''.join(cards[i::n_columns])
+        + '</div>'
+        for i in range(n_columns)
+    ]
+    return f'<div style="display: flex; gap: {gap};">' + ''.join(columns_html) + '</div>'
+
+
+def render_card_grid(cards, n_columns=2, column_offsets=None, gap="1rem"):
+    """Affiche une grille de cartes en un seul appel st.markdown (un seul delta envoyé au navigateur)."""
+    st.markdown(card_grid_html(cards, n_columns, column_offsets, gap), unsafe_allow_html=True)
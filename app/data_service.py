@@ -0,0 +1,335 @@
+# data_service.py
+import io
+import os
+import streamlit as st
+import numpy as np
+import pandas as pd
+from utils import (
+    SESSION_FILES,
+    YEAR_COLUMN,
+    GP_NAME_COLUMN,
+    VIS_DRIVER_COL,
+    VIS_POSITION_COL,
+    POINTS_COL,
+    CONSTRUCTOR_COL,
+    HISTORICAL_DATA_PATH
+)
+from shared_data import load_shared_frame, shared_data_enabled
+
+# Les DataFrames mis en cache sont partagés par toutes les pages et toutes les sessions.
+# Avec le Copy-on-Write, les vues retournées ne copient rien tant qu'une page ne les
+# modifie pas, et une modification ne peut jamais remonter jusqu'à la copie en cache.
+pd.set_option("mode.copy_on_write", True)
+
+DRIVERS_DATA_PATH = os.path.join("data", "f1_drivers_all.csv")
+CIRCUITS_DATA_PATH_TEMPLATE = os.path.join("data", "f1_circuits_{year}.csv")
+
+# Colonnes converties une seule fois en numérique (la version brute reste affichable)
+NUMERIC_SESSION_COLUMNS = [VIS_POSITION_COL, POINTS_COL, 'grid']
+ML_NUMERIC_COLUMNS = ['grid', 'position', 'year', 'race_id', 'driver_number', 'circuitId']
+
+
+def _read_csv(file_path):
+    """Lit un CSV, ou retourne un DataFrame vide si le fichier est absent ou illisible."""
+    if not os.path.exists(file_path):
+        return pd.DataFrame()
+    try:
+        return pd.read_csv(file_path)
+    except Exception as e:
+        st.error(f"Erreur lors du chargement du fichier {file_path}: {e}")
+        return pd.DataFrame()
+
+
+def _load_frame(name, file_path, prepare):
+    """
+    CSV préparé par `prepare`. En mode partagé (F1_SHARED_DATA=1, voir shared_data.py), la
+    table préparée est mappée en mémoire depuis un fichier Arrow commun à tous les processus.
+    """
+    if shared_data_enabled():
+        return load_shared_frame(name, file_path, prepare)
+    return prepare(_read_csv(file_path))
+
+
+def prepare_session(df):
+    """Typage d'un fichier de session : l'année est une chaîne (clé des filtres)."""
+    if YEAR_COLUMN in df.columns:
+        df[YEAR_COLUMN] = df[YEAR_COLUMN].astype(str)
+    return df
+
+
+@st.cache_resource(show_spinner=False)
+def _load_session(session_name):
+    """
+    Charge, type et indexe un fichier de session une seule fois par processus.
+    Retourne un dict avec la table brute, ses colonnes numériques et l'index par année.
+    """
+    file_path = SESSION_FILES.get(session_name, "")
+    df = _load_frame(_dataset_name(file_path), file_path, prepare_session)
+
+    numeric = pd.DataFrame(index=df.index)
+    for col in NUMERIC_SESSION_COLUMNS:
+        if col in df.columns:
+            numeric[col] = pd.to_numeric(df[col], errors='coerce')
+    if POINTS_COL in numeric.columns:
+        numeric[POINTS_COL] = numeric[POINTS_COL].fillna(0)
+
+    year_rows = df.groupby(YEAR_COLUMN, sort=False).indices if YEAR_COLUMN in df.columns else {}
+    return {'frame': df, 'numeric': numeric, 'year_rows': year_rows}
+
+
+def get_session_data(session_name):
+    """Table complète d'une session (vue en lecture seule, sans copie)."""
+    return _load_session(session_name)['frame'].copy(deep=False)
+
+
+def get_session_numeric(session_name):
+    """Colonnes numériques (position, points, grid) alignées sur l'index de la session."""
+    return _load_session(session_name)['numeric'].copy(deep=False)
+
+
+def get_available_years(session_name):
+    """Années disponibles pour une session, de la plus récente à la plus ancienne."""
+    return sorted(_load_session(session_name)['year_rows'], reverse=True)
+
+
+def get_session_year(session_name, year):
+    """Lignes d'une session pour une année, via l'index précalculé (sans masque booléen)."""
+    session = _load_session(session_name)
+    rows = session['year_rows'].get(str(year))
+    if rows is None:
+        return session['frame'].iloc[0:0]
+    return session['frame'].iloc[rows]
+
+
+@st.cache_resource(show_spinner=False)
+def _load_session_index(session_name):
+    """
+    Index trié (année, course) d'une session, construit une seule fois :
+    l'ordre des lignes et, pour chaque filtre (année, Grand Prix), les positions dans cet ordre.
+    Un filtre devient une simple lecture de dictionnaire au lieu d'un masque booléen.
+    """
+    frame = _load_session(session_name)['frame']
+    sort_keys = [c for c in (YEAR_COLUMN, 'race_id') if c in frame.columns]
+    if sort_keys:
+        order = frame.sort_values(sort_keys, kind='mergesort').index.to_numpy()
+    else:
+        order = np.arange(len(frame))
+
+    years = frame[YEAR_COLUMN].to_numpy()[order] if YEAR_COLUMN in frame.columns else np.full(len(order), "")
+    gps = frame[GP_NAME_COLUMN].to_numpy()[order] if GP_NAME_COLUMN in frame.columns else np.full(len(order), "")
+    keys = pd.DataFrame({'year': years, 'gp': gps})
+
+    return {
+        'order': order,
+        'by_year': keys.groupby('year', sort=False).indices,
+        'by_gp': keys.groupby('gp', sort=False).indices,
+        'by_year_gp': keys.groupby(['year', 'gp'], sort=False).indices,
+        'gps_by_year': {year: sorted(group.dropna().unique()) for year, group in keys.groupby('year')['gp']},
+        'all_gps': sorted(keys['gp'].dropna().unique()),
+    }
+
+
+def get_filtered_rows(session_name, year=None, gp=None):
+    """
+    Positions (triées par année puis course) des lignes correspondant aux filtres.
+    `None` signifie "tous".
+    """
+    index = _load_session_index(session_name)
+    if year is None and gp is None:
+        positions = None
+    elif gp is None:
+        positions = index['by_year'].get(str(year))
+    elif year is None:
+        positions = index['by_gp'].get(gp)
+    else:
+        positions = index['by_year_gp'].get((str(year), gp))
+    if positions is None:
+        return index['order'] if (year is None and gp is None) else index['order'][:0]
+    return index['order'][positions]
+
+
+def get_available_gps(session_name, year=None):
+    """Grands Prix disponibles (tri alphabétique), pour une année ou pour toutes."""
+    index = _load_session_index(session_name)
+    if year is None:
+        return index['all_gps']
+    return index['gps_by_year'].get(str(year), [])
+
+
+def get_rows(session_name, rows, columns):
+    """Projection des colonnes puis sélection des lignes demandées (une page du tableau)."""
+    return _load_session(session_name)['frame'][columns].iloc[rows]
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def export_filtered_rows(session_name, year, gp, columns, file_format="csv"):
+    """
+    Encode les lignes filtrées (toutes les pages) en CSV ou Parquet.
+    Appelée uniquement quand l'utilisateur demande un export ; `columns` doit être un tuple.
+    """
+    df = get_rows(session_name, get_filtered_rows(session_name, year, gp), list(columns))
+    if file_format == "parquet":
+        buffer = io.BytesIO()
+        df.to_parquet(buffer, index=False)
+        return buffer.getvalue()
+    return df.to_csv(index=False).encode('utf-8')
+
+
+@st.cache_resource(show_spinner=False)
+def _load_race_aggregates():
+    """
+    Agrégats de championnat calculés une seule fois à partir des résultats de course :
+    points par course et cumulés (pilotes et écuries), classements annuels et
+    distributions de positions avec l'ordre des médianes.
+    Chaque agrégat est découpé par année pour que les graphiques n'aient plus qu'à lire une tranche.
+    """
+    session = _load_session("Course")
+    frame, numeric = session['frame'], session['numeric']
+    if frame.empty:
+        return {}
+
+    df = frame[[YEAR_COLUMN, GP_NAME_COLUMN, VIS_DRIVER_COL, CONSTRUCTOR_COL]].copy()
+    df[POINTS_COL] = numeric[POINTS_COL] if POINTS_COL in numeric.columns else 0.0
+    df[VIS_POSITION_COL] = numeric[VIS_POSITION_COL]
+
+    # Numéro de manche dans la saison (ordre chronologique des race_id, sinon ordre du fichier)
+    race_order = pd.to_numeric(frame['race_id'], errors='coerce') if 'race_id' in frame.columns else pd.Series(df.index, index=df.index)
+    df['round'] = race_order.fillna(-1).groupby(df[YEAR_COLUMN]).rank(method='dense').astype(int)
+    df = df.sort_values([YEAR_COLUMN, 'round'], kind='mergesort')
+
+    # --- Points par course et cumulés ---
+    driver_progression = df[[YEAR_COLUMN, 'round', GP_NAME_COLUMN, VIS_DRIVER_COL, POINTS_COL]].copy()
+    driver_progression['CumulativePoints'] = driver_progression.groupby([YEAR_COLUMN, VIS_DRIVER_COL])[POINTS_COL].cumsum()
+
+    constructor_progression = (
+        df.groupby([YEAR_COLUMN, 'round', GP_NAME_COLUMN, CONSTRUCTOR_COL], sort=True)[POINTS_COL].sum().reset_index()
+    )
+    constructor_progression['CumulativePoints'] = constructor_progression.groupby([YEAR_COLUMN, CONSTRUCTOR_COL])[POINTS_COL].cumsum()
+
+    # --- Classements annuels ---
+    def standings(by):
+        totals = df.groupby([YEAR_COLUMN, by])[POINTS_COL].sum().reset_index()
+        return totals.sort_values([YEAR_COLUMN, POINTS_COL], ascending=[True, False], kind='mergesort')
+
+    # --- Distributions de positions (positions valides uniquement) ---
+    positions = df.dropna(subset=[VIS_POSITION_COL])
+    positions = positions.assign(**{VIS_POSITION_COL: positions[VIS_POSITION_COL].astype(int)})
+
+    def median_order(by):
+        medians = positions.groupby([YEAR_COLUMN, by])[VIS_POSITION_COL].median().reset_index()
+        medians = medians.sort_values([YEAR_COLUMN, VIS_POSITION_COL], kind='mergesort')
+        return {year: list(group[by]) for year, group in medians.groupby(YEAR_COLUMN)}
+
+    def by_year(table):
+        return {year: group.reset_index(drop=True) for year, group in table.groupby(YEAR_COLUMN)}
+
+    return {
+        'driver_standings': by_year(standings(VIS_DRIVER_COL)),
+        'constructor_standings': by_year(standings(CONSTRUCTOR_COL)),
+        'driver_progression': by_year(driver_progression),
+        'constructor_progression': by_year(constructor_progression),
+        'driver_positions': by_year(positions[[YEAR_COLUMN, 'round', GP_NAME_COLUMN, VIS_DRIVER_COL, CONSTRUCTOR_COL, VIS_POSITION_COL]]),
+        'driver_position_order': median_order(VIS_DRIVER_COL),
+        'constructor_position_order': median_order(CONSTRUCTOR_COL),
+    }
+
+
+def get_race_aggregate(name, year):
+    """
+    Tranche annuelle d'un agrégat de course précalculé ('driver_standings',
+    'constructor_progression', 'driver_positions', 'driver_position_order', ...).
+    Retourne un DataFrame vide (ou une liste vide pour les ordres) si l'année est absente.
+    """
+    table = _load_race_aggregates().get(name, {}).get(str(year))
+    if table is None:
+        return [] if name.endswith('_order') else pd.DataFrame()
+    return table.copy(deep=False) if isinstance(table, pd.DataFrame) else table
+
+
+def prepare_ml_dataset(df):
+    """Typage du jeu de données du modèle (colonnes numériques) et ajout de 'round' si absent."""
+    for col in ML_NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    if 'round' not in df.columns and 'race_id' in df.columns:
+        df = df.dropna(subset=['year', 'race_id'])
+        df['race_id'] = df['race_id'].astype(int)
+        rounds_map = df[['year', 'race_id']].drop_duplicates().sort_values(by=['year', 'race_id'])
+        rounds_map['round'] = rounds_map.groupby('year').cumcount() + 1
+        df = pd.merge(df, rounds_map[['race_id', 'round']], on='race_id', how='left')
+        df['round'] = pd.to_numeric(df['round'], errors='coerce')
+    return df
+
+
+@st.cache_resource(show_spinner=False)
+def _load_ml_dataset():
+    """Charge le jeu de données complet du modèle, avec les colonnes numériques et 'round'."""
+    return _load_frame(_dataset_name(HISTORICAL_DATA_PATH), HISTORICAL_DATA_PATH, prepare_ml_dataset)
+
+
+def _dataset_name(file_path):
+    return os.path.splitext(os.path.basename(file_path))[0]
+
+
+def shared_datasets():
+    """Jeux de données du mode partagé : {nom: (CSV source, fonction de préparation)}."""
+    datasets = {_dataset_name(path): (path, prepare_session) for path in SESSION_FILES.values()}
+    datasets[_dataset_name(HISTORICAL_DATA_PATH)] = (HISTORICAL_DATA_PATH, prepare_ml_dataset)
+    return datasets
+
+
+def get_ml_dataset():
+    """Jeu de données historique typé pour la prédiction (vue en lecture seule)."""
+    return _load_ml_dataset().copy(deep=False)
+
+
+@st.cache_resource(show_spinner=False)
+def get_ml_feature_context():
+    """
+    FeatureContext partagé du jeu de données du modèle : les colonnes intermédiaires des
+    features (temps convertis, abandons...) sont calculées une fois pour toutes les sessions.
+    """
+    from f1features import FeatureContext
+    return FeatureContext(_load_ml_dataset())
+
+
+@st.cache_resource(show_spinner=False)
+def _load_drivers_data():
+    df = _read_csv(DRIVERS_DATA_PATH)
+    if not df.empty:
+        # Nettoyage simple : Remplacer les N/A par des chaînes vides ou des zéros
+        df = df.fillna({
+            'team': 'Écurie Inconnue', # Donner un nom par défaut
+            'country': 'N/A',
+            'podiums': 0,
+            'points': 0,
+            'main_image_url': ''
+        })
+    return df
+
+
+def get_drivers_data():
+    """Fiches des pilotes (vue en lecture seule)."""
+    return _load_drivers_data().copy(deep=False)
+
+
+@st.cache_resource(show_spinner=False)
+def _load_circuits_data(year):
+    df = _read_csv(CIRCUITS_DATA_PATH_TEMPLATE.format(year=year))
+    if not df.empty:
+        # Nettoyage des données pour un affichage propre
+        df = df.fillna({
+            'length_km': 0,
+            'laps': 0,
+            'lap_record_time': 'N/A',
+            'lap_record_driver': 'N/A',
+            'first_gp': 'N/A',
+            'image_url': '',
+            'country_flag_url': ''
+        })
+    return df
+
+
+def get_circuits_data(year):
+    """Fiches des circuits d'une saison (vue en lecture seule)."""
+    return _load_circuits_data(year).copy(deep=False)
@@ -0,0 +1,25 @@
+# f1features
+# Paquet unique de feature engineering, partagé par l'entraînement (train_model/), la page ML,
+# le service de prédiction et les prédictions en lot.
+#
+#   from f1features import FeatureContext, create_features, encode_features
+#   ctx = FeatureContext(historical_df)              # une fois par jeu de données
+#   features = create_features(ctx, race_weekend_data)
+#
+# Pour ajouter une feature : une fonction décorée par @feature(...) dans features.py, qui
+# déclare ses colonnes d'entrée, ses dépendances et ses colonnes de sortie. À la prédiction,
+# seuls les nœuds nécessaires aux colonnes du modèle sont calculés (pipeline_for_columns).
+from .registry import FEATURE_REGISTRY, FeatureSpec, feature
+from .cache import NodeCache
+from .store import SOURCE_TABLES, FeatureStore, source_table
+from .context import FeatureContext, convert_laptime_to_ms
+from . import features as _features  # enregistre les features de base
+from .pipeline import (
+    CATEGORICAL_FEATURES,
+    PASSTHROUGH_COLUMNS,
+    FeaturePipeline,
+    create_features,
+    default_pipeline,
+    encode_features,
+    pipeline_for_columns
+)
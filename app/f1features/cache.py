@@ -0,0 +1,95 @@
+# f1features/cache.py
+# Cache des sorties des nœuds de features, indexé par l'empreinte du nœud et le hash de ses
+# entrées. En mémoire par défaut ; avec un dossier, il est relu et réécrit sur disque pour
+# réutiliser les nœuds inchangés d'un entraînement à l'autre.
+import hashlib
+import os
+import pickle
+from pathlib import Path
+
+import numpy as np
+
+
+def hash_columns(df, columns):
+    """
+    Hash (hexadécimal) des colonnes `columns` de df présentes, indépendant de l'index.
+    Octets bruts pour les colonnes numériques, repr des valeurs pour les colonnes objet
+    (bien plus rapide que pd.util.hash_pandas_object sur les petits DataFrames d'une course).
+    """
+    present = [col for col in columns if col in df.columns]
+    digest = hashlib.sha1(repr(present).encode())
+    digest.update(str(len(df)).encode())
+    for col in present:
+        values = df[col].to_numpy()
+        if values.dtype == object:
+            digest.update(repr(values.tolist()).encode())
+        else:
+            digest.update(values.dtype.str.encode())
+            digest.update(np.ascontiguousarray(values).tobytes())
+    return digest.hexdigest()
+
+
+def node_key(spec, race_hash, dataset_hash, upstream_keys):
+    parts = [spec.fingerprint, race_hash, dataset_hash] + list(upstream_keys)
+    return hashlib.sha1("\0".join(parts).encode()).hexdigest()
+
+
+class NodeCache:
+    """
+    Sorties des nœuds ({colonne: ndarray}) par nœud puis par clé.
+    Sur disque : un fichier pickle par nœud dans `directory`, écrit par save(). Seules les
+    entrées utilisées pendant la session sont conservées, ce qui purge les versions périmées.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = Path(directory) if directory is not None else None
+        self._entries = {}
+        self._used = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _node_entries(self, node):
+        if node not in self._entries:
+            self._entries[node] = {}
+            path = self._path(node)
+            if path is not None and path.exists():
+                try:
+                    with open(path, 'rb') as f:
+                        self._entries[node] = pickle.load(f)
+                except (OSError, pickle.UnpicklingError, EOFError):
+                    # Fichier corrompu ou illisible : il sera réécrit
+                    self._entries[node] = {}
+        return self._entries[node]
+
+    def _path(self, node):
+        return self.directory / f"{node}.pkl" if self.directory is not None else None
+
+    def get(self, node, key):
+        outputs = self._node_entries(node).get(key)
+        if outputs is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._used.setdefault(node, set()).add(key)
+        # Copie : les tableaux en cache ne doivent pas être modifiés par l'appelant
+        return {col: values.copy() for col, values in outputs.items()}
+
+    def put(self, node, key, outputs):
+        self._node_entries(node)[key] = {col: values.copy() for col, values in outputs.items()}
+        self._used.setdefault(node, set()).add(key)
+
+    def save(self):
+        """Écrit sur disque (écriture atomique) les nœuds utilisés pendant la session."""
+        if self.directory is None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for node, keys in self._used.items():
+            entries = self._node_entries(node)
+            kept = {key: entries[key] for key in keys if key in entries}
+            tmp_path = self._path(node).with_suffix('.pkl.tmp')
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(kept, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(node))
+
+    def stats(self):
+        return f"{self.hits} réutilisé(s), {self.misses} calculé(s)"
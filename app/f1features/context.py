@@ -0,0 +1,141 @@
+# f1features/context.py
+import numpy as np
+import pandas as pd
+
+from .cache import NodeCache, hash_columns
+from .store import FeatureStore
+
+
+def convert_laptime_to_ms(lap_time):
+    """
+    Convertit un temps au tour du format 'MM:SS.ms' ou 'HH:MM:SS.ms' en millisecondes.
+    Retourne NaN si le format est invalide.
+    """
+    if pd.isna(lap_time) or not isinstance(lap_time, str):
+        return np.nan
+    try:
+        parts = lap_time.split(':')
+        if len(parts) == 2:
+            minutes = int(parts[0])
+            seconds_part = parts[1].split('.')
+            seconds = int(seconds_part[0])
+            ms = int(seconds_part[1]) if len(seconds_part) > 1 else 0
+            total_seconds = minutes * 60 + seconds
+        elif len(parts) == 3:
+            hours = int(parts[0])
+            minutes = int(parts[1])
+            seconds_part = parts[2].split('.')
+            seconds = int(seconds_part[0])
+            ms = int(seconds_part[1]) if len(seconds_part) > 1 else 0
+            total_seconds = hours * 3600 + minutes * 60 + seconds
+        else:
+            return np.nan
+
+        return total_seconds * 1000 + ms
+    except (ValueError, IndexError):
+        return np.nan
+
+
+class FeatureContext:
+    """
+    Jeu de données historique complet et cache des colonnes intermédiaires partagées par
+    toutes les courses (temps convertis en ms, positions numériques, abandons...).
+    Chaque colonne intermédiaire est calculée une seule fois pour tout le jeu de données,
+    au lieu d'une fois par course. Le DataFrame ne doit pas être modifié après création.
+    Avec `shared=False` (contexte jetable, une seule course), les temps du week-end sont
+    convertis directement plutôt que pour tout le jeu de données, et les sorties des nœuds
+    ne sont pas mises en cache.
+    `node_cache` : NodeCache des sorties des nœuds (en mémoire si non fourni).
+    `store` : FeatureStore des tables annexes (dossier data/ de l'application par défaut).
+    """
+
+    def __init__(self, full_df, shared=True, node_cache=None, store=None):
+        self.full_df = full_df
+        self.shared = shared
+        self.node_cache = node_cache if node_cache is not None else (NodeCache() if shared else None)
+        self.store = store if store is not None else FeatureStore()
+        self._columns = {}
+
+    def cached(self, key, compute):
+        """Retourne la valeur mise en cache sous `key`, en la calculant au premier appel."""
+        if key not in self._columns:
+            self._columns[key] = compute()
+        return self._columns[key]
+
+    def has_column(self, col):
+        return col in self.full_df.columns
+
+    def dataset_hash(self, columns):
+        """Hash des colonnes du jeu de données complet (pour les nœuds qui lisent l'historique)."""
+        return self.cached(('hash', tuple(columns)), lambda: hash_columns(self.full_df, columns))
+
+    def laptime_ms(self, col):
+        """Temps au tour en ms pour toute la colonne (conversion faite une fois par valeur distincte)."""
+        def compute():
+            values = self.full_df[col]
+            codes, uniques = pd.factorize(values)
+            converted = np.array([convert_laptime_to_ms(v) for v in uniques], dtype=float)
+            return np.where(codes >= 0, converted[np.maximum(codes, 0)], np.nan)
+        return self.cached(('laptime_ms', col), compute)
+
+    def numeric(self, col):
+        return self.cached(('numeric', col), lambda: pd.to_numeric(self.full_df[col], errors='coerce').to_numpy())
+
+    def is_dnf(self):
+        """Résultat sans temps au format 'H:MM:SS' (abandon, tour(s) de retard non compris...)."""
+        return self.cached('is_dnf', lambda: ~self.full_df['time_or_retired'].str.contains(':', na=False).to_numpy())
+
+    def year_bounds(self):
+        return self.cached('year_bounds', lambda: (self.full_df['year'].min(), self.full_df['year'].max()))
+
+    def history_mask(self, year, rnd):
+        """Lignes antérieures à la manche (year, rnd) : saisons précédentes ou manches précédentes."""
+        def compute():
+            years = self.full_df['year'].to_numpy()
+            rounds = self.full_df['round'].to_numpy()
+            return (years < year) | ((years == year) & (rounds < rnd))
+        return self.cached(('history', year, rnd), compute)
+
+    def rows_of(self, race_df):
+        """
+        Positions (dans full_df) des lignes du week-end, pour lire les colonnes en cache.
+        None si race_df n'est pas un sous-ensemble de full_df (index inconnu ou non unique).
+        """
+        if not self.full_df.index.is_unique:
+            return None
+        rows = self.full_df.index.get_indexer(race_df.index)
+        return rows if (rows >= 0).all() else None
+
+    def cached_rows(self, race_df, columns):
+        """
+        Positions des lignes du week-end dans full_df si leurs `columns` y sont identiques,
+        sinon None (contexte jetable, lignes extérieures au jeu de données ou modifiées).
+        """
+        rows = self.rows_of(race_df) if self.shared else None
+        if rows is None or not all(self.has_column(col) for col in columns):
+            return None
+        values = race_df[columns].reset_index(drop=True)
+        return rows if values.equals(self.full_df[columns].iloc[rows].reset_index(drop=True)) else None
+
+    def race_laptime_ms(self, race_df, col):
+        """Temps en ms des lignes du week-end, lus dans le cache quand c'est possible."""
+        rows = self.cached_rows(race_df, [col])
+        if rows is None:
+            return race_df[col].map(convert_laptime_to_ms).to_numpy(dtype=float)
+        return self.laptime_ms(col)[rows]
+
+    def source(self, name):
+        """Table `name` du feature store (None si son CSV source est absent)."""
+        return self.store.table(name)
+
+    def race_join(self, race_df, key, columns, compute):
+        """
+        Jointure en une passe : `compute(frame)` (dict {colonne: valeurs} aligné sur frame) est
+        appliqué une fois à tout le jeu de données, et le week-end y lit ses lignes ; `columns`
+        sont les colonnes lues par compute. Calcul direct sur race_df sinon.
+        """
+        rows = self.cached_rows(race_df, columns)
+        if rows is None:
+            return compute(race_df)
+        joined = self.cached(key, lambda: compute(self.full_df))
+        return {col: values[rows] for col, values in joined.items()}
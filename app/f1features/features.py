@@ -0,0 +1,292 @@
+# f1features/features.py
+# Nœuds de features enregistrés. L'ordre d'enregistrement est l'ordre des colonnes en sortie.
+import numpy as np
+import pandas as pd
+
+from .registry import feature
+from . import sources  # enregistre les tables du feature store
+
+QUALI_TIME_COLUMNS = ['q1_time', 'q2_time', 'q3_time']
+FP_TIME_COLUMNS = ['fp1_time', 'fp2_time', 'fp3_time']
+CIRCUIT_HISTORY_DEFAULT_POS = 20
+
+
+def _best_time_ms(race_df, ctx, columns):
+    """Meilleur temps (ms) parmi les colonnes de temps présentes (NaN si aucune colonne)."""
+    present = [col for col in columns if col in race_df.columns]
+    if not present:
+        return np.full(len(race_df), np.nan)
+    # fmin ignore les NaN (NaN seulement si aucun temps), comme DataFrame.min(axis=1)
+    return np.fmin.reduce(np.column_stack([ctx.race_laptime_ms(race_df, col) for col in present]), axis=1)
+
+
+def _asof_join(frame, states, by, columns):
+    """
+    Jointure "au point dans le temps" : `states` donne, pour chaque entité `by`, l'état des
+    `columns` après chaque course (race_id) ; chaque ligne de frame reçoit l'état de son entité
+    après la dernière course strictement antérieure à la sienne (les race_id sont chronologiques).
+    Retourne un dict {colonne: valeurs} aligné sur frame (NaN sans historique).
+    """
+    query = pd.DataFrame({
+        'race_id': pd.to_numeric(frame['race_id'], errors='coerce').to_numpy(),
+        by: frame[by].to_numpy(),
+        '_row': np.arange(len(frame)),
+    }).dropna(subset=['race_id', by])
+    query['race_id'] = query['race_id'].astype('int64')
+    # allow_exact_matches=False : la course elle-même n'est pas comptée
+    joined = pd.merge_asof(query.sort_values('race_id'), states.sort_values('race_id'),
+                           on='race_id', by=by, allow_exact_matches=False)
+    result = {}
+    for col in columns:
+        values = np.full(len(frame), np.nan)
+        values[joined['_row'].to_numpy()] = joined[col].to_numpy(dtype=float)
+        result[col] = values
+    return result
+
+
+def _prior_totals(frame, table, by, columns):
+    """Sommes des `columns` de `table` sur les courses antérieures de la même entité `by`."""
+    totals = table.groupby(['race_id', by], as_index=False, sort=True)[columns].sum()
+    totals[columns] = totals.groupby(by)[columns].cumsum()
+    return _asof_join(frame, totals, by, columns)
+
+
+def _prior_rolling_mean(frame, table, by, column, window):
+    """Moyenne de `column` sur les `window` dernières courses antérieures de l'entité `by`."""
+    states = table[['race_id', by, column]].dropna().sort_values('race_id')
+    states[column] = (states.groupby(by)[column]
+                      .rolling(window, min_periods=1).mean()
+                      .reset_index(level=0, drop=True))
+    return _asof_join(frame, states, by, [column])
+
+
+def _ratio(numerator, denominator):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator > 0, numerator / denominator, np.nan)
+
+
+def _history(race_df, ctx):
+    """Masque des lignes historiques (manches antérieures) pour la course."""
+    return ctx.history_mask(race_df['year'].iloc[0], race_df['round'].iloc[0])
+
+
+# --- Nœuds intermédiaires (non exportés) ---
+
+@feature("best_quali_time", inputs=QUALI_TIME_COLUMNS, outputs=['Best_Quali_LapTime_ms'], export=False)
+def best_quali_time(race_df, ctx, upstream):
+    return {'Best_Quali_LapTime_ms': _best_time_ms(race_df, ctx, QUALI_TIME_COLUMNS)}
+
+
+@feature("best_fp_time", inputs=FP_TIME_COLUMNS, outputs=['FP_Best_LapTime_ms'], export=False)
+def best_fp_time(race_df, ctx, upstream):
+    return {'FP_Best_LapTime_ms': _best_time_ms(race_df, ctx, FP_TIME_COLUMNS)}
+
+
+# --- Features du modèle ---
+
+@feature("driver_number", inputs=['driver_number'], outputs=['driver_number'])
+def driver_number(race_df, ctx, upstream):
+    # Numéro de pilote utilisé comme feature
+    if 'driver_number' not in race_df.columns:
+        return {'driver_number': np.full(len(race_df), np.nan)}
+    return {'driver_number': race_df['driver_number'].to_numpy()}
+
+
+@feature("qualifying_gap", inputs=[], depends=['best_quali_time'], outputs=['GapToPole_ms'])
+def qualifying_gap(race_df, ctx, upstream):
+    """Écart (ms) entre le meilleur temps de qualification du pilote et la pole."""
+    best = upstream['Best_Quali_LapTime_ms']
+    if np.isnan(best).all():
+        return {'GapToPole_ms': np.full(len(race_df), np.nan)}
+    return {'GapToPole_ms': best - np.nanmin(best)}
+
+
+@feature("practice_pace", inputs=[], depends=['best_fp_time'], outputs=['FP_Best_LapTime_s', 'FP_Rank'])
+def practice_pace(race_df, ctx, upstream):
+    """Meilleur tour des essais libres (s) et rang correspondant dans le week-end."""
+    best = upstream['FP_Best_LapTime_ms']
+    return {
+        'FP_Best_LapTime_s': best / 1000.0,
+        'FP_Rank': pd.Series(best).rank(method='min').to_numpy(),
+    }
+
+
+@feature("championship_points", inputs=['year', 'round', 'driver_code', 'team', 'points'],
+         outputs=['Driver_Championship_Points', 'Constructor_Championship_Points'], uses_history=True)
+def championship_points(race_df, ctx, upstream):
+    """Points cumulés avant la course, par pilote et par écurie."""
+    history = ctx.full_df[_history(race_df, ctx)]
+    if history.empty:
+        nan = np.full(len(race_df), np.nan)
+        return {'Driver_Championship_Points': nan, 'Constructor_Championship_Points': nan}
+    driver_points = history.groupby('driver_code')['points'].sum()
+    constructor_points = history.groupby('team')['points'].sum()
+    return {
+        'Driver_Championship_Points': race_df['driver_code'].map(driver_points).fillna(0).to_numpy(),
+        'Constructor_Championship_Points': race_df['team'].map(constructor_points).fillna(0).to_numpy(),
+    }
+
+
+@feature("dnf_count", inputs=['year', 'round', 'driver_code', 'time_or_retired'],
+         outputs=['Driver_DNF_Count_Season'], uses_history=True)
+def dnf_count(race_df, ctx, upstream):
+    """Nombre de résultats sans temps (abandons) du pilote avant la course."""
+    history_mask = _history(race_df, ctx)
+    if not history_mask.any():
+        return {'Driver_DNF_Count_Season': np.full(len(race_df), np.nan)}
+    dnf_rows = ctx.full_df[history_mask & ctx.is_dnf()]
+    dnf_counts = dnf_rows.groupby('driver_code').size()
+    return {'Driver_DNF_Count_Season': race_df['driver_code'].map(dnf_counts).fillna(0).to_numpy()}
+
+
+@feature("circuit_history", inputs=['year', 'round', 'race_name', 'driver_code', 'position'],
+         outputs=['Driver_Circuit_History_AvgPos'],
+         fill_values={'Driver_Circuit_History_AvgPos': CIRCUIT_HISTORY_DEFAULT_POS}, uses_history=True)
+def circuit_history(race_df, ctx, upstream):
+    """Position moyenne du pilote lors des éditions précédentes du même Grand Prix."""
+    history_mask = _history(race_df, ctx)
+    if not history_mask.any():
+        return {'Driver_Circuit_History_AvgPos': np.full(len(race_df), np.nan)}
+    circuit_mask = history_mask & (ctx.full_df['race_name'].to_numpy() == race_df['race_name'].iloc[0])
+    if not circuit_mask.any():
+        # Aucune course passée sur ce circuit : 20 par défaut
+        return {'Driver_Circuit_History_AvgPos': np.full(len(race_df), float(CIRCUIT_HISTORY_DEFAULT_POS))}
+    positions = pd.Series(ctx.numeric('position')[circuit_mask], index=ctx.full_df.index[circuit_mask])
+    avg_pos_circuit = positions.groupby(ctx.full_df['driver_code'][circuit_mask]).mean()
+    return {'Driver_Circuit_History_AvgPos': race_df['driver_code'].map(avg_pos_circuit).to_numpy()}
+
+
+@feature("year_weight", inputs=['year'], outputs=['year_weight'], uses_history=True)
+def year_weight(race_df, ctx, upstream):
+    """Pondération exponentielle de l'année, normalisée sur l'étendue du jeu de données."""
+    min_year, max_year = ctx.year_bounds()
+    if max_year > min_year:
+        normalized_year = (race_df['year'].to_numpy() - min_year) / (max_year - min_year)
+    else:
+        normalized_year = np.ones(len(race_df))
+    return {'year_weight': np.exp(normalized_year)}
+
+
+PIT_STOP_INPUTS = ['race_id', 'driver_code', 'team', 'race_name']
+
+
+def _pit_stop_stats(frame, pit_table):
+    driver = _prior_totals(frame, pit_table, 'driver_code', ['pit_time_sum', 'pit_time_count', 'stops', 'races'])
+    team = _prior_totals(frame, pit_table, 'team', ['pit_time_sum', 'pit_time_count'])
+    circuit = _prior_totals(frame, pit_table, 'race_name', ['pit_time_sum', 'pit_time_count'])
+    return {
+        'Driver_Avg_Pit_Time_s': _ratio(driver['pit_time_sum'], driver['pit_time_count']),
+        'Team_Avg_Pit_Time_s': _ratio(team['pit_time_sum'], team['pit_time_count']),
+        'Driver_Avg_Pit_Stops': _ratio(driver['stops'], driver['races']),
+        'Circuit_Pit_Loss_s': _ratio(circuit['pit_time_sum'], circuit['pit_time_count']),
+    }
+
+
+@feature("pit_stops", inputs=PIT_STOP_INPUTS, sources=['pit_stops'],
+         outputs=['Driver_Avg_Pit_Time_s', 'Team_Avg_Pit_Time_s', 'Driver_Avg_Pit_Stops', 'Circuit_Pit_Loss_s'])
+def pit_stops(race_df, ctx, upstream):
+    """
+    Arrêts aux stands des courses précédentes : temps moyen d'arrêt du pilote et de l'écurie,
+    nombre moyen d'arrêts par course du pilote et temps moyen perdu aux stands sur ce circuit.
+    """
+    pit_table = ctx.source('pit_stops')
+    if pit_table is None or not all(col in race_df.columns for col in PIT_STOP_INPUTS):
+        nan = np.full(len(race_df), np.nan)
+        return {col: nan for col in ['Driver_Avg_Pit_Time_s', 'Team_Avg_Pit_Time_s',
+                                     'Driver_Avg_Pit_Stops', 'Circuit_Pit_Loss_s']}
+    # Statistiques calculées une fois pour tout le jeu de données, puis lues par course
+    key = ('pit_stops', ctx.store.stamp('pit_stops'))
+    return ctx.race_join(race_df, key, PIT_STOP_INPUTS, lambda frame: _pit_stop_stats(frame, pit_table))
+
+
+RACE_PACE_INPUTS = ['race_id', 'driver_code', 'team']
+RACE_PACE_WINDOW = 5
+
+
+def _race_pace_stats(frame, pace_table):
+    # Écart de l'écurie : meilleur de ses pilotes dans chaque course
+    team_pace = pace_table.groupby(['race_id', 'team'], as_index=False)['pace_deficit_pct'].min()
+    driver = _prior_rolling_mean(frame, pace_table, 'driver_code', 'pace_deficit_pct', RACE_PACE_WINDOW)
+    team = _prior_rolling_mean(frame, team_pace, 'team', 'pace_deficit_pct', RACE_PACE_WINDOW)
+    return {
+        'Driver_Pace_Deficit_pct': driver['pace_deficit_pct'],
+        'Team_Pace_Deficit_pct': team['pace_deficit_pct'],
+    }
+
+
+@feature("race_pace", inputs=RACE_PACE_INPUTS, sources=['race_pace'],
+         outputs=['Driver_Pace_Deficit_pct', 'Team_Pace_Deficit_pct'])
+def race_pace(race_df, ctx, upstream):
+    """
+    Rythme de course : écart moyen (%) du meilleur tour du pilote et de l'écurie au meilleur
+    tour de la course, sur les 5 dernières courses.
+    """
+    pace_table = ctx.source('race_pace')
+    if pace_table is None or not all(col in race_df.columns for col in RACE_PACE_INPUTS):
+        nan = np.full(len(race_df), np.nan)
+        return {'Driver_Pace_Deficit_pct': nan, 'Team_Pace_Deficit_pct': nan}
+    key = ('race_pace', ctx.store.stamp('race_pace'))
+    return ctx.race_join(race_df, key, RACE_PACE_INPUTS, lambda frame: _race_pace_stats(frame, pace_table))
+
+
+TEAMMATE_KEYS = ['race_id', 'team']
+
+
+def _teammate_gaps(frame, ctx):
+    # Même définition que GapToTeammate_ms de data_extraction.py : écart au meilleur de l'écurie
+    groups = [frame['race_id'].to_numpy(), frame['team'].to_numpy()]
+    result = {}
+    for col, time_columns in (('GapToTeammate_ms', QUALI_TIME_COLUMNS), ('FP_GapToTeammate_ms', FP_TIME_COLUMNS)):
+        best = pd.Series(_best_time_ms(frame, ctx, time_columns))
+        result[col] = (best - best.groupby(groups).transform('min')).to_numpy()
+    return result
+
+
+@feature("teammate_gaps", inputs=TEAMMATE_KEYS + QUALI_TIME_COLUMNS + FP_TIME_COLUMNS,
+         outputs=['GapToTeammate_ms', 'FP_GapToTeammate_ms'])
+def teammate_gaps(race_df, ctx, upstream):
+    """Écart (ms) au meilleur temps de l'écurie en qualification et en essais libres."""
+    if not all(col in race_df.columns for col in TEAMMATE_KEYS):
+        nan = np.full(len(race_df), np.nan)
+        return {'GapToTeammate_ms': nan, 'FP_GapToTeammate_ms': nan}
+    columns = [col for col in TEAMMATE_KEYS + QUALI_TIME_COLUMNS + FP_TIME_COLUMNS if col in race_df.columns]
+    return ctx.race_join(race_df, 'teammate_gaps', columns, lambda frame: _teammate_gaps(frame, ctx))
+
+
+def _head_to_head_states(ctx):
+    """
+    Duels en course contre les coéquipiers, cumulés par pilote après chaque course :
+    nombre de coéquipiers classés derrière lui (h2h_wins) et de duels (h2h_races, les deux
+    pilotes classés).
+    """
+    full_df = ctx.full_df
+    results = pd.DataFrame({
+        'race_id': pd.to_numeric(full_df['race_id'], errors='coerce').to_numpy(),
+        'team': full_df['team'].to_numpy(),
+        'driver_code': full_df['driver_code'].to_numpy(),
+        'position': ctx.numeric('position'),
+    }).dropna(subset=['race_id', 'team', 'driver_code'])
+    results['race_id'] = results['race_id'].astype('int64')
+    positions = results.groupby(TEAMMATE_KEYS)['position']
+    classified = positions.transform('count')
+    results['h2h_wins'] = (classified - positions.rank(method='min')).fillna(0)
+    results['h2h_races'] = (classified - 1).where(results['position'].notna(), 0)
+    states = results.groupby(['race_id', 'driver_code'], as_index=False, sort=True)[['h2h_wins', 'h2h_races']].sum()
+    states[['h2h_wins', 'h2h_races']] = states.groupby('driver_code')[['h2h_wins', 'h2h_races']].cumsum()
+    return states
+
+
+H2H_INPUTS = ['race_id', 'driver_code', 'team', 'position']
+
+
+@feature("teammate_head_to_head", inputs=H2H_INPUTS, outputs=['Teammate_H2H_Rate'],
+         fill_values={'Teammate_H2H_Rate': 0.5}, uses_history=True)
+def teammate_head_to_head(race_df, ctx, upstream):
+    """Part des duels gagnés contre les coéquipiers (arrivée devant) lors des courses précédentes."""
+    if not all(ctx.has_column(col) for col in H2H_INPUTS) or not all(
+            col in race_df.columns for col in ['race_id', 'driver_code']):
+        return {'Teammate_H2H_Rate': np.full(len(race_df), np.nan)}
+    states = ctx.cached('head_to_head_states', lambda: _head_to_head_states(ctx))
+    prior = ctx.race_join(race_df, 'teammate_head_to_head', ['race_id', 'driver_code'],
+                          lambda frame: _asof_join(frame, states, 'driver_code', ['h2h_wins', 'h2h_races']))
+    return {'Teammate_H2H_Rate': _ratio(prior['h2h_wins'], prior['h2h_races'])}
@@ -0,0 +1,116 @@
+# f1features/pipeline.py
+import pandas as pd
+
+from .cache import hash_columns, node_key
+from .context import FeatureContext
+from .registry import FEATURE_REGISTRY
+
+# Colonnes gardées telles quelles (les catégorielles sont encodées en one-hot ensuite)
+PASSTHROUGH_COLUMNS = ['grid', 'team', 'race_name']
+CATEGORICAL_FEATURES = ['team', 'race_name']
+
+
+class FeaturePipeline:
+    """
+    Pipeline compilé à partir du graphe des nœuds : liste ordonnée (topologique) des nœuds à
+    exécuter et des colonnes produites. Le même pipeline sert à l'entraînement, à la page ML,
+    au service et aux prédictions en lot, pour que l'entraînement et la prédiction ne puissent
+    pas diverger.
+    `feature_names` : nœuds demandés (tous les nœuds exportés par défaut) ;
+    `columns` : colonnes du modèle (feature_columns.json) — seuls les nœuds qui produisent une
+    de ces colonnes, et leurs dépendances, sont exécutés.
+    """
+
+    def __init__(self, feature_names=None, columns=None):
+        if feature_names is None:
+            feature_names = [name for name, spec in FEATURE_REGISTRY.items() if spec.export]
+        unknown = [name for name in feature_names if name not in FEATURE_REGISTRY]
+        if unknown:
+            raise KeyError(f"Feature(s) inconnue(s) : {', '.join(unknown)}")
+        if columns is not None:
+            columns = set(columns)
+            feature_names = [name for name in feature_names
+                             if columns.intersection(FEATURE_REGISTRY[name].outputs)]
+
+        # Fermeture transitive des dépendances, dans l'ordre du registre (ordre topologique)
+        required = set()
+        pending = list(feature_names)
+        while pending:
+            name = pending.pop()
+            if name not in required:
+                required.add(name)
+                pending.extend(FEATURE_REGISTRY[name].depends)
+        self.specs = [spec for name, spec in FEATURE_REGISTRY.items() if name in required]
+        self.output_columns = [col for spec in self.specs if spec.name in feature_names for col in spec.outputs]
+        self.fill_values = {col: fill for spec in self.specs for col, fill in spec.fill_values.items()}
+
+    def _run_node(self, spec, context, race_weekend_data, upstream, keys):
+        """Exécute un nœud, ou relit sa sortie dans le cache si ses entrées n'ont pas changé."""
+        cache = context.node_cache if context.shared else None
+        if cache is None:
+            return spec.func(race_weekend_data, context, upstream)
+        race_hash = hash_columns(race_weekend_data, spec.inputs)
+        dataset_hash = context.dataset_hash(spec.inputs) if spec.uses_history else ''
+        # Version des tables du feature store lues par le nœud
+        dataset_hash += ''.join(f"|{context.store.stamp(name)}" for name in spec.sources)
+        keys[spec.name] = key = node_key(spec, race_hash, dataset_hash, [keys[dep] for dep in spec.depends])
+        outputs = cache.get(spec.name, key)
+        if outputs is None:
+            outputs = spec.func(race_weekend_data, context, upstream)
+            cache.put(spec.name, key, outputs)
+        return outputs
+
+    def transform(self, context, race_weekend_data):
+        """
+        Crée le jeu de features brut (avant encodage) d'une course, à partir de l'historique
+        du contexte et des lignes du week-end.
+        """
+        if not isinstance(context, FeatureContext):
+            context = FeatureContext(context, shared=False)
+        columns, keys = {}, {}
+        for spec in self.specs:
+            upstream = {col: columns[col] for dep in spec.depends for col in FEATURE_REGISTRY[dep].outputs}
+            columns.update(self._run_node(spec, context, race_weekend_data, upstream, keys))
+
+        final_df = race_weekend_data[[col for col in PASSTHROUGH_COLUMNS if col in race_weekend_data.columns]].copy()
+        for col in self.output_columns:
+            values = pd.Series(columns[col], index=race_weekend_data.index)
+            # Remplir les NaN restants (20 pour l'historique circuit, 0 sinon)
+            final_df[col] = values.fillna(self.fill_values[col]) if values.isnull().any() else values
+        return final_df
+
+
+def encode_features(features_df, feature_columns=None):
+    """
+    One-hot encoding des colonnes catégorielles ; si `feature_columns` est donné (colonnes du
+    modèle), le résultat est aligné dessus (colonnes manquantes à 0).
+    """
+    encoded = pd.get_dummies(features_df, columns=CATEGORICAL_FEATURES, prefix=CATEGORICAL_FEATURES)
+    if feature_columns is None:
+        return encoded
+    return encoded.reindex(columns=feature_columns, fill_value=0)
+
+
+_compiled_pipelines = {}
+
+
+def default_pipeline():
+    """Pipeline de toutes les features enregistrées (compilé une fois par processus)."""
+    return pipeline_for_columns(None)
+
+
+def pipeline_for_columns(feature_columns):
+    """Pipeline limité aux nœuds nécessaires pour les colonnes d'un modèle (compilé une fois)."""
+    key = None if feature_columns is None else tuple(feature_columns)
+    if key not in _compiled_pipelines:
+        _compiled_pipelines[key] = FeaturePipeline(columns=key)
+    return _compiled_pipelines[key]
+
+
+def create_features(full_historical_df, race_weekend_data):
+    """
+    Crée le jeu de features pour une course en combinant données historiques et du week-end.
+    `full_historical_df` peut être un DataFrame ou un FeatureContext (à réutiliser d'une course à
+    l'autre pour profiter du cache des colonnes intermédiaires).
+    """
+    return default_pipeline().transform(full_historical_df, race_weekend_data)
@@ -0,0 +1,90 @@
+# f1features/registry.py
+# Registre des fonctions de features, vues comme les nœuds d'un graphe de dépendances :
+# chaque nœud déclare les colonnes brutes dont il a besoin (inputs), les nœuds dont il
+# réutilise les sorties (depends) et les colonnes qu'il produit (outputs).
+import hashlib
+import inspect
+from functools import lru_cache
+from pathlib import Path
+
+FEATURE_REGISTRY = {}
+# Modules des fonctions d'aide et constantes appelées par les nœuds et les tables du feature
+# store (jointures as-of, conversions de temps, fenêtres...) : leur code entre dans les empreintes
+FINGERPRINT_MODULES = ("features.py", "sources.py", "context.py")
+
+
+@lru_cache(maxsize=None)
+def modules_fingerprint(modules=FINGERPRINT_MODULES):
+    """Empreinte du code source des modules du paquet : toute modification invalide les caches."""
+    package_dir = Path(__file__).resolve().parent
+    sha = hashlib.sha1()
+    for module in modules:
+        sha.update(module.encode())
+        sha.update((package_dir / module).read_bytes())
+    return sha.hexdigest()
+
+
+class FeatureSpec:
+    """Description d'un nœud de features enregistré."""
+
+    def __init__(self, name, func, inputs, outputs, fill_values, depends=(), uses_history=False, export=True,
+                 sources=()):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.fill_values = dict(fill_values)
+        self.depends = tuple(depends)
+        self.uses_history = uses_history
+        self.export = export
+        self.sources = tuple(sources)
+        self.fingerprint = self._fingerprint()
+
+    def _fingerprint(self):
+        """
+        Empreinte du nœud (code de la fonction, déclaration, code des modules de features,
+        empreintes des dépendances) : modifier un nœud ou une fonction d'aide invalide son
+        cache et celui des nœuds qui en dépendent.
+        """
+        try:
+            source = inspect.getsource(self.func)
+        except (OSError, TypeError):
+            source = repr(self.func.__code__.co_code)
+        parts = [self.name, source, repr(self.inputs), repr(self.outputs), repr(self.uses_history),
+                 repr(self.sources), modules_fingerprint()]
+        parts += [FEATURE_REGISTRY[dep].fingerprint for dep in self.depends]
+        return hashlib.sha1("\0".join(parts).encode()).hexdigest()
+
+    def __repr__(self):
+        return (f"FeatureSpec({self.name!r}, inputs={list(self.inputs)}, depends={list(self.depends)}, "
+                f"outputs={list(self.outputs)})")
+
+
+def feature(name, inputs, outputs, depends=(), fill_values=None, uses_history=False, export=True, sources=()):
+    """
+    Décorateur d'enregistrement. La fonction reçoit (race_df, ctx, upstream) — les lignes du
+    week-end, le FeatureContext du jeu de données complet et un dict {colonne: valeurs} des
+    sorties des nœuds de `depends` — et retourne un dict {colonne: valeurs} aligné sur race_df
+    pour chaque colonne de `outputs`.
+    Les colonnes d'`inputs` peuvent manquer dans les données : la fonction doit alors
+    retourner des NaN, remplacés ensuite par `fill_values` (0 par défaut).
+    `uses_history` : le nœud lit aussi l'historique (ctx.full_df), pas seulement la course.
+    `export=False` : nœud intermédiaire, ses sorties ne sont pas des colonnes du modèle.
+    `sources` : tables du feature store lues par le nœud (voir store.py), dont la version
+    entre dans la clé de cache.
+    Les dépendances doivent être enregistrées avant : l'ordre du registre est donc un ordre
+    topologique du graphe.
+    """
+    def register(func):
+        if name in FEATURE_REGISTRY:
+            raise ValueError(f"Feature '{name}' déjà enregistrée.")
+        unknown = [dep for dep in depends if dep not in FEATURE_REGISTRY]
+        if unknown:
+            raise ValueError(f"Feature '{name}' : dépendance(s) non enregistrée(s) : {', '.join(unknown)}")
+        FEATURE_REGISTRY[name] = FeatureSpec(
+            name, func, inputs, outputs,
+            {col: (fill_values or {}).get(col, 0) for col in outputs},
+            depends, uses_history, export, sources
+        )
+        return func
+    return register
@@ -0,0 +1,71 @@
+# f1features/sources.py
+# Tables du feature store construites à partir des CSV annexes de data/.
+import numpy as np
+import pandas as pd
+
+from .store import source_table
+
+# Au-delà, l'arrêt n'est pas un arrêt normal (drapeau rouge : voiture immobilisée aux stands)
+PIT_TIME_MAX_S = 60.0
+# Au-delà, le meilleur tour n'est pas représentatif du rythme (abandon précoce, problème technique)
+PACE_DEFICIT_MAX_PCT = 7.0
+
+
+def duration_to_seconds(values):
+    """
+    Conversion vectorisée de durées 'SS.mmm', 'MM:SS.mmm' ou 'HH:MM:SS.mmm' en secondes.
+    NaN si la valeur est absente ou invalide.
+    """
+    text = pd.Series(values, copy=False).astype('string').str.strip()
+    numbers = (text.str.split(':', expand=True)
+               .apply(pd.to_numeric, errors='coerce')
+               .to_numpy(dtype=float, na_value=np.nan))
+    # La dernière partie est toujours les secondes ; plus de deux ':' est invalide
+    n_parts = (text.str.count(':') + 1).to_numpy(dtype=float, na_value=0)
+    seconds = np.full(len(text), np.nan)
+    for count, factors in ((1, [1]), (2, [60, 1]), (3, [3600, 60, 1])):
+        mask = n_parts == count
+        if mask.any():
+            seconds[mask] = numbers[mask, :count] @ np.array(factors, dtype=float)
+    return seconds
+
+
+@source_table("pit_stops", "pit_stop_all_years.csv",
+              usecols=['race_id', 'race_name', 'driver_code', 'team', 'stops', 'pit_time'])
+def build_pit_stops(pit_df):
+    """
+    Arrêts aux stands agrégés par course et par pilote : nombre d'arrêts, somme et nombre des
+    temps d'arrêt valides (temps passé dans la voie des stands, arrêts anormaux exclus).
+    """
+    pit_df = pit_df.dropna(subset=['race_id', 'driver_code']).copy()
+    pit_df['race_id'] = pit_df['race_id'].astype('int64')
+    pit_time = duration_to_seconds(pit_df['pit_time'])
+    valid = pit_time <= PIT_TIME_MAX_S  # False pour NaN
+    pit_df['pit_time_sum'] = np.where(valid, pit_time, 0.0)
+    pit_df['pit_time_count'] = valid.astype('int64')
+    pit_df['stops'] = pd.to_numeric(pit_df['stops'], errors='coerce')
+    table = pit_df.groupby(['race_id', 'driver_code', 'team', 'race_name'], as_index=False, sort=True).agg(
+        stops=('stops', 'max'),
+        pit_time_sum=('pit_time_sum', 'sum'),
+        pit_time_count=('pit_time_count', 'sum'),
+    )
+    table['races'] = 1
+    return table
+
+
+@source_table("race_pace", "fastest_lap_all_years.csv",
+              usecols=['race_id', 'race_name', 'driver_code', 'team', 'lap_time'])
+def build_race_pace(lap_df):
+    """
+    Meilleur tour en course de chaque pilote et écart (%) au meilleur tour de la course.
+    L'écart en pourcentage rend les courses comparables d'un circuit à l'autre ; les écarts
+    non représentatifs sont mis à NaN.
+    """
+    lap_df = lap_df.dropna(subset=['race_id', 'driver_code']).copy()
+    lap_df['race_id'] = lap_df['race_id'].astype('int64')
+    lap_df['lap_time_s'] = duration_to_seconds(lap_df['lap_time'])
+    table = lap_df.groupby(['race_id', 'driver_code', 'team', 'race_name'], as_index=False, sort=True)['lap_time_s'].min()
+    race_best = table.groupby('race_id')['lap_time_s'].transform('min')
+    deficit = (table['lap_time_s'] / race_best - 1.0) * 100.0
+    table['pace_deficit_pct'] = deficit.where(deficit <= PACE_DEFICIT_MAX_PCT)
+    return table
@@ -0,0 +1,119 @@
+# f1features/store.py
+# Feature store : tables agrégées construites en une passe à partir des CSV annexes
+# (arrêts aux stands, meilleurs tours...) et enregistrées en Parquet dans data/feature_store/.
+# Une table n'est reconstruite que si son CSV source ou son code (fonction de construction,
+# fonctions d'aide de sources.py...) change : ni l'entraînement ni la prédiction n'ont à
+# relire et reparser les CSV.
+import hashlib
+import inspect
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from .registry import modules_fingerprint
+
+DEFAULT_DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+STORE_DIRNAME = "feature_store"
+
+SOURCE_TABLES = {}
+
+
+class SourceTable:
+    """Table du feature store : fichier CSV source et fonction de construction."""
+
+    def __init__(self, name, filename, builder, usecols):
+        self.name = name
+        self.filename = filename
+        self.builder = builder
+        self.usecols = usecols
+        try:
+            source = inspect.getsource(builder)
+        except (OSError, TypeError):
+            source = repr(builder.__code__.co_code)
+        # Le code des modules de features couvre les fonctions d'aide appelées par la construction
+        self.fingerprint = hashlib.sha1(
+            f"{name}\0{filename}\0{usecols}\0{source}\0{modules_fingerprint()}".encode()
+        ).hexdigest()
+
+
+def source_table(name, filename, usecols=None):
+    """
+    Décorateur d'enregistrement d'une table du feature store. La fonction reçoit le CSV
+    source (colonnes `usecols`) et retourne le DataFrame agrégé à enregistrer.
+    """
+    def register(builder):
+        if name in SOURCE_TABLES:
+            raise ValueError(f"Table '{name}' déjà enregistrée.")
+        SOURCE_TABLES[name] = SourceTable(name, filename, builder, usecols)
+        return builder
+    return register
+
+
+class FeatureStore:
+    """Accès aux tables du feature store, avec cache mémoire et Parquet sur disque."""
+
+    def __init__(self, data_dir=None):
+        self.data_dir = Path(data_dir) if data_dir is not None else DEFAULT_DATA_DIR
+        self.store_dir = self.data_dir / STORE_DIRNAME
+        self._tables = {}
+
+    def stamp(self, name):
+        """
+        Version d'une table : mtime/taille du CSV source et empreinte de la construction.
+        None si le CSV source est absent.
+        """
+        spec = SOURCE_TABLES[name]
+        try:
+            stat = (self.data_dir / spec.filename).stat()
+        except OSError:
+            return None
+        return f"{stat.st_mtime_ns}-{stat.st_size}-{spec.fingerprint}"
+
+    def table(self, name):
+        """Table agrégée `name`, ou None si son CSV source est absent."""
+        stamp = self.stamp(name)
+        cached = self._tables.get(name)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        table = None
+        if stamp is not None:
+            table = self._read(name, stamp)
+            if table is None:
+                table = self._build(name, stamp)
+        self._tables[name] = (stamp, table)
+        return table
+
+    def _paths(self, name):
+        return self.store_dir / f"{name}.parquet", self.store_dir / f"{name}.json"
+
+    def _read(self, name, stamp):
+        table_path, meta_path = self._paths(name)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                if json.load(f).get('stamp') != stamp:
+                    return None
+            return pd.read_parquet(table_path)
+        except (OSError, ValueError):
+            return None
+
+    def _build(self, name, stamp):
+        spec = SOURCE_TABLES[name]
+        print(f"Feature store : construction de la table '{name}' depuis {spec.filename}...")
+        table = spec.builder(pd.read_csv(self.data_dir / spec.filename, usecols=spec.usecols))
+        table_path, meta_path = self._paths(name)
+        try:
+            self.store_dir.mkdir(parents=True, exist_ok=True)
+            # Écriture atomique : table puis métadonnées (le stamp valide la table)
+            tmp_path = table_path.with_suffix('.parquet.tmp')
+            table.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, table_path)
+            tmp_path = meta_path.with_suffix('.json.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'stamp': stamp, 'rows': len(table)}, f)
+            os.replace(tmp_path, meta_path)
+        except OSError as e:
+            # Dossier en lecture seule : la table reste utilisable en mémoire
+            print(f"Feature store : impossible d'enregistrer '{name}' ({e})")
+        return table
@@ -1,14 +1,25 @@
 # pages/1_Data_Overview.py
+from profiling import start_page_profile
+page_profile = start_page_profile("1_Data_Overview")
+
 import streamlit as st
 import pandas as pd
 # Import shared functions and constants from utils.py
 from utils import (
-    load_data,
-    convert_df_to_csv,
     SESSION_FILES,
     YEAR_COLUMN,
     GP_NAME_COLUMN
 )
+from data_service import (
+    get_session_data,
+    get_available_years,
+    get_available_gps,
+    get_filtered_rows,
+    get_rows,
+    export_filtered_rows
+)
+
+page_profile.imports_done()
 
 st.set_page_config(
     layout="wide",
@@ -29,38 +40,35 @@ selected_session_name_table = st.sidebar.selectbox(
 )
 
 file_to_load_table = SESSION_FILES.get(selected_session_name_table)
-df_current_session = load_data(file_to_load_table) if file_to_load_table else pd.DataFrame()
+df_current_session = get_session_data(selected_session_name_table) if file_to_load_table else pd.DataFrame()
+
+PAGE_SIZE_OPTIONS = [25, 50, 100, 250]
 
 if not df_current_session.empty:
-    df_current_session[YEAR_COLUMN] = df_current_session[YEAR_COLUMN].astype(str)
-    available_years_table = ["Toutes"] + sorted(df_current_session[YEAR_COLUMN].unique(), reverse=True)
+    available_years_table = ["Toutes"] + get_available_years(selected_session_name_table)
     selected_year_table = st.sidebar.selectbox(
         "Choisissez une année",
         available_years_table,
         key="table_year_select"
     )
-
-    df_filtered_by_year_table = df_current_session.copy()
-    if selected_year_table != "Toutes":
-        df_filtered_by_year_table = df_current_session[df_current_session[YEAR_COLUMN] == selected_year_table]
+    year_filter = None if selected_year_table == "Toutes" else selected_year_table
 
     # Grand Prix filter (dependent on year)
-    if not df_filtered_by_year_table.empty and GP_NAME_COLUMN in df_filtered_by_year_table.columns:
-        available_gp_table = ["Tous"] + sorted(df_filtered_by_year_table[GP_NAME_COLUMN].unique())
+    selected_gp_table = "Tous"
+    if GP_NAME_COLUMN in df_current_session.columns:
+        available_gp_table = ["Tous"] + get_available_gps(selected_session_name_table, year_filter)
         selected_gp_table = st.sidebar.selectbox(
             "Choisissez un Grand Prix",
             available_gp_table,
             key="table_gp_select"
         )
+    gp_filter = None if selected_gp_table == "Tous" else selected_gp_table
 
-        df_filtered_by_gp_table = df_filtered_by_year_table.copy()
-        if selected_gp_table != "Tous":
-            df_filtered_by_gp_table = df_filtered_by_year_table[df_filtered_by_year_table[GP_NAME_COLUMN] == selected_gp_table]
-    else:
-        df_filtered_by_gp_table = df_filtered_by_year_table
+    # Positions des lignes filtrées, lues dans l'index trié (année, course) : aucune copie du tableau
+    filtered_rows = get_filtered_rows(selected_session_name_table, year_filter, gp_filter)
 
-    if not df_filtered_by_gp_table.empty:
-        all_columns = df_filtered_by_gp_table.columns.tolist()
+    if len(filtered_rows) > 0:
+        all_columns = df_current_session.columns.tolist()
         default_cols_candidates = [GP_NAME_COLUMN, YEAR_COLUMN, 'driver_name', 'constructor_name', 'position', 'laps', 'time', 'points']
         default_columns = [col for col in default_cols_candidates if col in all_columns]
         if not default_columns and all_columns:
@@ -75,20 +83,44 @@ if not df_current_session.empty:
     else:
         selected_columns_table = []
 
-    if not df_filtered_by_gp_table.empty and selected_columns_table:
+    if len(filtered_rows) > 0 and selected_columns_table:
         st.success(f"Affichage des données pour : Session '{selected_session_name_table}', Année '{selected_year_table}', Grand Prix '{selected_gp_table}'.")
-        st.dataframe(df_filtered_by_gp_table[selected_columns_table], use_container_width=True)
-
-        csv_data_table = convert_df_to_csv(df_filtered_by_gp_table[selected_columns_table])
-        st.download_button(
-           label="📥 Télécharger les données filtrées (CSV)",
-           data=csv_data_table,
-           file_name=f"{selected_session_name_table}_{selected_year_table}_{selected_gp_table}_filtre.csv".replace(" ", "_").replace("'", ""),
-           mime="text/csv",
-        )
+
+        # --- Pagination côté serveur : seule la page courante est envoyée au navigateur ---
+        total_rows = len(filtered_rows)
+        col_size, col_page = st.columns([1, 3])
+        with col_size:
+            page_size = st.selectbox("Lignes par page", PAGE_SIZE_OPTIONS, index=1, key="table_page_size")
+        page_count = max(1, -(-total_rows // page_size))
+        with col_page:
+            page_number = st.number_input(f"Page (sur {page_count})", min_value=1, max_value=page_count, value=1, step=1, key="table_page_number")
+
+        page_start = (page_number - 1) * page_size
+        page_end = min(page_start + page_size, total_rows)
+        df_page = get_rows(selected_session_name_table, filtered_rows[page_start:page_end], selected_columns_table)
+        st.dataframe(df_page, use_container_width=True, hide_index=True)
+        st.caption(f"Lignes {page_start + 1} à {page_end} sur {total_rows}.")
+
+        # --- Export à la demande : l'encodage n'a lieu que si l'utilisateur le demande ---
+        export_file_stem = f"{selected_session_name_table}_{selected_year_table}_{selected_gp_table}_filtre".replace(" ", "_").replace("'", "")
+        col_format, col_export = st.columns([1, 3])
+        with col_format:
+            export_format = st.radio("Format d'export", ["CSV", "Parquet"], horizontal=True, key="table_export_format")
+        with col_export:
+            if st.button("📦 Préparer l'export des données filtrées", key="table_export_prepare"):
+                file_format = export_format.lower()
+                export_data = export_filtered_rows(
+                    selected_session_name_table, year_filter, gp_filter, tuple(selected_columns_table), file_format
+                )
+                st.download_button(
+                   label=f"📥 Télécharger les données filtrées ({export_format})",
+                   data=export_data,
+                   file_name=f"{export_file_stem}.{file_format}",
+                   mime="text/csv" if file_format == "csv" else "application/octet-stream",
+                )
     elif df_current_session.empty:
          st.info(f"Aucune donnée n'a pu être chargée pour la session '{selected_session_name_table}'. Vérifiez que le fichier '{file_to_load_table}' existe et est correct.")
-    elif not selected_columns_table and not df_filtered_by_gp_table.empty :
+    elif not selected_columns_table and len(filtered_rows) > 0:
          st.info("Veuillez sélectionner au moins une colonne à afficher.")
     else:
          st.info("Aucune donnée ne correspond à vos filtres actuels. Essayez d'élargir votre sélection.")
@@ -96,4 +128,6 @@ else:
     if file_to_load_table:
         st.error(f"Impossible de charger les données pour la session sélectionnée ({selected_session_name_table}). Assurez-vous que le fichier '{file_to_load_table}' est présent dans le dossier 'data' et qu'il est correct.")
     else:
-        st.error("Session sélectionnée non valide ou fichier non spécifié.")  
\ No newline at end of file
+        st.error("Session sélectionnée non valide ou fichier non spécifié.")
+
+page_profile.finish()
@@ -1,19 +1,26 @@
 # pages/2_Data_Visualisation.py
+from profiling import start_page_profile, lazy_import
+page_profile = start_page_profile("2_Data_Visualisation")
+
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import os
 # Import shared functions and constants from utils.py
 from utils import (
-    load_data,
     SESSION_FILES,
-    YEAR_COLUMN,
     GP_NAME_COLUMN,
     VIS_DRIVER_COL,
     VIS_POSITION_COL,
     POINTS_COL,
     CONSTRUCTOR_COL
 )
+from data_service import (
+    get_session_data,
+    get_session_numeric,
+    get_session_year,
+    get_available_years,
+    get_race_aggregate
+)
+
+page_profile.imports_done()
 
 st.set_page_config(
     layout="wide",
@@ -27,23 +34,16 @@ st.markdown("Choisissez les options ci-dessous pour générer des visualisations
 st.markdown("---")
 
 # --- Data Loading ---
-@st.cache_data
-def load_race_data():
-    race_file_path = SESSION_FILES.get("Course")
-    if race_file_path and os.path.exists(race_file_path):
-        df = load_data(race_file_path)
-        if not df.empty:
-            df[YEAR_COLUMN] = df[YEAR_COLUMN].astype(str)
-        return df
-    return pd.DataFrame()
-
-DF_RACES_GLOBAL = load_race_data()
+DF_RACES_GLOBAL = get_session_data("Course")
 
 if DF_RACES_GLOBAL.empty:
     st.error(f"Fichier de données pour les courses non trouvé ou vide. Les visualisations ne peuvent pas être générées.")
     st.stop()
 
-available_years_annual = sorted(DF_RACES_GLOBAL[YEAR_COLUMN].unique(), reverse=True)
+# plotly n'est importé qu'une fois les données disponibles (premier graphique)
+px = lazy_import("plotly.express")
+
+available_years_annual = get_available_years("Course")
 
 # --- Tab Layout ---
 tab_drivers, tab_constructors = st.tabs(["🏎️ Données Pilotes", "🛠️ Données Écuries"])
@@ -60,9 +60,7 @@ with tab_drivers:
             available_years_annual,
             key="annual_driver_year_select"
         )
-        df_year_drivers = DF_RACES_GLOBAL[DF_RACES_GLOBAL[YEAR_COLUMN] == selected_year_drivers].copy()
-        df_year_drivers[POINTS_COL] = pd.to_numeric(df_year_drivers[POINTS_COL], errors='coerce').fillna(0)
-        driver_standings = df_year_drivers.groupby(VIS_DRIVER_COL)[POINTS_COL].sum().sort_values(ascending=False).reset_index()
+        driver_standings = get_race_aggregate('driver_standings', selected_year_drivers)
 
         if not driver_standings.empty:
             fig_drivers = px.bar(
@@ -81,9 +79,7 @@ with tab_drivers:
     st.subheader("📈 Progression du Championnat des Pilotes")
     with st.container(border=True):
         selected_year_prog_d = st.selectbox("Choisissez une année", available_years_annual, key="prog_year_select_d")
-        df_prog_d = DF_RACES_GLOBAL[DF_RACES_GLOBAL[YEAR_COLUMN] == selected_year_prog_d].copy()
-        df_prog_d[POINTS_COL] = pd.to_numeric(df_prog_d[POINTS_COL], errors='coerce').fillna(0)
-        df_prog_d['CumulativePoints'] = df_prog_d.groupby(VIS_DRIVER_COL)[POINTS_COL].cumsum()
+        df_prog_d = get_race_aggregate('driver_progression', selected_year_prog_d)
 
         if not df_prog_d.empty:
             fig_prog_d = px.line(
@@ -101,13 +97,10 @@ with tab_drivers:
     st.subheader("📊 Distribution des Positions des Pilotes")
     with st.container(border=True):
         selected_year_dist_d = st.selectbox("Choisissez une année", available_years_annual, key="dist_year_select_d")
-        df_dist_d = DF_RACES_GLOBAL[DF_RACES_GLOBAL[YEAR_COLUMN] == selected_year_dist_d].copy()
-        df_dist_d[VIS_POSITION_COL] = pd.to_numeric(df_dist_d[VIS_POSITION_COL], errors='coerce')
-        df_dist_d.dropna(subset=[VIS_POSITION_COL], inplace=True)
-        df_dist_d[VIS_POSITION_COL] = df_dist_d[VIS_POSITION_COL].astype(int)
+        df_dist_d = get_race_aggregate('driver_positions', selected_year_dist_d)
 
         if not df_dist_d.empty:
-            sorted_order_d = df_dist_d.groupby(VIS_DRIVER_COL)[VIS_POSITION_COL].median().sort_values().index
+            sorted_order_d = get_race_aggregate('driver_position_order', selected_year_dist_d)
             fig_dist_d = px.box(
                 df_dist_d, x=VIS_DRIVER_COL, y=VIS_POSITION_COL, color=VIS_DRIVER_COL,
                 title=f"Distribution des Positions en Course (Pilotes) - {selected_year_dist_d}",
@@ -130,24 +123,24 @@ with tab_drivers:
         with col_perf1:
             selected_session_perf = st.selectbox("1. Choisissez une session", vis_session_options_perf, key="driver_perf_session")
         
-        file_to_load_perf = SESSION_FILES.get(selected_session_perf)
-        if file_to_load_perf and os.path.exists(file_to_load_perf):
-            df_session_perf = load_data(file_to_load_perf)
-            df_session_perf[YEAR_COLUMN] = df_session_perf[YEAR_COLUMN].astype(str)
-            available_years_perf = sorted(df_session_perf[YEAR_COLUMN].unique(), reverse=True)
+        df_session_perf = get_session_data(selected_session_perf)
+        if not df_session_perf.empty:
+            available_years_perf = get_available_years(selected_session_perf)
 
             with col_perf2:
                 selected_year_perf = st.selectbox("2. Choisissez une année", available_years_perf, key="driver_perf_year")
             
-            df_year_filtered_perf = df_session_perf[df_session_perf[YEAR_COLUMN] == selected_year_perf]
+            df_year_filtered_perf = get_session_year(selected_session_perf, selected_year_perf)
             available_drivers_perf = sorted(df_year_filtered_perf[VIS_DRIVER_COL].dropna().unique())
 
             if available_drivers_perf:
                 with col_perf3:
                     selected_driver_perf = st.selectbox("3. Choisissez un pilote", available_drivers_perf, key="driver_perf_driver")
                 
-                df_driver_filtered_perf = df_year_filtered_perf[df_year_filtered_perf[VIS_DRIVER_COL] == selected_driver_perf]                
-                df_driver_filtered_perf.loc[:, VIS_POSITION_COL] = pd.to_numeric(df_driver_filtered_perf[VIS_POSITION_COL], errors='coerce')
+                df_driver_filtered_perf = df_year_filtered_perf[df_year_filtered_perf[VIS_DRIVER_COL] == selected_driver_perf]
+                df_driver_filtered_perf = df_driver_filtered_perf.assign(
+                    **{VIS_POSITION_COL: get_session_numeric(selected_session_perf)[VIS_POSITION_COL]}
+                )
 
                 if not df_driver_filtered_perf.dropna(subset=[VIS_POSITION_COL]).empty:
                     fig_perf = px.line(
@@ -178,9 +171,7 @@ with tab_constructors:
             available_years_annual,
             key="annual_constructor_year_select"
         )
-        df_year_constructors = DF_RACES_GLOBAL[DF_RACES_GLOBAL[YEAR_COLUMN] == selected_year_constructors].copy()
-        df_year_constructors[POINTS_COL] = pd.to_numeric(df_year_constructors[POINTS_COL], errors='coerce').fillna(0)
-        constructor_standings = df_year_constructors.groupby(CONSTRUCTOR_COL)[POINTS_COL].sum().sort_values(ascending=False).reset_index()
+        constructor_standings = get_race_aggregate('constructor_standings', selected_year_constructors)
 
         if not constructor_standings.empty:
             fig_constructors = px.bar(
@@ -199,11 +190,7 @@ with tab_constructors:
     st.subheader("📈 Progression du Championnat des Écuries")
     with st.container(border=True):
         selected_year_prog_c = st.selectbox("Choisissez une année", available_years_annual, key="prog_year_select_c")
-        df_prog_c = DF_RACES_GLOBAL[DF_RACES_GLOBAL[YEAR_COLUMN] == selected_year_prog_c].copy()
-        df_prog_c[POINTS_COL] = pd.to_numeric(df_prog_c[POINTS_COL], errors='coerce').fillna(0)
-        
-        team_points_per_race = df_prog_c.groupby([GP_NAME_COLUMN, CONSTRUCTOR_COL])[POINTS_COL].sum().reset_index()
-        team_points_per_race['CumulativePoints'] = team_points_per_race.groupby(CONSTRUCTOR_COL)[POINTS_COL].cumsum()
+        team_points_per_race = get_race_aggregate('constructor_progression', selected_year_prog_c)
 
         if not team_points_per_race.empty:
             fig_prog_c = px.line(
@@ -221,13 +208,10 @@ with tab_constructors:
     st.subheader("📊 Distribution des Positions des Écuries")
     with st.container(border=True):
         selected_year_dist_c = st.selectbox("Choisissez une année", available_years_annual, key="dist_year_select_c")
-        df_dist_c = DF_RACES_GLOBAL[DF_RACES_GLOBAL[YEAR_COLUMN] == selected_year_dist_c].copy()
-        df_dist_c[VIS_POSITION_COL] = pd.to_numeric(df_dist_c[VIS_POSITION_COL], errors='coerce')
-        df_dist_c.dropna(subset=[VIS_POSITION_COL], inplace=True)
-        df_dist_c[VIS_POSITION_COL] = df_dist_c[VIS_POSITION_COL].astype(int)
+        df_dist_c = get_race_aggregate('driver_positions', selected_year_dist_c)
 
         if not df_dist_c.empty:
-            sorted_order_c = df_dist_c.groupby(CONSTRUCTOR_COL)[VIS_POSITION_COL].median().sort_values().index
+            sorted_order_c = get_race_aggregate('constructor_position_order', selected_year_dist_c)
             fig_dist_c = px.box(
                 df_dist_c, x=CONSTRUCTOR_COL, y=VIS_POSITION_COL, color=CONSTRUCTOR_COL,
                 title=f"Distribution des Positions en Course (Écuries) - {selected_year_dist_c}",
@@ -238,3 +222,5 @@ with tab_constructors:
             st.plotly_chart(fig_dist_c, use_container_width=True)
         else:
             st.info(f"Aucune donnée de position valide à afficher pour les écuries en {selected_year_dist_c}.")
+
+page_profile.finish()
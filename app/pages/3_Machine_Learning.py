@@ -1,20 +1,29 @@
 # pages/3_Machine_Learning.py
+from profiling import start_page_profile, lazy_import
+page_profile = start_page_profile("3_Machine_Learning")
+
 import streamlit as st
 import pandas as pd
 import os
-import joblib
 import json
-from feature_engineering import create_features 
+# joblib (et donc sklearn/lightgbm au dépickling) et prediction_logic (f1features) ne sont
+# importés qu'au clic sur "Prédire", via lazy_import
 
 # Import shared functions and constants from utils.py
 from utils import (
-    load_data,
     YEAR_COLUMN,
     GP_NAME_COLUMN,
     VIS_DRIVER_COL,
     CONSTRUCTOR_COL,
-    VIS_POSITION_COL
+    VIS_POSITION_COL,
+    TEAM_AESTHETICS
 )
+from data_service import get_ml_dataset, get_ml_feature_context
+from cards import escape_column, render_card_grid
+from assets import asset_urls
+from train_model.model_registry import model_stamp, active_model_paths, load_manifest
+
+page_profile.imports_done()
 
 st.set_page_config(
     layout="wide",
@@ -28,20 +37,6 @@ Cette section utilise un modèle de Machine Learning pour prédire les résultat
 """)
 st.markdown("---")
 
-TEAM_AESTHETICS = {
-    'Mercedes': {'color': '#6CD3BF', 'logo': 'https://upload.wikimedia.org/wikipedia/commons/thumb/b/b8/Mercedes-Benz_Star.svg/1200px-Mercedes-Benz_Star.svg.png'},
-    'Ferrari': {'color': '#F91536', 'logo': 'https://upload.wikimedia.org/wikipedia/fr/thumb/c/c0/Scuderia_Ferrari_Logo.svg/1517px-Scuderia_Ferrari_Logo.svg.png'},
-    'Red Bull Racing Honda RBPT': {'color': '#3671C6', 'logo': 'https://brandlogo.org/wp-content/uploads/2024/09/Red-Bull-Logo-1987.png.webp'},
-    'McLaren Mercedes': {'color': '#F58020', 'logo': 'https://r.testifier.nl/Acbs8526SDKI/resizing_type:fill/plain/https%3A%2F%2Fs3-newsifier.ams3.digitaloceanspaces.com%2Fgpblog.com%2Fimages%2F2025-03%2Fmclaren-logo-67e9539536b57.png'},
-    'Aston Martin Aramco Mercedes': {'color': '#358C75', 'logo': 'https://www.pngplay.com/wp-content/uploads/13/Aston-Martin-Logo-No-Background.png'},
-    'Alpine Renault': {'color': '#2293D1', 'logo': 'https://logodownload.org/wp-content/uploads/2022/03/alpine-f1-logo-0.png'},
-    'Williams Mercedes': {'color': '#64C4FF', 'logo': 'https://brandlogo.org/wp-content/uploads/2025/02/Williams-Racing-Icon-2020.png.webp'},
-    'Racing Bulls Honda RBPT': {'color': '#6692FF', 'logo': 'https://static.wikia.nocookie.net/rr3/images/e/ef/F1.Racing.Bulls.png'},
-    'Kick Sauber Ferrari': {'color': '#52E252', 'logo': 'https://fansbrands.de/cdn/shop/collections/kick-logo-500x500-collection.png?crop=center&height=1200&v=1728150625&width=1200'},
-    'Haas Ferrari': {'color': "#FFFFFF", 'logo': 'https://upload.wikimedia.org/wikipedia/commons/d/d4/Logo_Haas_F1.png'},    
-    'Default': {'color': '#333333', 'logo': ''}
-}
-
 SHARED_DRIVER_CARD_STYLES = """
 <style>
     .driver-card {
@@ -101,40 +96,26 @@ def get_ordinal(n):
         suffix = {1: 'st', 2: 'nd', 3: 'rd'}.get(n % 10, 'th')
     return str(n) + suffix.upper()
 
+def build_driver_cards(drivers_df, position_labels):
+    """
+    Construit le HTML de toutes les cartes pilotes en une seule passe sur les colonnes
+    (couleur et logo de l'écurie, position, nom), sans boucle sur les lignes.
+    """
+    default_style = TEAM_AESTHETICS['Default']
+    teams = drivers_df[CONSTRUCTOR_COL]
+    colors = teams.map({team: style['color'] for team, style in TEAM_AESTHETICS.items()}).fillna(default_style['color'])
+    logos = asset_urls(teams.map({team: style['logo'] for team, style in TEAM_AESTHETICS.items()}).fillna(default_style['logo']))
+    return (
+        '<div class="driver-card"><div class="position">' + position_labels + '</div>'
+        + '<div class="driver-info" style="background-color: ' + colors + ';">'
+        + '<span class="driver-name">' + escape_column(drivers_df[VIS_DRIVER_COL]) + '</span>'
+        + '<img src="' + logos + '" class="team-logo"></div></div>'
+    )
+
 def display_predicted_grid(results_df):   
     st.subheader("🤖 Grille de Résultats Prédits")
-    
-    col1, col2 = st.columns(2, gap="medium")
-    
-    odd_drivers = results_df.iloc[::2]
-    even_drivers = results_df.iloc[1::2]
-
-    with col1:
-        for _, row in odd_drivers.iterrows():
-            team_style = TEAM_AESTHETICS.get(row[CONSTRUCTOR_COL], TEAM_AESTHETICS['Default'])
-            html = f"""
-            <div class="driver-card">
-                <div class="position">{get_ordinal(row['predicted_rank'])}</div>
-                <div class="driver-info" style="background-color: {team_style['color']};">
-                    <span class="driver-name">{row[VIS_DRIVER_COL]}</span>
-                    <img src="{team_style['logo']}" class="team-logo">
-                </div>
-            </div>"""
-            st.markdown(html, unsafe_allow_html=True)
-            
-    with col2:
-        st.markdown("<div style='margin-top: 30px;'></div>", unsafe_allow_html=True)
-        for _, row in even_drivers.iterrows():
-            team_style = TEAM_AESTHETICS.get(row[CONSTRUCTOR_COL], TEAM_AESTHETICS['Default'])
-            html = f"""
-            <div class="driver-card">
-                <div class="position">{get_ordinal(row['predicted_rank'])}</div>
-                <div class="driver-info" style="background-color: {team_style['color']};">
-                    <span class="driver-name">{row[VIS_DRIVER_COL]}</span>
-                    <img src="{team_style['logo']}" class="team-logo">
-                </div>
-            </div>"""
-            st.markdown(html, unsafe_allow_html=True)
+    cards = build_driver_cards(results_df, results_df['predicted_rank'].map(get_ordinal))
+    render_card_grid(cards, n_columns=2, column_offsets={1: 30})
 
 def display_actual_grid(results_df):
     st.subheader("🏆 Grille des Résultats Réels")
@@ -147,88 +128,149 @@ def display_actual_grid(results_df):
 
     actual_sorted_df = pd.concat([finishers, non_finishers])
 
-    col1, col2 = st.columns(2, gap="medium")
-    
-    odd_drivers = actual_sorted_df.iloc[::2]
-    even_drivers = actual_sorted_df.iloc[1::2]
-
-    with col1:
-        for _, row in odd_drivers.iterrows():
-            team_style = TEAM_AESTHETICS.get(row[CONSTRUCTOR_COL], TEAM_AESTHETICS['Default'])
-            html = f"""
-            <div class="driver-card">
-                <div class="position">{get_ordinal(row[VIS_POSITION_COL])}</div>
-                <div class="driver-info" style="background-color: {team_style['color']};">
-                    <span class="driver-name">{row[VIS_DRIVER_COL]}</span>
-                    <img src="{team_style['logo']}" class="team-logo">
-                </div>
-            </div>"""
-            st.markdown(html, unsafe_allow_html=True)
-            
-    with col2:
-        st.markdown("<div style='margin-top: 30px;'></div>", unsafe_allow_html=True)
-        for _, row in even_drivers.iterrows():
-            team_style = TEAM_AESTHETICS.get(row[CONSTRUCTOR_COL], TEAM_AESTHETICS['Default'])
-            html = f"""
-            <div class="driver-card">
-                <div class="position">{get_ordinal(row[VIS_POSITION_COL])}</div>
-                <div class="driver-info" style="background-color: {team_style['color']};">
-                    <span class="driver-name">{row[VIS_DRIVER_COL]}</span>
-                    <img src="{team_style['logo']}" class="team-logo">
-                </div>
-            </div>"""
-            st.markdown(html, unsafe_allow_html=True)
+    cards = build_driver_cards(actual_sorted_df, actual_sorted_df[VIS_POSITION_COL].map(get_ordinal))
+    render_card_grid(cards, n_columns=2, column_offsets={1: 30})
 
 # --- Define paths & Load Model ---
 MODEL_DIR = "models"
-MODEL_PATH = os.path.join(MODEL_DIR, "f1_lgbm_model.joblib")
-FEATURES_PATH = os.path.join(MODEL_DIR, "feature_columns.json")
 ML_DATA_PATH = "data/F1_ALL_DATA_2020_2025.csv"
 
-@st.cache_resource(ttl="6h")
-def load_model_and_features():
-    if not os.path.exists(FEATURES_PATH):
-        return None, None, f"Fichier de caractéristiques introuvable : `{FEATURES_PATH}`"
+def check_model_files():
+    """Vérification légère (sans chargement) des fichiers de la version active, pour le premier rendu."""
+    _, model_path, features_path = active_model_paths(MODEL_DIR)
+    if not os.path.exists(features_path):
+        return f"Fichier de caractéristiques introuvable : `{features_path}`"
+    if not os.path.exists(model_path):
+        return f"Fichier de modèle introuvable : `{model_path}`. Veuillez d'abord entraîner un modèle."
+    return None
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _load_model_version(stamp):
+    """
+    Charge la version active du registre. `stamp` (mtime du pointeur CURRENT) fait partie de la
+    clé du cache : dès qu'un nouveau modèle est publié, il est chargé au rendu suivant, sans
+    redémarrage ni TTL. L'ancienne version sort du cache (max_entries).
+    """
+    version, model_path, features_path = active_model_paths(MODEL_DIR)
+    if not os.path.exists(features_path):
+        return None, None, None, f"Fichier de caractéristiques introuvable : `{features_path}`"
     try:
-        with open(FEATURES_PATH, 'r') as f:
+        with open(features_path, 'r') as f:
             features = json.load(f)
     except Exception as e:
-        return None, None, f"Erreur de lecture de `{FEATURES_PATH}`: {e}"
+        return None, None, None, f"Erreur de lecture de `{features_path}`: {e}"
 
-    if not os.path.exists(MODEL_PATH):
-        return None, None, f"Fichier de modèle introuvable : `{MODEL_PATH}`. Veuillez d'abord entraîner un modèle."
+    if not os.path.exists(model_path):
+        return None, None, None, f"Fichier de modèle introuvable : `{model_path}`. Veuillez d'abord entraîner un modèle."
     try:
-        model = joblib.load(MODEL_PATH)
-        st.success("Modèle pré-entraîné et caractéristiques chargés avec succès !")
-        return model, features, None
+        joblib = lazy_import("joblib")
+        model = joblib.load(model_path)
+        return model, features, load_manifest(version, MODEL_DIR), None
     except Exception as e:
-        return None, None, f"Erreur de chargement du modèle `{MODEL_PATH}`: {e}"
+        return None, None, None, f"Erreur de chargement du modèle `{model_path}`: {e}"
+
+def load_model_and_features():
+    # Un simple stat du pointeur à chaque rendu suffit à détecter un nouveau modèle
+    return _load_model_version(model_stamp(MODEL_DIR))
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _load_residual_pool(stamp):
+    return lazy_import("race_simulation").load_residual_pool()
+
+def load_residual_pool():
+    """Erreurs hors échantillon du backtest pour la simulation (rechargées si le fichier change)."""
+    path = lazy_import("race_simulation").BACKTEST_PREDICTIONS_PATH
+    return _load_residual_pool(os.path.getmtime(path) if os.path.exists(path) else None)
+
+def display_race_probabilities(result_df, year, rnd):
+    """Probabilités de victoire, podium, points et abandon simulées (Monte Carlo)."""
+    st.subheader("🎲 Probabilités de Course (Monte Carlo)")
+    race_simulation = lazy_import("race_simulation")
+    residual_pool = load_residual_pool()
+    if residual_pool is None:
+        st.info("Lancez le backtest (`python train_model/backtest.py`) pour obtenir les erreurs du modèle utilisées par la simulation.")
+        return
+    history = df_full_dataset[get_ml_feature_context().history_mask(year, rnd)]
+    probabilities = race_simulation.simulate_race(
+        result_df['predicted_value'].to_numpy(), result_df['grid'], residual_pool,
+        race_simulation.dnf_probabilities(history, result_df['driver_code'])
+    )
+    prob_df = result_df[[VIS_DRIVER_COL, CONSTRUCTOR_COL]].assign(**{
+        col: probabilities[col] * 100 for col in ['P_Win', 'P_Podium', 'P_Points', 'P_DNF']
+    })
+    percent = lambda label: st.column_config.ProgressColumn(label, min_value=0, max_value=100, format="%.1f%%")
+    st.dataframe(
+        prob_df.rename(columns={VIS_DRIVER_COL: 'Pilote', CONSTRUCTOR_COL: 'Écurie'}),
+        column_config={
+            'P_Win': percent("Victoire"), 'P_Podium': percent("Podium"),
+            'P_Points': percent("Points"), 'P_DNF': percent("Abandon"),
+        },
+        use_container_width=True, hide_index=True
+    )
+    st.caption(f"{race_simulation.N_SIMULATIONS:,} courses simulées à partir des erreurs du modèle par place "
+               f"sur la grille et des taux d'abandon historiques.".replace(",", " "))
+
+def default_remaining_races(year, after_round):
+    """Manches restantes : celles du jeu de données, ou le calendrier de la saison précédente si elle est en cours."""
+    rounds = df_full_dataset.groupby(YEAR_COLUMN)['round'].max()
+    if year == rounds.index.max() and year - 1 in rounds.index:
+        return max(int(rounds[year - 1]) - after_round, 0)
+    return int(rounds[year]) - after_round
+
+def display_championship_projection(model, features, year, after_round, n_races):
+    """Probabilités de titre et points finaux attendus des pilotes et des écuries."""
+    race_simulation = lazy_import("race_simulation")
+    residual_pool = load_residual_pool()
+    if residual_pool is None:
+        st.info("Lancez le backtest (`python train_model/backtest.py`) pour obtenir les erreurs du modèle utilisées par la simulation.")
+        return
+    feature_context = get_ml_feature_context()
+    # Niveau des pilotes : rangs prédits par le modèle sur les manches déjà courues
+    predictions = lazy_import("prediction_logic").predict_season(model, features, feature_context, year, after_round)
+    season = df_full_dataset[df_full_dataset[YEAR_COLUMN] == year]
+    history = df_full_dataset[feature_context.history_mask(year, after_round + 1)]
+    drivers, teams = race_simulation.championship_inputs(season, predictions, after_round, history)
+    drivers, teams = race_simulation.simulate_championship(drivers, teams, n_races, residual_pool)
+
+    percent = st.column_config.ProgressColumn("Titre", min_value=0, max_value=100, format="%.1f%%")
+    points = st.column_config.NumberColumn("Points attendus", format="%.0f")
+    col_drivers, col_teams = st.columns(2, gap="medium")
+    with col_drivers:
+        st.markdown("**Pilotes**")
+        st.dataframe(
+            drivers[[VIS_DRIVER_COL, 'points', 'ExpectedPoints', 'P_Title']]
+            .assign(P_Title=drivers['P_Title'] * 100)
+            .rename(columns={VIS_DRIVER_COL: 'Pilote', 'points': 'Points actuels'}),
+            column_config={'P_Title': percent, 'ExpectedPoints': points},
+            use_container_width=True, hide_index=True
+        )
+    with col_teams:
+        st.markdown("**Écuries**")
+        st.dataframe(
+            teams[[CONSTRUCTOR_COL, 'points', 'ExpectedPoints', 'P_Title']]
+            .assign(P_Title=teams['P_Title'] * 100)
+            .rename(columns={CONSTRUCTOR_COL: 'Écurie', 'points': 'Points actuels'}),
+            column_config={'P_Title': percent, 'ExpectedPoints': points},
+            use_container_width=True, hide_index=True
+        )
+    n_seasons = f"{race_simulation.SEASON_SIMULATIONS:,}".replace(",", " ")
+    st.caption(f"{n_seasons} saisons simulées sur {n_races} manche(s) restante(s) "
+               f"(courses principales uniquement, sans sprint ni point du meilleur tour).")
 
 # --- Data Loading ---
-df_full_dataset = pd.DataFrame()
-if os.path.exists(ML_DATA_PATH):
-    df_full_dataset = load_data(ML_DATA_PATH)
-    for col in ['grid', 'position', 'year', 'race_id', 'driver_number', 'circuitId']:
-        if col in df_full_dataset.columns:
-            df_full_dataset[col] = pd.to_numeric(df_full_dataset[col], errors='coerce')
-    if 'round' not in df_full_dataset.columns and 'race_id' in df_full_dataset.columns:        
-        df_full_dataset.dropna(subset=['year', 'race_id'], inplace=True)
-        df_full_dataset['race_id'] = df_full_dataset['race_id'].astype(int)
-        rounds_map = df_full_dataset[['year', 'race_id']].drop_duplicates().sort_values(by=['year', 'race_id'])
-        rounds_map['round'] = rounds_map.groupby('year').cumcount() + 1
-        df_full_dataset = pd.merge(df_full_dataset, rounds_map[['race_id', 'round']], on='race_id', how='left')
-        df_full_dataset['round'] = pd.to_numeric(df_full_dataset['round'], errors='coerce')
+df_full_dataset = get_ml_dataset()
 
 
 # --- Main Logic ---
 if df_full_dataset.empty:
     st.error(f"Fichier de données pour le ML ({ML_DATA_PATH}) introuvable ou vide.")
 else:
-    model, features, error_msg = load_model_and_features()
+    # Le modèle n'est chargé qu'au clic : le premier rendu ne vérifie que la présence des fichiers
+    error_msg = check_model_files()
 
     if error_msg:
         st.error(error_msg)
-    elif model and features:
+    else:
         st.header("🔮 Faire une Prédiction")
         
         col1, col2 = st.columns(2)
@@ -242,24 +284,24 @@ else:
 
         if st.button("🚀 Prédire le Classement", use_container_width=True):
             with st.spinner("Création des caractéristiques et prédiction en cours..."):
+                model, features, manifest, load_error = load_model_and_features()
                 race_weekend_data = df_full_dataset[
                     (df_full_dataset[YEAR_COLUMN] == selected_year_ml) &
                     (df_full_dataset[GP_NAME_COLUMN] == selected_race_ml)
                 ].copy()
 
-                if race_weekend_data.empty:
+                if load_error:
+                    st.error(load_error)
+                elif race_weekend_data.empty:
                     st.warning("Aucune donnée de base trouvée pour cette course.")
                 else:
-                    features_df = create_features(df_full_dataset, race_weekend_data)
+                    # Même pipeline et même encodage (one-hot team/race_name) qu'à l'entraînement
+                    build_race_features = lazy_import("prediction_logic").build_race_features
+                    X_pred = build_race_features(features, get_ml_feature_context(), race_weekend_data)
 
-                    if features_df.empty:
+                    if X_pred is None:
                         st.error("Impossible de générer les caractéristiques pour la prédiction.")
                     else:
-                        missing_cols = set(features) - set(features_df.columns)
-                        for c in missing_cols:
-                            features_df[c] = 0
-                        
-                        X_pred = features_df[features]
                         predicted_values = model.predict(X_pred)
                         result_df = race_weekend_data.copy()
                         result_df['predicted_value'] = predicted_values
@@ -308,4 +350,34 @@ else:
                                 label="Erreur Absolue Moyenne (MAE)", 
                                 value=f"{mae:.2f}",
                                 help="La différence moyenne entre le rang prédit et le rang réel."
-                            )
\ No newline at end of file
+                            )
+                        if manifest:
+                            st.caption(f"Modèle : version `{manifest['version']}` du {manifest['created_at']}")
+
+                        st.markdown("---")
+                        display_race_probabilities(result_df, selected_year_ml, race_weekend_data['round'].iloc[0])
+
+        st.markdown("---")
+        st.header("🏆 Projection du Championnat")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            projection_year = st.selectbox("Saison", all_years, key="ml_projection_year")
+        completed_rounds = int(df_full_dataset.loc[df_full_dataset[YEAR_COLUMN] == projection_year, 'round'].max())
+        with col2:
+            projection_round = st.number_input("Après la manche", min_value=1, max_value=completed_rounds,
+                                               value=completed_rounds, key="ml_projection_round")
+        with col3:
+            projection_races = st.number_input("Manches restantes", min_value=0, max_value=30,
+                                               value=default_remaining_races(projection_year, projection_round),
+                                               key="ml_projection_races")
+
+        if st.button("🏆 Projeter le Championnat", use_container_width=True):
+            with st.spinner("Simulation des manches restantes..."):
+                model, features, manifest, load_error = load_model_and_features()
+                if load_error:
+                    st.error(load_error)
+                else:
+                    display_championship_projection(model, features, projection_year, int(projection_round),
+                                                    int(projection_races))
+
+page_profile.finish()
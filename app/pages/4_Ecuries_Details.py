@@ -1,12 +1,17 @@
 # pages/3_Pilotes_Details.py
 
+from profiling import start_page_profile
+page_profile = start_page_profile("4_Ecuries_Details")
+
+import html
 import streamlit as st
 import pandas as pd
-import os # Ajout pour la gestion des chemins de fichiers
+from utils import TEAM_COLORS, TEAM_LOGOS, PLACEHOLDER_DRIVER_IMAGE
+from data_service import get_drivers_data, DRIVERS_DATA_PATH
+from cards import GALLERY_CARD_STYLES, escape_column, metric_html, card_grid_html
+from assets import asset_url, asset_urls
 
-# --- Configuration des chemins ---
-# Adaptez ce chemin si votre fichier CSV est dans un autre dossier
-DRIVERS_DATA_PATH = os.path.join("data", "f1_drivers_all.csv")
+page_profile.imports_done()
 
 # --- Configuration de la Page ---
 st.set_page_config(
@@ -19,62 +24,45 @@ st.title("🧑‍🚀 Galerie des Pilotes de Formule 1")
 st.markdown("Explorez les informations détaillées sur chaque pilote, regroupées par écurie.")
 st.markdown("---")
 
-TEAM_COLORS = {
-    'Mercedes': '#6CD3BF',
-    'Ferrari': '#F91536',
-    'Red Bull Racing': '#3671C6',
-    'McLaren': '#F58020',
-    'Aston Martin': '#358C75',
-    'Alpine': '#2293D1',
-    'Williams': '#64C4FF',
-    'Racing Bulls': '#6692FF',
-    'Kick Sauber': '#52E252',
-    'Haas': '#B6BABD',
-    'Default': '#333333'
-}
-
-TEAM_LOGOS = {
-    'Mercedes': 'https://media.formula1.com/content/dam/fom-website/teams/2024/mercedes.png',
-    'Ferrari': 'https://media.formula1.com/content/dam/fom-website/teams/2024/ferrari.png',
-    'Red Bull Racing': 'https://media.formula1.com/d_team_car_fallback_image.png/content/dam/fom-website/teams/2025/red-bull-racing.png',
-    'McLaren': 'https://media.formula1.com/d_team_car_fallback_image.png/content/dam/fom-website/teams/2025/mclaren.png',
-    'Aston Martin': 'https://media.formula1.com/d_team_car_fallback_image.png/content/dam/fom-website/teams/2025/aston-martin.png',    
-    'Alpine': 'https://media.formula1.com/d_team_car_fallback_image.png/content/dam/fom-website/teams/2025/alpine.png',
-    'Williams': 'https://media.formula1.com/d_team_car_fallback_image.png/content/dam/fom-website/teams/2025/williams.png',
-    'Racing Bulls': 'https://media.formula1.com/d_team_car_fallback_image.png/content/dam/fom-website/teams/2025/racing-bulls.png',
-    'Kick Sauber': 'https://media.formula1.com/d_team_car_fallback_image.png/content/dam/fom-website/teams/2025/kick-sauber.png',
-    'Haas': 'https://media.formula1.com/d_team_car_fallback_image.png/content/dam/fom-website/teams/2025/haas.png',
-    'Default': ''
-}
-
-
-# --- Fonction de chargement des données (avec cache pour la performance) ---
-@st.cache_data(ttl="6h")
-def load_drivers_data(path):
-    """Charge les données des pilotes depuis le fichier CSV."""
-    try:
-        df = pd.read_csv(path)
-        # Nettoyage simple : Remplacer les N/A par des chaînes vides ou des zéros
-        df.fillna({
-            'team': 'Écurie Inconnue', # Donner un nom par défaut
-            'country': 'N/A',
-            'podiums': 0,
-            'points': 0,
-            'main_image_url': ''
-        }, inplace=True)
-        return df
-    except FileNotFoundError:
-        st.error(f"Fichier des pilotes introuvable ! Assurez-vous que le chemin '{path}' est correct.")
-        return None
-
 # --- Chargement des données ---
-drivers_df = load_drivers_data(DRIVERS_DATA_PATH)
+drivers_df = get_drivers_data()
 
-if drivers_df is None:
+if drivers_df.empty:
+    st.error(f"Fichier des pilotes introuvable ! Assurez-vous que le chemin '{DRIVERS_DATA_PATH}' est correct.")
     st.warning("Les données des pilotes n'ont pas pu être chargées. Le scraper a-t-il bien été exécuté ?")
     st.stop() # Arrête l'exécution si le fichier est introuvable
 
 
+# --- Construction des cartes pilotes (une passe sur les colonnes, sans iterrows) ---
+def build_driver_gallery_cards(df):
+    """Construit le HTML de toutes les cartes pilotes à partir des colonnes du DataFrame."""
+    def text(col):
+        return escape_column(df[col]) if col in df.columns else 'N/A'
+
+    colors = df['team'].map(TEAM_COLORS).fillna(TEAM_COLORS['Default'])
+    images = asset_urls(df['main_image_url'].where(df['main_image_url'].astype(bool), PLACEHOLDER_DRIVER_IMAGE))
+    names = text('full_name')
+    points = pd.to_numeric(df['points'], errors='coerce').fillna(0).astype(int).astype(str)
+    podiums = pd.to_numeric(df['podiums'], errors='coerce').fillna(0).astype(int).astype(str)
+
+    return (
+        '<div class="gallery-card">'
+        + '<div class="gallery-card-bar" style="background-color: ' + colors + ';"></div>'
+        + '<img class="gallery-card-image" src="' + escape_column(images) + '"/>'
+        + '<div class="gallery-card-caption">' + names + '</div>'
+        + '<h3>' + names + ' <code>#' + text('driver_number') + '</code></h3>'
+        + '<div class="gallery-card-metrics">' + metric_html("Pays", text('country')) + metric_html("Points", points) + '</div>'
+        + '<details><summary>Plus d\'informations</summary>'
+        + '<p><b>Date de naissance :</b> ' + text('date_of_birth') + '</p>'
+        + '<p><b>Lieu de naissance :</b> ' + text('place_of_birth') + '</p>'
+        + '<p><b>Podiums :</b> ' + podiums + '</p>'
+        + '<p><b>Grands Prix disputés :</b> ' + text('grands_prix_entered') + '</p>'
+        + '<p><b>Championnats du monde :</b> ' + text('world_championships') + '</p>'
+        + '<p><b>Meilleur résultat en course :</b> ' + text('highest_race_finish') + '</p>'
+        + '<p><b>Meilleure position sur la grille :</b> ' + text('highest_grid_position') + '</p>'
+        + '</details></div>'
+    )
+
 # --- Affichage principal regroupé par écurie ---
 # Obtenir la liste unique des écuries et la trier
 teams_list = sorted(drivers_df['team'].unique())
@@ -82,59 +70,24 @@ teams_list = sorted(drivers_df['team'].unique())
 if not teams_list:
     st.info("Aucune écurie trouvée dans les données.")
 else:
-    for team in teams_list:
-        logo_url = TEAM_LOGOS.get(team, TEAM_LOGOS['Default'])
-        st.markdown(f"""
-            <div style="display: flex; align-items: center; padding: 15px; border-radius: 10px; margin-bottom: 25px;">
-                <img src="{logo_url}" style="height: 75px; margin-right: 20px;"/>
-                <h2 style="color: white; margin: 0; font-size: 40px">{team}</h2>
-            </div>
-        """, unsafe_allow_html=True)
-        
-        team_drivers_df = drivers_df[drivers_df['team'] == team].sort_values(by="full_name")
-        
-        cols = st.columns(3) 
-        
-        for i, (index, driver) in enumerate(team_drivers_df.iterrows()):
-            col = cols[i % 3] 
-            
-            with col:
-                with st.container(border=True):
-                    ### NOUVEAU ###
-                    # Récupérer la couleur de l'écurie
-                    team_color = TEAM_COLORS.get(team, TEAM_COLORS['Default'])
-                    
-                    st.markdown(f'<div style="background-color:{team_color}; height: 10px; border-radius: 5px 5px 0 0; margin-top: -15px; margin-left: -15px; margin-right: -15px; margin-bottom: 15px;"></div>', unsafe_allow_html=True)
-
-                    if pd.notna(driver['main_image_url']) and driver['main_image_url']:
-                        st.image(
-                            driver['main_image_url'], 
-                            caption=f"{driver['full_name']}",
-                            use_container_width=True
-                        )
-                    else:
-                        st.image(
-                            "https://placehold.co/400x300/F0F2F6/E10600?text=Image\\nNon\\nDisponible", 
-                            caption=f"{driver['full_name']}",
-                            use_container_width=True
-                        )
-
-                    st.subheader(f"{driver['full_name']} `#{driver['driver_number']}`")
-
-                    m_cols = st.columns(2)
-                    m_cols[0].metric(label="Pays", value=str(driver['country']))
-                    m_cols[1].metric(label="Points", value=int(driver.get('points', 0)))
-                    
-                    with st.expander("Plus d'informations"):
-                        st.markdown(f"**Date de naissance :** {driver.get('date_of_birth', 'N/A')}")
-                        st.markdown(f"**Lieu de naissance :** {driver.get('place_of_birth', 'N/A')}")
-                        st.markdown(f"**Podiums :** {int(driver.get('podiums', 0))}")
-                        st.markdown(f"**Grands Prix disputés :** {driver.get('grands_prix_entered', 'N/A')}")
-                        st.markdown(f"**Championnats du monde :** {driver.get('world_championships', 'N/A')}")
-                        st.markdown(f"**Meilleur résultat en course :** {driver.get('highest_race_finish', 'N/A')}")
-                        st.markdown(f"**Meilleure position sur la grille :** {driver.get('highest_grid_position', 'N/A')}")
-        
-        st.markdown("---")
+    sorted_drivers_df = drivers_df.sort_values(by=['team', 'full_name'])
+    driver_cards = build_driver_gallery_cards(sorted_drivers_df)
+
+    # Toute la galerie est assemblée en une seule chaîne et envoyée en un seul st.markdown
+    gallery_sections = []
+    for team, team_cards in driver_cards.groupby(sorted_drivers_df['team'], sort=True):
+        logo_url = asset_url(TEAM_LOGOS.get(team, TEAM_LOGOS['Default']))
+        gallery_sections.append(
+            '<div style="display: flex; align-items: center; padding: 15px; border-radius: 10px; margin-bottom: 25px;">'
+            f'<img src="{logo_url}" style="height: 75px; margin-right: 20px;"/>'
+            f'<h2 style="color: white; margin: 0; font-size: 40px">{html.escape(team)}</h2>'
+            '</div>'
+            + card_grid_html(team_cards, n_columns=3) + "<hr>"
+        )
+
+    st.markdown(GALLERY_CARD_STYLES + "".join(gallery_sections), unsafe_allow_html=True)
 
 # Pied de page
-st.caption("Données collectées via le scraper personnalisé.")
\ No newline at end of file
+st.caption("Données collectées via le scraper personnalisé.")
+
+page_profile.finish()
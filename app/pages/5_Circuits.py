@@ -1,8 +1,16 @@
 # pages/4_Circuits_Details.py (ou le nom que vous souhaitez)
 
+from profiling import start_page_profile
+page_profile = start_page_profile("5_Circuits")
+
 import streamlit as st
 import pandas as pd
-import os
+from utils import PLACEHOLDER_CIRCUIT_IMAGE
+from data_service import get_circuits_data, CIRCUITS_DATA_PATH_TEMPLATE
+from cards import GALLERY_CARD_STYLES, escape_column, metric_html, card_grid_html
+from assets import asset_urls
+
+page_profile.imports_done()
 
 # --- Configuration de la Page ---
 st.set_page_config(
@@ -16,80 +24,44 @@ st.markdown("Retrouvez les informations clés et les records pour chaque circuit
 st.markdown("---")
 
 # --- Configuration des chemins ---
-# Adaptez ce chemin si votre CSV est dans un autre dossier
 # Le nom du fichier inclut l'année, pensez à l'adapter si nécessaire
 YEAR_TO_DISPLAY = 2024
-CIRCUITS_DATA_PATH = os.path.join("data", f"f1_circuits_{YEAR_TO_DISPLAY}.csv")
-
-# --- Fonction de chargement des données (avec cache) ---
-@st.cache_data(ttl="6h")
-def load_circuits_data(path):
-    """Charge les données des circuits depuis le fichier CSV généré par le scraper."""
-    if not os.path.exists(path):
-        st.error(f"Le fichier de données des circuits '{path}' est introuvable.")
-        st.warning("Veuillez d'abord exécuter le script `crawler_circuits.py` pour générer ce fichier.")
-        return None
-    
-    try:
-        df = pd.read_csv(path)
-        # Nettoyage des données pour un affichage propre
-        df.fillna({
-            'length_km': 0,
-            'laps': 0,
-            'lap_record_time': 'N/A',
-            'lap_record_driver': 'N/A',
-            'first_gp': 'N/A',
-            'image_url': '',
-            'country_flag_url': ''
-        }, inplace=True)
-        return df
-    except Exception as e:
-        st.error(f"Une erreur est survenue lors de la lecture du fichier CSV : {e}")
-        return None
+CIRCUITS_DATA_PATH = CIRCUITS_DATA_PATH_TEMPLATE.format(year=YEAR_TO_DISPLAY)
 
 # --- Application Principale ---
-circuits_df = load_circuits_data(CIRCUITS_DATA_PATH)
+circuits_df = get_circuits_data(YEAR_TO_DISPLAY)
 
-if circuits_df is not None and not circuits_df.empty:
-    
-    # Trier les circuits par leur nom pour un affichage alphabétique
-    circuits_df.sort_values('circuit_name', inplace=True)
+if circuits_df.empty:
+    st.error(f"Le fichier de données des circuits '{CIRCUITS_DATA_PATH}' est introuvable.")
+    st.warning("Veuillez d'abord exécuter le script `crawler_circuits.py` pour générer ce fichier.")
 
-    # Définir le nombre de colonnes pour la galerie
-    cols = st.columns(2)
+if not circuits_df.empty:
     
-    # Itérer sur les données pour créer une carte par circuit
-    for index, circuit in circuits_df.iterrows():
-        col = cols[index % 2] # Assigner la carte à une colonne (gauche/droite)
-
-        with col:
-            with st.container(border=True):
-                # Header de la carte avec le drapeau et le nom
-                col1, col2 = st.columns([1, 4])
-                with col1:
-                    if circuit['country_flag_url']:
-                        st.image(circuit['country_flag_url'], width=60)
-                with col2:
-                    st.subheader(circuit['circuit_name'])
+    # Trier les circuits par leur nom pour un affichage alphabétique
+    circuits_df = circuits_df.sort_values('circuit_name')
 
-                # Tracé du circuit
-                if circuit['image_url']:
-                    st.image(circuit['image_url'], use_container_width=True)
-                else:
-                    st.image("https://placehold.co/600x400/F0F2F6/E10600?text=Tracé\\nIndisponible", use_container_width=True)
+    # Construire toutes les cartes en une passe sur les colonnes, puis les envoyer en un seul st.markdown
+    flags = circuits_df['country_flag_url'].astype(str)
+    flag_html = ('<img src="' + escape_column(asset_urls(flags)) + '"/>').where(flags.astype(bool), '')
+    images = asset_urls(circuits_df['image_url'].where(circuits_df['image_url'].astype(bool), PLACEHOLDER_CIRCUIT_IMAGE))
+    lengths = escape_column(circuits_df['length_km']) + ' km'
+    laps = pd.to_numeric(circuits_df['laps'], errors='coerce').fillna(0).astype(int).astype(str)
 
-                st.markdown("---")
+    circuit_cards = (
+        '<div class="gallery-card">'
+        + '<div class="gallery-card-header">' + flag_html + '<h3>' + escape_column(circuits_df['circuit_name']) + '</h3></div>'
+        + '<img class="gallery-card-image" src="' + escape_column(images) + '"/>'
+        + '<hr>'
+        + '<div class="gallery-card-metrics">'
+        + metric_html("Longueur", lengths) + metric_html("Tours", laps) + metric_html("Premier GP", escape_column(circuits_df['first_gp']))
+        + '</div>'
+        + '<details><summary>Record du Tour</summary>'
+        + metric_html("Temps Record", escape_column(circuits_df['lap_record_time']))
+        + '<div class="gallery-card-caption" style="text-align: left;">Par : ' + escape_column(circuits_df['lap_record_driver']) + '</div>'
+        + '</details></div>'
+    )
 
-                # Affichage des statistiques principales avec st.metric
-                m_cols = st.columns(3)
-                m_cols[0].metric("Longueur", f"{circuit.get('length_km', 0)} km")
-                m_cols[1].metric("Tours", f"{int(circuit.get('laps', 0))}")
-                m_cols[2].metric("Premier GP", str(circuit.get('first_gp', 'N/A')))
-                
-                # Expander pour le record du tour
-                with st.expander("Record du Tour"):
-                    st.metric("Temps Record", str(circuit.get('lap_record_time', 'N/A')))
-                    st.caption(f"Par : {circuit.get('lap_record_driver', 'N/A')}")
+    st.markdown(GALLERY_CARD_STYLES + card_grid_html(circuit_cards, n_columns=2), unsafe_allow_html=True)
 
 else:
     st.info("En attente des données des circuits. Le fichier CSV est peut-être en cours de création.")
@@ -97,3 +69,5 @@ else:
 # Pied de page
 st.markdown("---")
 st.caption("Données collectées via le scraper de circuits personnalisé.")
+
+page_profile.finish()
@@ -0,0 +1,204 @@
+# predict.py
+# Prédictions en lot, sans Streamlit (tâches planifiées).
+#
+# Depuis le dossier `app` :
+#     python predict.py --years 2024 2025 --out preds.parquet
+#     python predict.py --years 2020 2021 2022 2023 2024 --out preds.csv --workers 8 --chunk-size 16
+#
+# Les courses sont traitées par paquets : les features d'un paquet sont générées en parallèle
+# (un processus par cœur), puis prédites en un seul model.predict et écrites immédiatement
+# dans le fichier de sortie. La mémoire reste bornée par la taille d'un paquet, quel que soit
+# le nombre de saisons demandées.
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from utils import HISTORICAL_DATA_PATH, YEAR_COLUMN, GP_NAME_COLUMN
+from data_service import prepare_ml_dataset
+from prediction_logic import build_race_features, format_prediction_results
+from f1features import FeatureContext
+from train_model.model_registry import load_active_model
+
+MODEL_DIR = "models"
+DEFAULT_CHUNK_SIZE = 8
+
+OUTPUT_COLUMNS = [
+    'year', 'round', 'race_name', 'driver_code', 'team', 'grid',
+    'ActualPosition', 'PredictedPositionValue', 'PredictedRank'
+]
+
+# État de chaque processus de calcul des features (chargé une fois par processus)
+_worker_dataset = None
+_worker_context = None
+_worker_feature_columns = None
+
+
+def _init_worker(data_path, feature_columns):
+    global _worker_dataset, _worker_context, _worker_feature_columns
+    _worker_dataset = prepare_ml_dataset(pd.read_csv(data_path))
+    _worker_context = FeatureContext(_worker_dataset)
+    _worker_feature_columns = feature_columns
+
+
+def _race_features(race_key):
+    """(année, manche) -> (clé, données du week-end, features alignées ou None)."""
+    year, rnd = race_key
+    race_weekend_data = _worker_dataset[
+        (_worker_dataset[YEAR_COLUMN] == year) & (_worker_dataset['round'] == rnd)
+    ]
+    features_df = build_race_features(_worker_feature_columns, _worker_context, race_weekend_data)
+    return race_key, race_weekend_data, features_df
+
+
+def iter_race_features(race_keys, data_path, feature_columns, workers, chunk_size):
+    """
+    Génère les features course par course, dans l'ordre, par paquets de `chunk_size`.
+    Avec plusieurs workers, le paquet suivant est déjà soumis pendant que le paquet
+    courant est prédit et écrit (au plus deux paquets en mémoire).
+    """
+    chunks = [race_keys[i:i + chunk_size] for i in range(0, len(race_keys), chunk_size)]
+    if workers <= 1:
+        _init_worker(data_path, feature_columns)
+        for chunk in chunks:
+            yield [_race_features(key) for key in chunk]
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(data_path, feature_columns)) as executor:
+        pending = [executor.submit(_race_features, key) for key in chunks[0]] if chunks else []
+        for next_chunk in chunks[1:] + [None]:
+            following = [executor.submit(_race_features, key) for key in next_chunk] if next_chunk else []
+            yield [future.result() for future in pending]
+            pending = following
+
+
+def predict_chunk(model, chunk_results):
+    """Un seul model.predict pour toutes les courses du paquet, puis un tableau par course."""
+    valid = [(key, race_data, features) for key, race_data, features in chunk_results if features is not None]
+    skipped = [key for key, _, features in chunk_results if features is None]
+    if not valid:
+        return pd.DataFrame(columns=OUTPUT_COLUMNS), skipped
+
+    predictions = model.predict(pd.concat([features for _, _, features in valid], ignore_index=True))
+    bounds = np.cumsum([0] + [len(features) for _, _, features in valid])
+
+    frames = []
+    for (key, race_data, features), start, end in zip(valid, bounds[:-1], bounds[1:]):
+        result_df = format_prediction_results(race_data, features.index, predictions[start:end])
+        result_df.insert(0, 'race_name', race_data[GP_NAME_COLUMN].iloc[0])
+        result_df.insert(0, 'round', key[1])
+        result_df.insert(0, 'year', key[0])
+        frames.append(result_df)
+    return pd.concat(frames, ignore_index=True)[OUTPUT_COLUMNS], skipped
+
+
+class PredictionWriter:
+    """
+    Écriture incrémentale (Parquet ou CSV) dans un fichier temporaire : close() le publie
+    une fois le traitement terminé, abort() le supprime en cas d'échec (la sortie précédente
+    reste alors en place).
+    """
+
+    def __init__(self, out_path):
+        self.out_path = out_path
+        self.tmp_path = out_path + ".tmp"
+        self.is_parquet = out_path.endswith(".parquet")
+        self.rows = 0
+        self._writer = None
+        self._schema = None
+
+    def write(self, df):
+        df = df.astype({
+            'year': 'int64', 'round': 'int64', 'race_name': 'object', 'driver_code': 'object',
+            'team': 'object', 'grid': 'float64', 'ActualPosition': 'float64',
+            'PredictedPositionValue': 'float64', 'PredictedRank': 'int64'
+        })
+        if self.is_parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            if self._writer is None:
+                self._schema = pa.schema([
+                    ('year', pa.int64()), ('round', pa.int64()), ('race_name', pa.string()),
+                    ('driver_code', pa.string()), ('team', pa.string()), ('grid', pa.float64()),
+                    ('ActualPosition', pa.float64()), ('PredictedPositionValue', pa.float64()),
+                    ('PredictedRank', pa.int64()),
+                ])
+                self._writer = pq.ParquetWriter(self.tmp_path, self._schema)
+            self._writer.write_table(pa.Table.from_pandas(df, schema=self._schema, preserve_index=False))
+        else:
+            df.to_csv(self.tmp_path, mode='w' if self.rows == 0 else 'a', header=self.rows == 0, index=False)
+        self.rows += len(df)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self.rows == 0 and not os.path.exists(self.tmp_path):
+            # Aucune prédiction : on écrit quand même un fichier vide avec les bonnes colonnes
+            self.write(pd.DataFrame(columns=OUTPUT_COLUMNS))
+            if self._writer is not None:
+                self._writer.close()
+        os.replace(self.tmp_path, self.out_path)
+
+    def abort(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+def run_batch_prediction(years, out_path, workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                         model_dir=MODEL_DIR, data_path=HISTORICAL_DATA_PATH):
+    start = time.perf_counter()
+    # Version active du registre, figée pour toute la durée du traitement
+    model, feature_columns, manifest = load_active_model(model_dir)
+    print(f"Modèle : version {manifest.get('version') or 'historique (hors registre)'}")
+
+    # Liste des courses à prédire (lecture légère des seules colonnes utiles)
+    races = prepare_ml_dataset(pd.read_csv(data_path, usecols=[YEAR_COLUMN, 'race_id']))
+    races = races[races[YEAR_COLUMN].isin(years)].drop_duplicates([YEAR_COLUMN, 'round'])
+    race_keys = sorted((int(year), int(rnd)) for year, rnd in races[[YEAR_COLUMN, 'round']].itertuples(index=False))
+    if not race_keys:
+        print(f"Aucune course trouvée pour les années {years} dans {data_path}.")
+        return
+
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, len(race_keys))
+    print(f"{len(race_keys)} course(s) à prédire ({', '.join(map(str, years))}), "
+          f"paquets de {chunk_size}, {workers} processus.")
+
+    writer = PredictionWriter(out_path)
+    all_skipped = []
+    try:
+        for i, chunk_results in enumerate(iter_race_features(race_keys, data_path, feature_columns, workers, chunk_size), 1):
+            chunk_df, skipped = predict_chunk(model, chunk_results)
+            if not chunk_df.empty:
+                writer.write(chunk_df)
+            all_skipped.extend(skipped)
+            print(f"  - Paquet {i} : {len(chunk_results)} course(s), {len(chunk_df)} ligne(s) écrite(s)")
+    except BaseException:
+        # Sortie partielle jamais publiée (interruption comprise)
+        writer.abort()
+        raise
+    writer.close()
+
+    if all_skipped:
+        print(f"  - Features impossibles à générer pour : {', '.join(f'{y} manche {r}' for y, r in all_skipped)}")
+    print(f"✅ {writer.rows} prédiction(s) sauvegardée(s) dans '{out_path}' en {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prédit le classement de toutes les courses des années demandées.")
+    parser.add_argument("--years", type=int, nargs="+", required=True)
+    parser.add_argument("--out", required=True, help="Fichier de sortie (.parquet ou .csv)")
+    parser.add_argument("--workers", type=int, default=None, help="Processus pour les features (défaut : nombre de cœurs)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Courses par paquet")
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    parser.add_argument("--data", default=HISTORICAL_DATA_PATH)
+    args = parser.parse_args()
+    run_batch_prediction(args.years, args.out, args.workers, args.chunk_size, args.model_dir, args.data)
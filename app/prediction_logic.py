@@ -1,52 +1,84 @@
 # prediction_logic.py
 import pandas as pd
-import joblib
-import json
-from config import *
-from feature_engineering import create_features 
+from f1features import FeatureContext, encode_features, pipeline_for_columns
+
+RESULT_COLUMNS = ['driver_code', 'team', 'grid', 'position']
+
+def build_race_features(training_feature_columns, full_dataset, race_weekend_data):
+    """
+    Crée les features d'une course, encodées et alignées sur les colonnes du modèle.
+    `full_dataset` peut être un DataFrame ou un FeatureContext partagé entre les courses.
+    Seuls les nœuds de features utilisés par le modèle sont calculés.
+    Retourne None si les features ne peuvent pas être générées.
+    """
+    features_df_raw = pipeline_for_columns(training_feature_columns).transform(full_dataset, race_weekend_data)
+    if features_df_raw.empty:
+        return None
+    return encode_features(features_df_raw, training_feature_columns)
+
+def format_prediction_results(race_weekend_data, features_index, predictions):
+    """Tableau de résultats d'une course (positions réelles, valeur et rang prédits)."""
+    result_df = race_weekend_data[RESULT_COLUMNS].rename(columns={'position': 'ActualPosition'})
+    # Assurer que l'index de result_df correspond à celui des features pour l'assignation
+    result_df = result_df.set_index(features_index)
+    result_df['PredictedPositionValue'] = predictions
+    result_df = result_df.sort_values(by='PredictedPositionValue').reset_index(drop=True)
+    result_df['PredictedRank'] = result_df.index + 1
+    return result_df
+
+def predict_season(model, training_feature_columns, full_dataset, year, max_round=None):
+    """
+    Prédictions de toutes les courses d'une saison (jusqu'à la manche `max_round`), en un seul
+    model.predict. Tableau de format_prediction_results avec les colonnes year et round.
+    """
+    dataset = full_dataset.full_df if isinstance(full_dataset, FeatureContext) else full_dataset
+    season = dataset[dataset['year'] == year]
+    if max_round is not None:
+        season = season[season['round'] <= max_round]
+    races = []
+    for rnd, race_weekend_data in season.groupby('round', sort=True):
+        features_df = build_race_features(training_feature_columns, full_dataset, race_weekend_data)
+        if features_df is not None:
+            races.append((rnd, race_weekend_data, features_df))
+    if not races:
+        return pd.DataFrame(columns=['year', 'round'] + RESULT_COLUMNS)
+
+    predictions = model.predict(pd.concat([features_df for _, _, features_df in races]))
+    frames, start = [], 0
+    for rnd, race_weekend_data, features_df in races:
+        end = start + len(features_df)
+        result_df = format_prediction_results(race_weekend_data, features_df.index, predictions[start:end])
+        frames.append(result_df.assign(year=year, round=rnd))
+        start = end
+    return pd.concat(frames, ignore_index=True)
 
 def run_prediction(model, training_feature_columns, full_dataset, year, race_name):
     """
     Orchestre tout le processus de prédiction pour une course donnée.
     """
     try:
+        dataset = full_dataset.full_df if isinstance(full_dataset, FeatureContext) else full_dataset
         # 1. Isoler les données du week-end pour la prédiction
-        race_weekend_data = full_dataset[
-            (full_dataset['year'] == year) & 
-            (full_dataset['race_name'] == race_name)
+        race_weekend_data = dataset[
+            (dataset['year'] == year) &
+            (dataset['race_name'] == race_name)
         ].copy()
 
         if race_weekend_data.empty:
             return f"Course '{race_name} {year}' non trouvée dans le jeu de données."
 
-        actual_positions = race_weekend_data[['driver_code', 'team', 'grid', 'position']].copy()
-        
-        # 2. Créer les features
-        features_df_raw = create_features(full_dataset, race_weekend_data)
-        if features_df_raw.empty: return "Impossible de générer les features."
-        
-        # 3. Appliquer le One-Hot Encoding
-        categorical_features = ['team', 'race_name']
-        features_df_encoded = pd.get_dummies(features_df_raw, columns=categorical_features, prefix=categorical_features)
-        
-        # 4. Aligner le DataFrame sur les colonnes du modèle
-        features_df_aligned = features_df_encoded.reindex(columns=training_feature_columns, fill_value=0)
-        
+        # 2-4. Créer les features, appliquer le One-Hot Encoding et aligner sur les colonnes du modèle
+        features_df_aligned = build_race_features(training_feature_columns, full_dataset, race_weekend_data)
+        if features_df_aligned is None: return "Impossible de générer les features."
+
         # 5. Prédire
         predictions = model.predict(features_df_aligned)
-        
+
         # 6. Préparer le tableau de résultats
-        result_df = actual_positions.rename(columns={'position': 'ActualPosition'})
-        # Assurer que l'index de result_df correspond à celui de features_df_aligned pour l'assignation
-        result_df = result_df.set_index(features_df_aligned.index)
-        result_df['PredictedPositionValue'] = predictions
-        result_df = result_df.sort_values(by='PredictedPositionValue').reset_index(drop=True)
-        result_df['PredictedRank'] = result_df.index + 1
-        
-        return result_df
+        return format_prediction_results(race_weekend_data, features_df_aligned.index, predictions)
 
     except FileNotFoundError:
         return "ERREUR CRITIQUE : Fichier de modèle (.joblib) ou de colonnes (.json) non trouvé. Veuillez exécuter 'model_training.py' d'abord."
     except Exception as e:
         import traceback
-        return f"Erreur inattendue : {e}\n{traceback.format_exc()}"
\ No newline at end of file
+        return f"Erreur inattendue : {e}\n{traceback.format_exc()}"
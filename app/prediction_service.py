@@ -0,0 +1,306 @@
+# prediction_service.py
+# Service HTTP de prédiction (FastAPI), indépendant de Streamlit.
+#
+# Lancement depuis le dossier `app` :
+#     python prediction_service.py --port 8000
+# Points d'accès :
+#     GET /predict/{year}/{race}      -> classement prédit d'une course (race = numéro de manche ou nom du GP)
+#     GET /predict/season/{year}      -> classements prédits de toutes les courses de la saison
+#     GET /health
+#
+# Le modèle et le jeu de données sont chargés une seule fois au démarrage. Les features de
+# chaque course sont calculées une fois puis gardées en mémoire, et les requêtes simultanées
+# sont regroupées (micro-batching) en un seul appel à model.predict.
+import argparse
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import numpy as np
+import pandas as pd
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse
+
+from utils import HISTORICAL_DATA_PATH, YEAR_COLUMN, GP_NAME_COLUMN
+from data_service import prepare_ml_dataset
+from prediction_logic import build_race_features, RESULT_COLUMNS
+from f1features import FeatureContext
+from train_model.model_registry import load_active_model, model_stamp
+
+MODEL_DIR = "models"
+# Intervalle minimal entre deux vérifications (un stat) d'une nouvelle version dans le registre
+MODEL_POLL_INTERVAL_S = 2.0
+
+# Micro-batching : on attend au plus MAX_BATCH_WAIT_S après la première requête,
+# ou jusqu'à MAX_BATCH_ROWS lignes de features, avant d'appeler model.predict
+MAX_BATCH_WAIT_S = 0.005
+MAX_BATCH_ROWS = 2048
+
+
+class PredictionBatcher:
+    """
+    Regroupe les demandes de prédiction concurrentes : chaque demande dépose ses features
+    dans une file, une tâche de fond les concatène et fait un seul model.predict par lot
+    (un par version du modèle si une bascule à chaud a eu lieu entre deux demandes).
+    """
+
+    def __init__(self, model, max_wait_s=MAX_BATCH_WAIT_S, max_rows=MAX_BATCH_ROWS):
+        self.model = model
+        self.max_wait_s = max_wait_s
+        self.max_rows = max_rows
+        self.queue = asyncio.Queue()
+        self.batches = 0
+        self.requests = 0
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def predict(self, features_df, model=None):
+        """`model` : version figée au début de la demande (par défaut le modèle courant)."""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((features_df, model or self.model, future))
+        return await future
+
+    async def _collect_batch(self):
+        batch = [await self.queue.get()]
+        n_rows = len(batch[0][0])
+        deadline = asyncio.get_running_loop().time() + self.max_wait_s
+        while n_rows < self.max_rows:
+            # On vide d'abord ce qui est déjà en attente, sans céder la main à la boucle
+            if not self.queue.empty():
+                item = self.queue.get_nowait()
+            else:
+                timeout = deadline - asyncio.get_running_loop().time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            batch.append(item)
+            n_rows += len(item[0])
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect_batch()
+            # Les features de versions différentes n'ont pas les mêmes colonnes : un lot par modèle
+            by_model = {}
+            for item in batch:
+                by_model.setdefault(id(item[1]), []).append(item)
+            for items in by_model.values():
+                await self._predict_batch(items[0][1], items)
+
+    async def _predict_batch(self, model, batch):
+        frames = [features for features, _, _ in batch]
+        try:
+            # Le calcul se fait hors de la boucle d'événements pour continuer à accepter des requêtes
+            predictions = await asyncio.to_thread(model.predict, pd.concat(frames, ignore_index=True))
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.batches += 1
+        self.requests += len(batch)
+        bounds = np.cumsum([0] + [len(features) for features in frames])
+        for (_, _, future), start, end in zip(batch, bounds[:-1], bounds[1:]):
+            if not future.done():
+                future.set_result(predictions[start:end])
+
+
+class PredictionState:
+    """Modèle, jeu de données indexé par course et cache des features, partagés par toutes les requêtes."""
+
+    def __init__(self, model, feature_columns, dataset, manifest=None, model_dir=MODEL_DIR):
+        self.model = model
+        self.feature_columns = feature_columns
+        self.manifest = manifest or {}
+        self.dataset = dataset
+        self.feature_context = FeatureContext(dataset)
+        self.batcher = PredictionBatcher(model)
+        self.model_dir = model_dir
+        self.model_stamp = model_stamp(model_dir)
+        self._last_poll = time.monotonic()
+        self._reload_lock = asyncio.Lock()
+        self._features_cache = {}
+        self._features_locks = {}
+
+        # Index (année, manche) -> positions des lignes, et (année, nom du GP en minuscules) -> manche
+        races = dataset[[YEAR_COLUMN, GP_NAME_COLUMN, 'round']].dropna()
+        self.rows_by_race = {
+            (int(year), int(rnd)): rows
+            for (year, rnd), rows in races.groupby([YEAR_COLUMN, 'round']).indices.items()
+        }
+        first_rows = races.drop_duplicates([YEAR_COLUMN, 'round'])
+        self.round_by_name = {
+            (int(year), str(name).lower()): int(rnd)
+            for year, name, rnd in first_rows[[YEAR_COLUMN, GP_NAME_COLUMN, 'round']].itertuples(index=False)
+        }
+        self.rounds_by_year = {}
+        for year, rnd in sorted(self.rows_by_race):
+            self.rounds_by_year.setdefault(year, []).append(rnd)
+
+    @classmethod
+    def load(cls, model_dir=MODEL_DIR, data_path=HISTORICAL_DATA_PATH):
+        model, feature_columns, manifest = load_active_model(model_dir)
+        dataset = prepare_ml_dataset(pd.read_csv(data_path))
+        return cls(model, feature_columns, dataset, manifest, model_dir)
+
+    async def refresh_model(self):
+        """
+        Bascule à chaud vers la nouvelle version active du registre, si elle a changé.
+        Vérifié au plus toutes les MODEL_POLL_INTERVAL_S secondes (un simple stat).
+        """
+        now = time.monotonic()
+        if now - self._last_poll < MODEL_POLL_INTERVAL_S:
+            return
+        self._last_poll = now
+        stamp = model_stamp(self.model_dir)
+        if stamp is None or stamp == self.model_stamp:
+            return
+        async with self._reload_lock:
+            if stamp == self.model_stamp:
+                return
+            try:
+                model, feature_columns, manifest = await asyncio.to_thread(load_active_model, self.model_dir)
+            except Exception as e:
+                print(f"Échec du chargement de la nouvelle version du modèle, ancienne version conservée : {e}")
+                return
+            if feature_columns != self.feature_columns:
+                # Les features alignées dépendent des colonnes du modèle
+                self._features_cache = {}
+                self._features_locks = {}
+            self.model, self.feature_columns, self.manifest = model, feature_columns, manifest
+            self.batcher.model = model
+            self.model_stamp = stamp
+            print(f"Nouveau modèle chargé : version {manifest.get('version')}")
+
+    def resolve_round(self, year, race):
+        """Accepte un numéro de manche ou le nom du Grand Prix (insensible à la casse)."""
+        if race.isdigit() and (year, int(race)) in self.rows_by_race:
+            return int(race)
+        return self.round_by_name.get((year, race.lower()))
+
+    def _build_features(self, key, feature_columns):
+        """
+        Prépare tout ce qui ne dépend pas de la prédiction : nom du GP, features alignées sur
+        `feature_columns` et lignes de résultats (positions réelles) converties en dictionnaires JSON.
+        """
+        race_weekend_data = self.dataset.iloc[self.rows_by_race[key]]
+        features_df = build_race_features(feature_columns, self.feature_context, race_weekend_data)
+        base_records = records_for_json(
+            race_weekend_data[RESULT_COLUMNS].rename(columns={'position': 'ActualPosition'})
+        )
+        return race_weekend_data[GP_NAME_COLUMN].iloc[0], features_df, base_records
+
+    async def race_features(self, key, feature_columns):
+        """
+        Features d'une course pour les colonnes `feature_columns`, calculées une seule fois même
+        sous requêtes concurrentes. Seules les features des colonnes du modèle courant sont
+        gardées en cache (une bascule peut avoir lieu pendant le calcul).
+        """
+        if feature_columns != self.feature_columns:
+            return await asyncio.to_thread(self._build_features, key, feature_columns)
+        cache = self._features_cache
+        if key in cache:
+            return cache[key]
+        lock = self._features_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            if key in cache:
+                return cache[key]
+            features = await asyncio.to_thread(self._build_features, key, feature_columns)
+            if feature_columns == self.feature_columns:
+                self._features_cache[key] = features
+        return features
+
+    async def predict_race(self, year, rnd):
+        await self.refresh_model()
+        # Version figée pour toute la requête : features et prédiction utilisent le même modèle
+        model, feature_columns = self.model, self.feature_columns
+        race_name, features_df, base_records = await self.race_features((year, rnd), feature_columns)
+        if features_df is None:
+            raise HTTPException(status_code=422, detail="Impossible de générer les features.")
+        predictions = await self.batcher.predict(features_df, model)
+        # Même tableau que prediction_logic.format_prediction_results, construit directement en JSON
+        order = np.argsort(predictions, kind='stable')
+        results = [
+            {**base_records[i], 'PredictedPositionValue': float(predictions[i]), 'PredictedRank': rank}
+            for rank, i in enumerate(order, start=1)
+        ]
+        return {'year': year, 'round': rnd, 'race_name': race_name, 'results': results}
+
+
+def records_for_json(df):
+    """Lignes d'un DataFrame en dictionnaires sérialisables (NaN -> null)."""
+    return df.astype(object).where(df.notna(), None).to_dict(orient='records')
+
+
+def create_app(state_loader=PredictionState.load):
+    @asynccontextmanager
+    async def lifespan(app):
+        app.state.predictions = state_loader()
+        app.state.predictions.batcher.start()
+        yield
+        await app.state.predictions.batcher.stop()
+
+    # JSONResponse par défaut : les réponses sont déjà des types JSON natifs, on évite la
+    # conversion récursive (jsonable_encoder) de FastAPI sur chaque ligne de résultats
+    app = FastAPI(title="F1 Prediction Service", lifespan=lifespan, default_response_class=JSONResponse)
+
+    @app.get("/health")
+    async def health():
+        state = app.state.predictions
+        return {
+            'status': 'ok',
+            'model_version': state.manifest.get('version'),
+            'races': len(state.rows_by_race),
+            'cached_features': len(state._features_cache),
+            'batches': state.batcher.batches,
+            'batched_requests': state.batcher.requests,
+        }
+
+    @app.get("/predict/season/{year}")
+    async def predict_season(year: int):
+        state = app.state.predictions
+        rounds = state.rounds_by_year.get(year)
+        if not rounds:
+            raise HTTPException(status_code=404, detail=f"Saison {year} non trouvée dans le jeu de données.")
+        races = await asyncio.gather(*(state.predict_race(year, rnd) for rnd in rounds), return_exceptions=True)
+        return {
+            'year': year,
+            'races': [race for race in races if not isinstance(race, Exception)],
+            'errors': [str(race.detail) if isinstance(race, HTTPException) else str(race)
+                       for race in races if isinstance(race, Exception)],
+        }
+
+    @app.get("/predict/{year}/{race}")
+    async def predict_race(year: int, race: str):
+        state = app.state.predictions
+        rnd = state.resolve_round(year, race)
+        if rnd is None:
+            raise HTTPException(status_code=404, detail=f"Course '{race} {year}' non trouvée dans le jeu de données.")
+        return await state.predict_race(year, rnd)
+
+    return app
+
+
+app = create_app()
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Service HTTP de prédiction des résultats de course.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.port)
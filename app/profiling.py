@@ -0,0 +1,120 @@
+# profiling.py
+# Imports différés des bibliothèques lourdes et mode de profilage du démarrage.
+#
+# Activation du profilage :
+#     F1_APP_PROFILE=1 streamlit run Home.py
+# Chaque page enregistre alors le temps de ses imports, de ses imports différés et sa latence de rendu
+# (en distinguant le premier rendu du processus, i.e. le démarrage à froid) dans
+# PROFILE_LOG_PATH, une ligne JSON par rendu. `python profiling.py` résume ce fichier.
+import importlib
+import json
+import os
+import sys
+import time
+
+PROFILE_ENV_VAR = "F1_APP_PROFILE"
+PROFILE_LOG_PATH = os.environ.get("F1_APP_PROFILE_LOG", os.path.join("logs", "startup_profile.jsonl"))
+
+# Instant de référence : premier import de ce module dans le processus Streamlit
+PROCESS_START = time.perf_counter()
+
+_import_timings = {}
+_rendered_pages = set()
+
+
+def profiling_enabled():
+    return os.environ.get(PROFILE_ENV_VAR, "").lower() in ("1", "true", "yes")
+
+
+def lazy_import(module_name):
+    """
+    Importe un module au moment où il est réellement utilisé (onglet, bouton...).
+    Le temps du premier import est mémorisé pour le rapport de profilage.
+    """
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    _import_timings[module_name] = time.perf_counter() - start
+    return module
+
+
+def _write_profile_record(record):
+    os.makedirs(os.path.dirname(PROFILE_LOG_PATH) or ".", exist_ok=True)
+    with open(PROFILE_LOG_PATH, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record) + "\n")
+
+
+class PageProfile:
+    """
+    Mesure le rendu d'une page Streamlit, du haut du script jusqu'à finish().
+    Usage dans une page (les imports de la page sont placés entre start et imports_done) :
+        page_profile = start_page_profile("3_Machine_Learning")
+        import ...
+        page_profile.imports_done()
+        ...
+        page_profile.finish()
+    Sans F1_APP_PROFILE, toutes les méthodes sont sans effet. Un rendu interrompu par
+    st.stop() n'est pas enregistré.
+    """
+
+    def __init__(self, page_name):
+        self.page_name = page_name
+        self.enabled = profiling_enabled()
+        self.first_render = page_name not in _rendered_pages
+        self.imports_before = dict(_import_timings)
+        self.start = time.perf_counter()
+        self.imports_s = None
+
+    def imports_done(self):
+        if self.enabled:
+            self.imports_s = time.perf_counter() - self.start
+
+    def finish(self):
+        if not self.enabled:
+            return
+        render_s = time.perf_counter() - self.start
+        _rendered_pages.add(self.page_name)
+        new_imports = {
+            name: round(duration, 4) for name, duration in _import_timings.items()
+            if name not in self.imports_before
+        }
+        record = {
+            'timestamp': time.time(),
+            'page': self.page_name,
+            'first_render': self.first_render,
+            'imports_s': round(self.imports_s, 4) if self.imports_s is not None else None,
+            'render_s': round(render_s, 4),
+            'since_process_start_s': round(time.perf_counter() - PROCESS_START, 4),
+            'lazy_imports_s': new_imports,
+        }
+        _write_profile_record(record)
+        print(f"[profil] {self.page_name} : rendu en {render_s:.3f}s"
+              f"{' (premier rendu)' if self.first_render else ''}, imports différés : {new_imports or 'aucun'}")
+
+
+def start_page_profile(page_name):
+    return PageProfile(page_name)
+
+
+def summarize_profile(log_path=PROFILE_LOG_PATH):
+    """Résume le journal de profilage par page, en séparant le premier rendu (démarrage à froid) des suivants."""
+    import pandas as pd
+
+    if not os.path.exists(log_path):
+        print(f"Aucun journal de profilage trouvé ({log_path}). Lancez l'application avec {PROFILE_ENV_VAR}=1.")
+        return None
+    records = pd.read_json(log_path, lines=True)
+    summary = (
+        records.groupby(['page', 'first_render'])
+        .agg(count=('render_s', 'size'), imports_median=('imports_s', 'median'),
+             render_median=('render_s', 'median'), render_p95=('render_s', lambda s: s.quantile(0.95)),
+             render_max=('render_s', 'max'))
+        .round(3)
+    )
+    print(summary.to_string())
+    return summary
+
+
+if __name__ == "__main__":
+    summarize_profile()
@@ -0,0 +1,245 @@
+# race_simulation.py
+# Simulation Monte Carlo du classement d'une course à partir des prédictions du modèle.
+#
+# Chaque simulation tire, pour chaque pilote, une erreur du modèle (position réelle - rang
+# prédit) parmi les erreurs observées pour sa place sur la grille, et un abandon selon son
+# taux d'abandon historique. Le classement simulé trie les rangs prédits + erreurs ; on en
+# déduit les probabilités de victoire, de podium, de points et d'abandon.
+# Tout est vectorisé avec NumPy sur une matrice (simulations x pilotes) : aucune boucle Python
+# par simulation.
+#
+# La projection du championnat applique le même tirage aux manches restantes de la saison,
+# sur un tableau (simulations x courses x pilotes) traité par paquets de simulations.
+import os
+
+import numpy as np
+import pandas as pd
+
+N_SIMULATIONS = 10000
+# Place sur la grille au-delà de laquelle les erreurs sont regroupées (et 0 = stands / inconnue)
+MAX_GRID_SLOT = 20
+# En dessous, les erreurs d'une place sont remplacées par celles de toutes les places
+MIN_POOL_SIZE = 30
+POINTS_POSITIONS = 10
+# Résultats comptés comme abandons (les "+1 lap" sont classés)
+DNF_MARKERS = ('DNF', 'DNS')
+# Lissage des taux d'abandon : équivalent de N courses au taux global
+DNF_PRIOR_RACES = 10
+# Prédictions hors échantillon écrites par train_model/backtest.py
+BACKTEST_PREDICTIONS_PATH = "data/backtest_predictions.csv"
+
+PROBABILITY_COLUMNS = ['P_Win', 'P_Podium', 'P_Points', 'P_DNF', 'ExpectedPosition']
+
+# Barème des points (1er au 10e)
+POINTS_TABLE = [25, 18, 15, 12, 10, 8, 6, 4, 2, 1]
+SEASON_SIMULATIONS = 10000
+# Simulations de saison par paquet : (paquet x courses x pilotes) reste de l'ordre de 20 Mo
+SEASON_CHUNK_SIMULATIONS = 5000
+# Nombre de courses récentes pour estimer le niveau de chaque pilote
+FORM_RACES = 5
+
+
+def grid_slots(grid):
+    """Place sur la grille bornée à [0, MAX_GRID_SLOT] ; 0 pour un départ des stands ou inconnu."""
+    grid = pd.to_numeric(pd.Series(grid), errors='coerce').fillna(0).to_numpy()
+    return np.clip(grid, 0, MAX_GRID_SLOT).astype(np.int64)
+
+
+class ResidualPool:
+    """
+    Erreurs du modèle (position réelle - rang prédit) par place sur la grille, rangées dans un
+    seul tableau à plat (offset et taille par place) pour un tirage vectorisé.
+    """
+
+    def __init__(self, grid, predicted_rank, actual_position):
+        residuals = (pd.to_numeric(pd.Series(actual_position), errors='coerce').to_numpy(dtype=float)
+                     - pd.to_numeric(pd.Series(predicted_rank), errors='coerce').to_numpy(dtype=float))
+        valid = ~np.isnan(residuals)
+        residuals, slots = residuals[valid], grid_slots(grid)[valid]
+        if len(residuals) == 0:
+            raise ValueError("Aucune erreur de prédiction disponible pour la simulation.")
+
+        order = np.argsort(slots, kind='stable')
+        counts = np.bincount(slots, minlength=MAX_GRID_SLOT + 1)
+        # Les erreurs de toutes les places sont ajoutées en fin de tableau (pool global)
+        self.values = np.concatenate([residuals[order], residuals])
+        global_offset = len(residuals)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        small = counts < MIN_POOL_SIZE
+        self.offsets = np.where(small, global_offset, starts)
+        self.sizes = np.where(small, len(residuals), counts)
+        self.n_residuals = len(residuals)
+
+    @classmethod
+    def from_results(cls, results_df):
+        """Depuis un tableau de résultats (colonnes grid, PredictedRank, ActualPosition)."""
+        return cls(results_df['grid'], results_df['PredictedRank'], results_df['ActualPosition'])
+
+    def sample(self, slots, n_sims, rng):
+        """Matrice (n_sims, len(slots)) d'erreurs tirées dans le pool de la place de chaque pilote."""
+        u = rng.random((n_sims, len(slots)))
+        idx = self.offsets[slots] + (u * self.sizes[slots]).astype(np.int64)
+        return self.values[idx]
+
+
+def load_residual_pool(path=BACKTEST_PREDICTIONS_PATH):
+    """Pool des erreurs hors échantillon du backtest, ou None si le backtest n'a pas été lancé."""
+    if not os.path.exists(path):
+        return None
+    return ResidualPool.from_results(pd.read_csv(path))
+
+
+def dnf_probabilities(history_df, driver_codes):
+    """
+    Probabilité d'abandon de chaque pilote d'après l'historique (`time_or_retired`), lissée vers
+    le taux global : (abandons + p_global * N) / (courses + N).
+    """
+    driver_codes = pd.Series(driver_codes)
+    if history_df.empty or 'time_or_retired' not in history_df.columns:
+        return np.zeros(len(driver_codes))
+    is_dnf = history_df['time_or_retired'].isin(DNF_MARKERS)
+    global_rate = is_dnf.mean()
+    per_driver = is_dnf.groupby(history_df['driver_code']).agg(['sum', 'count'])
+    dnf = driver_codes.map(per_driver['sum']).fillna(0).to_numpy()
+    races = driver_codes.map(per_driver['count']).fillna(0).to_numpy()
+    return (dnf + global_rate * DNF_PRIOR_RACES) / (races + DNF_PRIOR_RACES)
+
+
+def simulate_race(predicted_values, grid, residual_pool, dnf_prob, n_sims=N_SIMULATIONS, seed=None):
+    """
+    Simule `n_sims` courses et retourne un dict {colonne: tableau par pilote} des probabilités
+    de victoire, de podium, de points et d'abandon, et de la position moyenne (abandons en fin
+    de classement).
+    """
+    rng = np.random.default_rng(seed)
+    n_drivers = len(predicted_values)
+    predicted_rank = pd.Series(predicted_values).rank(method='first').to_numpy()
+
+    scores = predicted_rank + residual_pool.sample(grid_slots(grid), n_sims, rng)
+    # Départage aléatoire des égalités (les erreurs sont des entiers)
+    scores += rng.random((n_sims, n_drivers)) * 0.5
+    dnf = rng.random((n_sims, n_drivers)) < np.asarray(dnf_prob, dtype=float)
+    scores[dnf] = np.inf
+
+    # Position de chaque pilote dans chaque simulation
+    order = np.argsort(scores, axis=1)
+    positions = np.empty((n_sims, n_drivers), dtype=np.int64)
+    np.put_along_axis(positions, order, np.arange(1, n_drivers + 1), axis=1)
+    classified = ~dnf
+
+    return {
+        'P_Win': ((positions == 1) & classified).mean(axis=0),
+        'P_Podium': ((positions <= 3) & classified).mean(axis=0),
+        'P_Points': ((positions <= POINTS_POSITIONS) & classified).mean(axis=0),
+        'P_DNF': dnf.mean(axis=0),
+        'ExpectedPosition': positions.mean(axis=0),
+    }
+
+
+def simulate_prediction_results(result_df, residual_pool, history_df, n_sims=N_SIMULATIONS, seed=None):
+    """
+    Ajoute les probabilités simulées à un tableau de prediction_logic.format_prediction_results.
+    `history_df` : résultats antérieurs à la course (taux d'abandon).
+    """
+    probabilities = simulate_race(
+        result_df['PredictedPositionValue'].to_numpy(), result_df['grid'], residual_pool,
+        dnf_probabilities(history_df, result_df['driver_code']), n_sims, seed
+    )
+    return result_df.assign(**probabilities)
+
+
+def _race_positions(scores):
+    """Positions (1 = premier) le long du dernier axe d'un tableau de scores."""
+    order = np.argsort(scores, axis=-1)
+    positions = np.empty(scores.shape, dtype=np.int64)
+    ranks = np.broadcast_to(np.arange(1, scores.shape[-1] + 1), scores.shape)
+    np.put_along_axis(positions, order, ranks, axis=-1)
+    return positions
+
+
+def simulate_championship(drivers, teams, n_races, residual_pool, n_sims=SEASON_SIMULATIONS,
+                          chunk_size=SEASON_CHUNK_SIMULATIONS, seed=None):
+    """
+    Simule `n_races` courses restantes `n_sims` fois et retourne (drivers, teams) complétés par
+    P_Title (probabilité de titre) et ExpectedPoints (points finaux moyens).
+
+    `drivers` : un pilote par ligne, colonnes team, points (points actuels), base_rank (rang
+    attendu en course, NaN s'il ne court plus) et dnf_prob.
+    `teams` : une écurie par ligne, colonnes team et points (points actuels).
+    Les simulations sont traitées par paquets de `chunk_size` : la mémoire dépend de la taille
+    d'un paquet, pas de n_sims (100 000 saisons tiennent dans quelques dizaines de Mo).
+    """
+    rng = np.random.default_rng(seed)
+    current_points = drivers['points'].to_numpy(dtype=float)
+    team_points = teams['points'].to_numpy(dtype=float)
+    active = np.flatnonzero(drivers['base_rank'].notna().to_numpy())
+    base_rank = drivers['base_rank'].to_numpy(dtype=float)[active]
+    dnf_prob = drivers['dnf_prob'].to_numpy(dtype=float)[active]
+    slots = grid_slots(np.rint(base_rank))
+
+    # Matrice pilotes actifs x écuries pour sommer les points par écurie
+    team_index = pd.Index(teams['team']).get_indexer(drivers['team'].to_numpy()[active])
+    team_matrix = np.zeros((len(active), len(teams)))
+    team_matrix[team_index >= 0, team_index[team_index >= 0]] = 1.0
+
+    points_by_position = np.zeros(len(active) + 1)
+    n_scoring = min(len(POINTS_TABLE), len(active))
+    points_by_position[1:n_scoring + 1] = POINTS_TABLE[:n_scoring]
+
+    driver_titles = np.zeros(len(drivers))
+    team_titles = np.zeros(len(teams))
+    driver_sum = np.zeros(len(drivers))
+    team_sum = np.zeros(len(teams))
+    for start in range(0, n_sims, chunk_size):
+        size = min(chunk_size, n_sims - start)
+        future = np.zeros((size, len(active)))
+        if n_races > 0 and len(active) > 0:
+            shape = (size, n_races, len(active))
+            scores = base_rank + residual_pool.sample(slots, size * n_races, rng).reshape(shape)
+            scores += rng.random(shape) * 0.5
+            dnf = rng.random(shape) < dnf_prob
+            scores[dnf] = np.inf
+            race_points = points_by_position[_race_positions(scores)]
+            race_points[dnf] = 0.0
+            future = race_points.sum(axis=1)
+
+        driver_totals = np.broadcast_to(current_points, (size, len(drivers))).copy()
+        driver_totals[:, active] += future
+        team_totals = team_points + future @ team_matrix
+        # Départage aléatoire des égalités de points pour le titre
+        driver_titles += np.bincount(np.argmax(driver_totals + rng.random(driver_totals.shape) * 1e-3, axis=1),
+                                     minlength=len(drivers))
+        team_titles += np.bincount(np.argmax(team_totals + rng.random(team_totals.shape) * 1e-3, axis=1),
+                                   minlength=len(teams))
+        driver_sum += driver_totals.sum(axis=0)
+        team_sum += team_totals.sum(axis=0)
+
+    drivers = drivers.assign(P_Title=driver_titles / n_sims, ExpectedPoints=driver_sum / n_sims)
+    teams = teams.assign(P_Title=team_titles / n_sims, ExpectedPoints=team_sum / n_sims)
+    return (drivers.sort_values('ExpectedPoints', ascending=False, kind='mergesort').reset_index(drop=True),
+            teams.sort_values('ExpectedPoints', ascending=False, kind='mergesort').reset_index(drop=True))
+
+
+def championship_inputs(season_df, season_predictions, after_round, history_df):
+    """
+    Tableaux pilotes et écuries de simulate_championship après la manche `after_round` :
+    points actuels, pilotes de la dernière manche courue (avec leur écurie), rang attendu
+    (moyenne des rangs prédits par le modèle sur leurs FORM_RACES dernières courses) et
+    probabilité d'abandon d'après `history_df`.
+    """
+    completed = season_df[season_df['round'] <= after_round]
+    drivers = completed.groupby('driver_code', sort=False).agg(
+        driver_name=('driver_name', 'last'), team=('team', 'last'), points=('points', 'sum')
+    ).reset_index()
+    drivers['points'] = drivers['points'].fillna(0.0)
+    teams = completed.groupby('team', sort=False)['points'].sum().fillna(0.0).reset_index()
+
+    lineup = completed[completed['round'] == completed['round'].max()]
+    recent = season_predictions[season_predictions['round'] <= after_round].sort_values('round')
+    form = recent.groupby('driver_code')['PredictedRank'].apply(lambda ranks: ranks.tail(FORM_RACES).mean())
+    in_lineup = drivers['driver_code'].isin(lineup['driver_code'])
+    # Pilote sans prédiction récente : milieu de grille
+    default_rank = (len(lineup) + 1) / 2
+    drivers['base_rank'] = drivers['driver_code'].map(form).fillna(default_rank).where(in_lineup)
+    drivers['dnf_prob'] = dnf_probabilities(history_df, drivers['driver_code'])
+    return drivers, teams
@@ -0,0 +1,121 @@
+# shared_data.py
+# Jeux de données partagés entre plusieurs processus Streamlit d'une même machine.
+#
+# Activation :
+#     F1_SHARED_DATA=1 streamlit run Home.py --server.port 8501
+#     F1_SHARED_DATA=1 streamlit run Home.py --server.port 8502
+# Chaque CSV est lu et préparé une seule fois, puis enregistré au format Arrow IPC dans
+# SHARED_DATA_DIR. Les processus ouvrent ce fichier en mémoire mappée (lecture seule) : les
+# colonnes numériques et les chaînes (type string Arrow) pointent directement dans le fichier,
+# dont les pages sont partagées par le système entre tous les processus.
+# `python shared_data.py` prépare les fichiers à l'avance (avant de lancer les répliques).
+import hashlib
+import inspect
+import os
+
+import pandas as pd
+import pyarrow as pa
+
+SHARED_DATA_ENV_VAR = "F1_SHARED_DATA"
+SHARED_DATA_DIR = os.environ.get("F1_SHARED_DATA_DIR", os.path.join("data", "shared"))
+STAMP_KEY = b"f1_stamp"
+
+# Chaînes adossées à Arrow, avec la sémantique NaN des colonnes object (comparaisons, masques)
+SHARED_STRING_DTYPE = pd.StringDtype("pyarrow_numpy")
+
+
+def shared_data_enabled():
+    return os.environ.get(SHARED_DATA_ENV_VAR, "").lower() in ("1", "true", "yes")
+
+
+def _stamp(source_path, prepare):
+    """Version d'un jeu partagé : mtime/taille du CSV et code de la préparation. None si le CSV est absent."""
+    try:
+        stat = os.stat(source_path)
+    except OSError:
+        return None
+    try:
+        source = inspect.getsource(prepare) if prepare is not None else ""
+    except (OSError, TypeError):
+        source = repr(prepare.__code__.co_code)
+    fingerprint = hashlib.sha1(source.encode()).hexdigest()
+    return f"{stat.st_mtime_ns}-{stat.st_size}-{fingerprint}"
+
+
+def _to_arrow(df):
+    """
+    Table Arrow d'un DataFrame. Les NaN des colonnes numériques restent des valeurs (et non
+    des nulls Arrow) pour que la relecture ne les convertisse pas : les tableaux NumPy
+    pointent alors directement dans le fichier.
+    """
+    arrays = []
+    for col in df.columns:
+        values = df[col]
+        if values.dtype.kind in "biuf":
+            arrays.append(pa.array(values.to_numpy(), from_pandas=False))
+        elif values.dtype == object or isinstance(values.dtype, pd.StringDtype):
+            arrays.append(pa.array(values.astype(SHARED_STRING_DTYPE).to_numpy(na_value=None), type=pa.large_string()))
+        else:
+            arrays.append(pa.array(values, from_pandas=True))
+    return pa.Table.from_arrays(arrays, names=[str(col) for col in df.columns])
+
+
+def _read_stamp(path):
+    try:
+        with pa.memory_map(path, 'r') as source:
+            metadata = pa.ipc.open_file(source).schema.metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+    return metadata.get(STAMP_KEY, b"").decode() or None
+
+
+def _write(df, path, stamp):
+    table = _to_arrow(df)
+    table = table.replace_schema_metadata({STAMP_KEY: stamp.encode()})
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # Écriture atomique : un fichier temporaire par processus, puis renommage. Les processus qui
+    # ont déjà mappé l'ancienne version la gardent jusqu'à la fermeture.
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def _map(path):
+    """DataFrame en mémoire mappée, sans copie des colonnes (tableaux en lecture seule)."""
+    table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    strings = {pa.large_string(): SHARED_STRING_DTYPE, pa.string(): SHARED_STRING_DTYPE}
+    return table.to_pandas(split_blocks=True, types_mapper=strings.get)
+
+
+def load_shared_frame(name, source_path, prepare=None):
+    """
+    DataFrame `name` : le CSV `source_path` préparé par `prepare` (DataFrame -> DataFrame),
+    matérialisé une fois en Arrow IPC puis mappé en mémoire. Le fichier est reconstruit si le
+    CSV ou la fonction de préparation change. DataFrame vide si le CSV est absent.
+    """
+    stamp = _stamp(source_path, prepare)
+    if stamp is None:
+        return pd.DataFrame()
+    path = os.path.join(SHARED_DATA_DIR, f"{name}.arrow")
+    if _read_stamp(path) != stamp:
+        print(f"Données partagées : préparation de '{name}' depuis {source_path}...")
+        df = pd.read_csv(source_path)
+        if prepare is not None:
+            df = prepare(df)
+        try:
+            _write(df, path, stamp)
+        except OSError as e:
+            # Dossier en lecture seule : le processus garde sa propre copie
+            print(f"Données partagées : impossible d'enregistrer '{name}' ({e})")
+            return df
+    return _map(path)
+
+
+if __name__ == "__main__":
+    import data_service
+
+    for name, (source_path, prepare) in data_service.shared_datasets().items():
+        df = load_shared_frame(name, source_path, prepare)
+        size = os.path.getsize(os.path.join(SHARED_DATA_DIR, f"{name}.arrow")) if not df.empty else 0
+        print(f"  - {name} : {len(df)} lignes, {size / 1e6:.1f} Mo")
@@ -0,0 +1,186 @@
+# backtest.py
+# Évaluation "walk-forward" du modèle sur l'historique complet.
+#
+# Pour chaque manche, dans l'ordre chronologique, un modèle est entraîné uniquement sur les
+# manches précédentes, puis prédit la manche. On enregistre par course le MAE (rang prédit vs
+# position réelle), la corrélation de Spearman et le taux de podium trouvé (top 3).
+#
+# Les chemins par défaut viennent de config.py, comme pour model_training.py :
+#     python app/train_model/backtest.py
+#     python app/train_model/backtest.py --data app/data/F1_ALL_DATA_2020_2025.csv --retrain-every 3 --workers 4
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import lightgbm as lgb
+from joblib import Parallel, delayed
+from scipy.stats import spearmanr
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from config import *
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from f1features import FeatureContext, NodeCache, create_features, encode_features
+
+BACKTEST_RESULTS_PATH = DATA_DIR / "backtest_results.csv"
+# Prédictions hors échantillon par pilote (erreurs utilisées par race_simulation.py)
+BACKTEST_PREDICTIONS_PATH = DATA_DIR / "backtest_predictions.csv"
+MIN_TRAIN_RACES = 10
+
+
+def add_round_column(historical_df):
+    """Génère la colonne 'round' si manquante (même logique que model_training.py)."""
+    if 'round' in historical_df.columns:
+        return historical_df
+    historical_df['race_id'] = pd.to_numeric(historical_df['race_id'], errors='coerce')
+    historical_df = historical_df.dropna(subset=['race_id'])
+    historical_df['race_id'] = historical_df['race_id'].astype(int)
+    rounds_map = historical_df[['year', 'race_id']].drop_duplicates().sort_values(by=['year', 'race_id'])
+    rounds_map['round'] = rounds_map.groupby('year').cumcount() + 1
+    return pd.merge(historical_df, rounds_map[['race_id', 'round']], on='race_id', how='left')
+
+
+def _race_features(historical_df, race_id, feature_context):
+    race_weekend_data = historical_df[historical_df['race_id'] == race_id]
+    features = create_features(feature_context, race_weekend_data)
+    features['race_id'] = race_id
+    features['position'] = pd.to_numeric(race_weekend_data['position'], errors='coerce').to_numpy()
+    return features
+
+
+def build_bulk_features(historical_df):
+    """
+    Features de toutes les courses, calculées une seule fois et réutilisées par tous les plis.
+    create_features n'utilise que les manches antérieures à la course : chaque ligne est donc
+    déjà "au point dans le temps" et peut servir pour n'importe quel pli ultérieur.
+    Les jointures sur l'historique sont faites une fois pour tout le jeu de données par le
+    FeatureContext partagé : un seul processus suffit (les plis, eux, sont parallélisés).
+    """
+    race_ids = historical_df['race_id'].unique()
+    # Même cache disque que model_training.py : les nœuds inchangés sont relus
+    feature_cache = NodeCache(FEATURE_CACHE_DIR)
+    feature_context = FeatureContext(historical_df, node_cache=feature_cache)
+    feature_list = [_race_features(historical_df, race_id, feature_context) for race_id in race_ids]
+    feature_cache.save()
+    features = pd.concat(feature_list, ignore_index=True)
+    return encode_features(features)
+
+
+def make_pipeline():
+    # n_jobs=1 : le parallélisme se fait au niveau des plis
+    return Pipeline([
+        ('scaler', StandardScaler()),
+        ('regressor', lgb.LGBMRegressor(objective='regression_l1', random_state=42, n_jobs=1, verbose=-1))
+    ])
+
+
+def race_metrics(predicted_values, actual_positions):
+    """MAE des rangs, corrélation de Spearman et taux de podium trouvé pour une course."""
+    predicted_rank = pd.Series(predicted_values).rank(method='first').to_numpy()
+    finished = ~np.isnan(actual_positions)
+    if finished.sum() < 3:
+        return np.nan, np.nan, np.nan
+    mae = np.abs(predicted_rank[finished] - actual_positions[finished]).mean()
+    spearman = spearmanr(predicted_values[finished], actual_positions[finished]).statistic
+    predicted_podium = set(np.flatnonzero(predicted_rank <= 3))
+    actual_podium = set(np.flatnonzero(actual_positions <= 3))
+    top3_hit_rate = len(predicted_podium & actual_podium) / 3
+    return mae, spearman, top3_hit_rate
+
+
+def run_fold(X, y, race_codes, train_end, test_codes):
+    """
+    Entraîne sur les courses d'indice chronologique < train_end, puis prédit chaque course
+    de `test_codes` (plusieurs si le modèle n'est réentraîné que toutes les N manches).
+    Retourne les métriques par course et les prédictions (lignes de X, valeurs prédites).
+    """
+    train_mask = (race_codes < train_end) & ~np.isnan(y)
+    pipeline = make_pipeline()
+    pipeline.fit(X[train_mask], y[train_mask])
+
+    rows, predicted = [], []
+    for code in test_codes:
+        test_mask = race_codes == code
+        predictions = pipeline.predict(X[test_mask])
+        mae, spearman, top3 = race_metrics(predictions, y[test_mask])
+        rows.append({
+            'race_index': code, 'train_races': train_end, 'train_rows': int(train_mask.sum()),
+            'mae': mae, 'spearman': spearman, 'top3_hit_rate': top3
+        })
+        predicted.append((np.flatnonzero(test_mask), predictions))
+    return rows, predicted
+
+
+def run_backtest(data_path=HISTORICAL_DATA_PATH, min_train_races=MIN_TRAIN_RACES, retrain_every=1,
+                 workers=None, output_path=BACKTEST_RESULTS_PATH, predictions_path=BACKTEST_PREDICTIONS_PATH):
+    start = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    print("--- Lancement du backtest walk-forward ---")
+    print(f"Chargement du fichier de données historiques : {data_path}")
+    historical_df = add_round_column(pd.read_csv(data_path))
+
+    # Ordre chronologique des courses
+    races = (historical_df[['race_id', 'year', 'round', 'race_name']]
+             .drop_duplicates('race_id').sort_values(['year', 'round']).reset_index(drop=True))
+    print(f"Préparation des features pour {len(races)} courses...")
+    features = build_bulk_features(historical_df)
+    print(f"  - Features prêtes en {time.perf_counter() - start:.1f}s")
+
+    race_index = pd.Series(races.index.to_numpy(), index=races['race_id'])
+    race_codes = features['race_id'].map(race_index).to_numpy()
+    y = features['position'].to_numpy(dtype=float)
+    X = features.drop(columns=['race_id', 'position']).to_numpy(dtype=np.float32)
+
+    # Plis : le modèle entraîné sur les `train_end` premières courses prédit les `retrain_every` suivantes
+    folds = [
+        (train_end, list(range(train_end, min(train_end + retrain_every, len(races)))))
+        for train_end in range(min_train_races, len(races), retrain_every)
+    ]
+    print(f"Exécution de {len(folds)} plis (réentraînement toutes les {retrain_every} manche(s))...")
+    # joblib partage X entre les processus par memmap au lieu de le copier pour chaque pli
+    fold_outputs = Parallel(n_jobs=workers)(
+        delayed(run_fold)(X, y, race_codes, train_end, test_codes) for train_end, test_codes in folds
+    )
+
+    results = pd.DataFrame([row for rows, _ in fold_outputs for row in rows])
+    results = races.join(results.set_index('race_index'), how='inner')
+    results.to_csv(output_path, index=False)
+
+    # Prédictions par pilote, au format de prediction_logic.format_prediction_results
+    predicted_rows = [(rows, values) for _, predicted in fold_outputs for rows, values in predicted]
+    predictions = pd.concat([
+        pd.DataFrame({
+            'race_id': features['race_id'].to_numpy()[rows],
+            'grid': features['grid'].to_numpy()[rows],
+            'ActualPosition': y[rows],
+            'PredictedPositionValue': values,
+            'PredictedRank': pd.Series(values).rank(method='first').to_numpy(dtype=np.int64),
+        })
+        for rows, values in predicted_rows
+    ], ignore_index=True)
+    predictions.to_csv(predictions_path, index=False)
+
+    print("\nRésultats par saison :")
+    print(results.groupby('year')[['mae', 'spearman', 'top3_hit_rate']].mean().round(3).to_string())
+    print(f"\nGlobal : MAE {results['mae'].mean():.2f}, Spearman {results['spearman'].mean():.3f}, "
+          f"podium trouvé {results['top3_hit_rate'].mean():.1%}")
+    print(f"✅ Backtest terminé en {time.perf_counter() - start:.1f}s. Détail par course : '{output_path}', "
+          f"prédictions par pilote : '{predictions_path}'")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest walk-forward du modèle de prédiction.")
+    parser.add_argument("--data", default=HISTORICAL_DATA_PATH)
+    parser.add_argument("--min-train-races", type=int, default=MIN_TRAIN_RACES)
+    parser.add_argument("--retrain-every", type=int, default=1, help="Réentraîner le modèle toutes les N manches")
+    parser.add_argument("--workers", type=int, default=None, help="Processus en parallèle (défaut : nombre de cœurs)")
+    parser.add_argument("--out", default=BACKTEST_RESULTS_PATH)
+    parser.add_argument("--predictions-out", default=BACKTEST_PREDICTIONS_PATH)
+    args = parser.parse_args()
+    run_backtest(args.data, args.min_train_races, args.retrain_every, args.workers, args.out,
+                 args.predictions_out)
@@ -19,6 +19,9 @@ HISTORICAL_DATA_PATH = DATA_DIR / "F1_ALL_DATA_2020_2024.csv"
 FEATURES_DATA_PATH = DATA_DIR / "F1_FEATURES_ENCODED.csv"
 TEAMS_DATA_PATH = DATA_DIR / "teams_summary_data.csv"
 
+# Cache sur disque des nœuds de features (f1features), réutilisé d'un entraînement à l'autre
+FEATURE_CACHE_DIR = DATA_DIR / "feature_cache"
+
 
 # --- Chemins du Modèle ---
 
@@ -27,6 +30,7 @@ TEAMS_DATA_PATH = DATA_DIR / "teams_summary_data.csv"
 MODEL_DIR = Path("models")
 MODEL_DIR.mkdir(exist_ok=True)
 
-# Fichiers du modèle
+# Fichiers du modèle historique (avant le registre models/registry, voir model_registry.py).
+# Encore lus par l'application si le registre est vide.
 MODEL_PATH = MODEL_DIR / "f1_lgbm_model.joblib"
 FEATURE_COLUMNS_PATH = MODEL_DIR / "feature_columns.json"
@@ -0,0 +1,163 @@
+# model_registry.py
+# Registre versionné des modèles entraînés.
+#
+#   models/registry/
+#       CURRENT                      <- nom de la version active (une ligne)
+#       20250612-101500-123456/      <- date, heure et microsecondes de la publication
+#           model.joblib
+#           feature_columns.json
+#           manifest.json            <- métriques, liste des features, hash des données...
+#
+# Une version est écrite dans un dossier temporaire puis renommée d'un coup (os.rename),
+# et CURRENT est remplacé atomiquement (os.replace) : un lecteur voit soit l'ancienne
+# version complète, soit la nouvelle, jamais un fichier à moitié écrit.
+# Sans registre (anciens déploiements), on retombe sur models/f1_lgbm_model.joblib.
+import hashlib
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+
+MODEL_FILENAME = "model.joblib"
+FEATURES_FILENAME = "feature_columns.json"
+MANIFEST_FILENAME = "manifest.json"
+CURRENT_FILENAME = "CURRENT"
+KEEP_VERSIONS = 5
+
+LEGACY_MODEL_FILENAME = "f1_lgbm_model.joblib"
+LEGACY_FEATURES_FILENAME = "feature_columns.json"
+
+
+def registry_dir(model_dir="models"):
+    return os.path.join(model_dir, "registry")
+
+
+def file_sha256(path):
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def publish_model(model, feature_columns, metrics=None, data_path=None, model_dir="models", extra=None):
+    """
+    Enregistre une nouvelle version (modèle + features + manifeste) et la rend active.
+    Retourne le nom de la version.
+    """
+    import joblib
+
+    root = registry_dir(model_dir)
+    os.makedirs(root, exist_ok=True)
+    data_hash = file_sha256(data_path) if data_path and os.path.exists(data_path) else None
+    # Noms triables chronologiquement (utilisé par list_versions et prune_versions)
+    version = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+
+    tmp_dir = os.path.join(root, f".{version}.tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    joblib.dump(model, os.path.join(tmp_dir, MODEL_FILENAME))
+    _write_json(os.path.join(tmp_dir, FEATURES_FILENAME), list(feature_columns))
+    _write_json(os.path.join(tmp_dir, MANIFEST_FILENAME), {
+        'version': version,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'model_type': type(model).__name__,
+        'metrics': metrics or {},
+        'n_features': len(feature_columns),
+        'features': list(feature_columns),
+        'data_path': str(data_path) if data_path else None,
+        'data_sha256': data_hash,
+        'model_sha256': file_sha256(os.path.join(tmp_dir, MODEL_FILENAME)),
+        **(extra or {}),
+    })
+    os.rename(tmp_dir, os.path.join(root, version))
+
+    # Bascule atomique du pointeur vers la nouvelle version
+    pointer_tmp = os.path.join(root, CURRENT_FILENAME + ".tmp")
+    with open(pointer_tmp, 'w', encoding='utf-8') as f:
+        f.write(version + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(pointer_tmp, os.path.join(root, CURRENT_FILENAME))
+
+    prune_versions(model_dir)
+    return version
+
+
+def list_versions(model_dir="models"):
+    """Versions complètes présentes dans le registre, de la plus ancienne à la plus récente."""
+    root = registry_dir(model_dir)
+    if not os.path.isdir(root):
+        return []
+    return sorted(
+        name for name in os.listdir(root)
+        if not name.startswith('.') and os.path.exists(os.path.join(root, name, MANIFEST_FILENAME))
+    )
+
+
+def prune_versions(model_dir="models", keep=KEEP_VERSIONS):
+    """Supprime les plus anciennes versions (jamais la version active)."""
+    active = current_version(model_dir)
+    for version in list_versions(model_dir)[:-keep]:
+        if version != active:
+            shutil.rmtree(os.path.join(registry_dir(model_dir), version), ignore_errors=True)
+
+
+def current_version(model_dir="models"):
+    """Nom de la version active, ou None si le registre est vide."""
+    try:
+        with open(os.path.join(registry_dir(model_dir), CURRENT_FILENAME), 'r', encoding='utf-8') as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def model_stamp(model_dir="models"):
+    """
+    Empreinte bon marché (un stat) de la version active, à comparer entre deux lectures :
+    mtime du pointeur CURRENT, ou à défaut des fichiers du modèle historique.
+    """
+    pointer = os.path.join(registry_dir(model_dir), CURRENT_FILENAME)
+    paths = [pointer] if os.path.exists(pointer) else [
+        os.path.join(model_dir, LEGACY_MODEL_FILENAME), os.path.join(model_dir, LEGACY_FEATURES_FILENAME)
+    ]
+    try:
+        return tuple(os.stat(path).st_mtime_ns for path in paths)
+    except FileNotFoundError:
+        return None
+
+
+def active_model_paths(model_dir="models"):
+    """(version, chemin du modèle, chemin des features) de la version active."""
+    version = current_version(model_dir)
+    if version:
+        version_dir = os.path.join(registry_dir(model_dir), version)
+        return version, os.path.join(version_dir, MODEL_FILENAME), os.path.join(version_dir, FEATURES_FILENAME)
+    return None, os.path.join(model_dir, LEGACY_MODEL_FILENAME), os.path.join(model_dir, LEGACY_FEATURES_FILENAME)
+
+
+def load_manifest(version, model_dir="models"):
+    if version is None:
+        return {}
+    with open(os.path.join(registry_dir(model_dir), version, MANIFEST_FILENAME), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_active_model(model_dir="models"):
+    """Charge (modèle, features, manifeste) de la version active."""
+    import joblib
+
+    version, model_path, features_path = active_model_paths(model_dir)
+    with open(features_path, 'r') as f:
+        features = json.load(f)
+    model = joblib.load(model_path)
+    manifest = load_manifest(version, model_dir) if version else {'version': None}
+    return model, features, manifest
@@ -1,12 +1,16 @@
 # model_training.py
+import sys
+from pathlib import Path
 import pandas as pd
 import lightgbm as lgb
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler
-import joblib
-import json
 from config import *
-from feature_engineering import create_features
+from model_registry import publish_model
+
+# Le paquet f1features est partagé avec l'application (dossier parent)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from f1features import FeatureContext, NodeCache, create_features, encode_features
 
 print("--- Lancement de l'Entraînement du Modèle Global ---")
 
@@ -31,10 +35,14 @@ if 'round' not in historical_df.columns:
 # --- 3. Préparer le jeu de données d'entraînement ---
 print(f"Préparation des features pour {historical_df['race_id'].nunique()} courses...")
 feature_list, target_list = [], []
+# Contexte partagé : les colonnes intermédiaires sont calculées une fois pour toutes les courses,
+# et les nœuds de features dont les entrées n'ont pas changé sont relus depuis le cache disque
+feature_cache = NodeCache(FEATURE_CACHE_DIR)
+feature_context = FeatureContext(historical_df, node_cache=feature_cache)
 
 for race_id in historical_df['race_id'].unique():
     race_weekend_data = historical_df[historical_df['race_id'] == race_id].copy()
-    features = create_features(historical_df, race_weekend_data)
+    features = create_features(feature_context, race_weekend_data)
     targets = race_weekend_data[['position']].copy()
     
     # Garder des identifiants pour la jointure
@@ -51,13 +59,15 @@ if not feature_list:
     print("❌ ERREUR: Aucune feature n'a pu être générée.")
     exit()
 
+feature_cache.save()
+print(f"Nœuds de features : {feature_cache.stats()}")
+
 X_train_raw = pd.concat(feature_list, ignore_index=True)
 y_train_raw = pd.concat(target_list, ignore_index=True)
 
 # --- 4. Appliquer le One-Hot Encoding ---
 print("Application du One-Hot Encoding...")
-categorical_features = ['team', 'race_name']
-X_train_encoded = pd.get_dummies(X_train_raw, columns=categorical_features, prefix=categorical_features)
+X_train_encoded = encode_features(X_train_raw)
 
 # Fusionner pour aligner features et cibles
 merged_df = pd.merge(X_train_encoded, y_train_raw.drop_duplicates(subset=['temp_id']), on='temp_id')
@@ -81,8 +91,6 @@ except Exception as e:
 
 # --- 6. Définir et Entraîner le Pipeline ---
 feature_columns = X_train.columns.tolist()
-with open(FEATURE_COLUMNS_PATH, 'w') as f:
-    json.dump(feature_columns, f)
 
 print(f"Entraînement sur {len(X_train)} exemples avec {len(feature_columns)} features.")
 
@@ -92,6 +100,15 @@ pipeline = Pipeline([
 ])
 pipeline.fit(X_train, y_train['position'])
 
-# --- 7. Sauvegarder le modèle entraîné ---
-joblib.dump(pipeline, MODEL_PATH)
-print(f"✅ Modèle sauvegardé avec succès dans '{MODEL_PATH}'")
\ No newline at end of file
+train_mae = float((pipeline.predict(X_train) - y_train['position']).abs().mean())
+print(f"MAE sur le jeu d'entraînement : {train_mae:.3f}")
+
+# --- 7. Publier le modèle dans le registre (nouvelle version, bascule atomique) ---
+version = publish_model(
+    pipeline,
+    feature_columns,
+    metrics={'train_mae': train_mae, 'train_rows': len(X_train), 'train_races': int(merged_df['race_id'].nunique())},
+    data_path=HISTORICAL_DATA_PATH,
+    model_dir=str(MODEL_DIR),
+)
+print(f"✅ Modèle publié dans le registre '{MODEL_DIR / 'registry'}' (version active : {version})")
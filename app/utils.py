@@ -36,6 +36,54 @@ POINTS_COL = 'points'
 CONSTRUCTOR_COL = 'team'
 #CONSTRUCTOR_COL = 'driver_name'
 
+# --- Identité visuelle des écuries (page Machine Learning, noms complets des écuries) ---
+TEAM_AESTHETICS = {
+    'Mercedes': {'color': '#6CD3BF', 'logo': 'https://upload.wikimedia.org/wikipedia/commons/thumb/b/b8/Mercedes-Benz_Star.svg/1200px-Mercedes-Benz_Star.svg.png'},
+    'Ferrari': {'color': '#F91536', 'logo': 'https://upload.wikimedia.org/wikipedia/fr/thumb/c/c0/Scuderia_Ferrari_Logo.svg/1517px-Scuderia_Ferrari_Logo.svg.png'},
+    'Red Bull Racing Honda RBPT': {'color': '#3671C6', 'logo': 'https://brandlogo.org/wp-content/uploads/2024/09/Red-Bull-Logo-1987.png.webp'},
+    'McLaren Mercedes': {'color': '#F58020', 'logo': 'https://r.testifier.nl/Acbs8526SDKI/resizing_type:fill/plain/https%3A%2F%2Fs3-newsifier.ams3.digitaloceanspaces.com%2Fgpblog.com%2Fimages%2F2025-03%2Fmclaren-logo-67e9539536b57.png'},
+    'Aston Martin Aramco Mercedes': {'color': '#358C75', 'logo': 'https://www.pngplay.com/wp-content/uploads/13/Aston-Martin-Logo-No-Background.png'},
+    'Alpine Renault': {'color': '#2293D1', 'logo': 'https://logodownload.org/wp-content/uploads/2022/03/alpine-f1-logo-0.png'},
+    'Williams Mercedes': {'color': '#64C4FF', 'logo': 'https://brandlogo.org/wp-content/uploads/2025/02/Williams-Racing-Icon-2020.png.webp'},
+    'Racing Bulls Honda RBPT': {'color': '#6692FF', 'logo': 'https://static.wikia.nocookie.net/rr3/images/e/ef/F1.Racing.Bulls.png'},
+    'Kick Sauber Ferrari': {'color': '#52E252', 'logo': 'https://fansbrands.de/cdn/shop/collections/kick-logo-500x500-collection.png?crop=center&height=1200&v=1728150625&width=1200'},
+    'Haas Ferrari': {'color': "#FFFFFF", 'logo': 'https://upload.wikimedia.org/wikipedia/commons/d/d4/Logo_Haas_F1.png'},    
+    'Default': {'color': '#333333', 'logo': ''}
+}
+
+# --- Couleurs et logos des écuries (page Pilotes, noms courts des écuries) ---
+TEAM_COLORS = {
+    'Mercedes': '#6CD3BF',
+    'Ferrari': '#F91536',
+    'Red Bull Racing': '#3671C6',
+    'McLaren': '#F58020',
+    'Aston Martin': '#358C75',
+    'Alpine': '#2293D1',
+    'Williams': '#64C4FF',
+    'Racing Bulls': '#6692FF',
+    'Kick Sauber': '#52E252',
+    'Haas': '#B6BABD',
+    'Default': '#333333'
+}
+
+TEAM_LOGOS = {
+    'Mercedes': 'https://media.formula1.com/content/dam/fom-website/teams/2024/mercedes.png',
+    'Ferrari': 'https://media.formula1.com/content/dam/fom-website/teams/2024/ferrari.png',
+    'Red Bull Racing': 'https://media.formula1.com/d_team_car_fallback_image.png/content/dam/fom-website/teams/2025/red-bull-racing.png',
+    'McLaren': 'https://media.formula1.com/d_team_car_fallback_image.png/content/dam/fom-website/teams/2025/mclaren.png',
+    'Aston Martin': 'https://media.formula1.com/d_team_car_fallback_image.png/content/dam/fom-website/teams/2025/aston-martin.png',    
+    'Alpine': 'https://media.formula1.com/d_team_car_fallback_image.png/content/dam/fom-website/teams/2025/alpine.png',
+    'Williams': 'https://media.formula1.com/d_team_car_fallback_image.png/content/dam/fom-website/teams/2025/williams.png',
+    'Racing Bulls': 'https://media.formula1.com/d_team_car_fallback_image.png/content/dam/fom-website/teams/2025/racing-bulls.png',
+    'Kick Sauber': 'https://media.formula1.com/d_team_car_fallback_image.png/content/dam/fom-website/teams/2025/kick-sauber.png',
+    'Haas': 'https://media.formula1.com/d_team_car_fallback_image.png/content/dam/fom-website/teams/2025/haas.png',
+    'Default': ''
+}
+
+# Images de remplacement quand aucune image n'est disponible
+PLACEHOLDER_DRIVER_IMAGE = "https://placehold.co/400x300/F0F2F6/E10600?text=Image\\nNon\\nDisponible"
+PLACEHOLDER_CIRCUIT_IMAGE = "https://placehold.co/600x400/F0F2F6/E10600?text=Tracé\\nIndisponible"
+
 # --- Data Loading Function ---
 @st.cache_data
 def load_data(file_path):
@@ -25,6 +25,122 @@ def load_session_with_retry(year, event_name, session_identifier):
         return None
 
 
+# ==============================================================================
+# FONCTION 1B : Agrégation des tours d'essais libres (streaming, NumPy groupé)
+# ==============================================================================
+LONG_RUN_MIN_LAPS = 5        # Nombre minimum de tours propres pour qu'un relais compte comme "long run"
+CLEAN_LAP_THRESHOLD = 1.07   # Un tour est "propre" s'il est à moins de 107% du meilleur tour de la session
+
+LAP_FEATURE_COLUMNS = [
+    'FP_Best_LapTime', 'FP_LongRun_Pace_s', 'FP_Deg_Slope_s_per_lap',
+    'FP_Best_S1_s', 'FP_Best_S2_s', 'FP_Best_S3_s', 'FP_Consistency_Std_s'
+]
+
+# Agrégats additifs (sommes) et agrégats de minimum, combinables d'une session à l'autre
+_SUM_AGGREGATES = ['n', 'sum', 'sumsq', 'long_n', 'long_sum', 'deg_w', 'deg_n']
+_MIN_AGGREGATES = ['best', 's1', 's2', 's3']
+
+
+def _to_seconds(series):
+    """Convertit une colonne de Timedelta en tableau NumPy de secondes (NaN si absent)."""
+    return pd.to_timedelta(series).dt.total_seconds().to_numpy(dtype=np.float64)
+
+
+def _session_lap_aggregates(laps):
+    """
+    Réduit les tours d'une session en agrégats par pilote (quelques lignes),
+    sans boucle Python : tout passe par des bincount / ufunc.at sur des codes de groupe.
+    """
+    laps = laps.pick_accurate()
+    lap_s = _to_seconds(laps['LapTime'])
+    valid = ~np.isnan(lap_s)
+    if not valid.any():
+        return pd.DataFrame()
+
+    drv_codes, drivers = pd.factorize(laps['DriverNumber'])
+    n_drivers = len(drivers)
+    clean = valid & (lap_s <= np.nanmin(lap_s) * CLEAN_LAP_THRESHOLD)
+    clean_w = clean.astype(np.float64)
+    lap_clean = np.where(clean, lap_s, 0.0)
+
+    # --- Relais (pilote, stint) et pente de dégradation par régression linéaire fermée ---
+    stint = laps['Stint'].fillna(0).to_numpy(dtype=np.int64)
+    _, stint_idx = np.unique(drv_codes * 1000 + stint, return_inverse=True)
+    tyre_life = laps['TyreLife'].to_numpy(dtype=np.float64)
+    tyre_life = np.where(np.isnan(tyre_life), 0.0, tyre_life) * clean_w
+
+    n_stint = np.bincount(stint_idx, weights=clean_w)
+    sx = np.bincount(stint_idx, weights=tyre_life)
+    sy = np.bincount(stint_idx, weights=lap_clean)
+    sxx = np.bincount(stint_idx, weights=tyre_life * tyre_life)
+    sxy = np.bincount(stint_idx, weights=tyre_life * lap_clean)
+    denom = n_stint * sxx - sx * sx
+    long_stint = (n_stint >= LONG_RUN_MIN_LAPS) & (denom > 0)
+    slope = np.divide(n_stint * sxy - sx * sy, denom, out=np.zeros_like(denom), where=long_stint)
+
+    stint_driver = np.zeros(len(n_stint), dtype=np.int64)
+    stint_driver[stint_idx] = drv_codes
+    stint_w = np.where(long_stint, n_stint, 0.0)
+
+    # --- Long run : tours propres appartenant à un relais suffisamment long ---
+    long_lap = clean & (n_stint[stint_idx] >= LONG_RUN_MIN_LAPS)
+
+    # --- Meilleurs temps (tour et secteurs) ---
+    def grouped_min(values):
+        out = np.full(n_drivers, np.inf)
+        np.fmin.at(out, drv_codes, np.where(np.isnan(values), np.inf, values))
+        return out
+
+    aggregates = pd.DataFrame({
+        'n': np.bincount(drv_codes, weights=clean_w, minlength=n_drivers),
+        'sum': np.bincount(drv_codes, weights=lap_clean, minlength=n_drivers),
+        'sumsq': np.bincount(drv_codes, weights=lap_clean * lap_clean, minlength=n_drivers),
+        'long_n': np.bincount(drv_codes, weights=long_lap.astype(np.float64), minlength=n_drivers),
+        'long_sum': np.bincount(drv_codes, weights=np.where(long_lap, lap_s, 0.0), minlength=n_drivers),
+        'deg_w': np.bincount(stint_driver, weights=slope * stint_w, minlength=n_drivers),
+        'deg_n': np.bincount(stint_driver, weights=stint_w, minlength=n_drivers),
+        'best': grouped_min(lap_s),
+        's1': grouped_min(_to_seconds(laps['Sector1Time'])),
+        's2': grouped_min(_to_seconds(laps['Sector2Time'])),
+        's3': grouped_min(_to_seconds(laps['Sector3Time'])),
+    }, index=pd.Index(drivers, name='DriverNumber'))
+    return aggregates
+
+
+def extract_lap_features(fp_sessions):
+    """
+    Parcourt les sessions d'essais libres une par une et ne conserve que les agrégats
+    par pilote : meilleur tour, rythme en long run, pente de dégradation par relais,
+    meilleurs secteurs et régularité (écart-type des tours propres).
+    Les colonnes produites sont en float32.
+    """
+    partials = []
+    for session in fp_sessions:
+        partial = _session_lap_aggregates(session.laps)
+        if not partial.empty:
+            partials.append(partial)
+    if not partials:
+        return pd.DataFrame(columns=['DriverNumber'] + LAP_FEATURE_COLUMNS)
+
+    combined = pd.concat(partials).groupby(level='DriverNumber')
+    agg = combined[_SUM_AGGREGATES].sum().join(combined[_MIN_AGGREGATES].min())
+    agg[_MIN_AGGREGATES] = agg[_MIN_AGGREGATES].replace(np.inf, np.nan)
+
+    n = agg['n'].to_numpy()
+    variance = (agg['sumsq'] - agg['sum'] ** 2 / np.where(n > 0, n, np.nan)) / np.where(n > 1, n - 1, np.nan)
+
+    features = pd.DataFrame({
+        'FP_Best_LapTime': agg['best'] * 1000,
+        'FP_LongRun_Pace_s': agg['long_sum'] / agg['long_n'].where(agg['long_n'] > 0),
+        'FP_Deg_Slope_s_per_lap': agg['deg_w'] / agg['deg_n'].where(agg['deg_n'] > 0),
+        'FP_Best_S1_s': agg['s1'],
+        'FP_Best_S2_s': agg['s2'],
+        'FP_Best_S3_s': agg['s3'],
+        'FP_Consistency_Std_s': np.sqrt(variance.clip(lower=0)),
+    }, index=agg.index).astype(np.float32)
+    return features.reset_index()
+
+
 # ==============================================================================
 # FONCTION 2 : L'extracteur de features (VERSION FINALE ET COMPLÈTE)
 # ==============================================================================
@@ -63,14 +179,11 @@ def extract_maximum_features(year, event):
                 teammate_best_time = df.groupby('TeamName')['BestQualiTime'].transform('min')
                 df['GapToTeammate_ms'] = (df['BestQualiTime'] - teammate_best_time).dt.total_seconds() * 1000
 
-        fp_laps_list = [s.laps.pick_accurate() for s in sessions.values() if s and 'FP' in s.name and not s.laps.empty]
-        if fp_laps_list:
-            fp_laps = pd.concat(fp_laps_list, ignore_index=True)
-            if not fp_laps.empty:
-                fp_best = fp_laps.groupby('DriverNumber')['LapTime'].min().reset_index()
-                df = df.merge(fp_best.rename(columns={'LapTime': 'FP_Best_LapTime'}), on='DriverNumber', how='left')
-                df['FP_Best_LapTime'] = pd.to_timedelta(df['FP_Best_LapTime']).dt.total_seconds() * 1000
-                df['FP_Rank'] = df['FP_Best_LapTime'].rank(method='min')
+        fp_sessions = [s for s in sessions.values() if s and 'FP' in s.name and not s.laps.empty]
+        fp_features = extract_lap_features(fp_sessions)
+        if not fp_features.empty:
+            df = df.merge(fp_features, on='DriverNumber', how='left')
+            df['FP_Rank'] = df['FP_Best_LapTime'].rank(method='min')
 
         # --- 3. Features de Saison et d'Historique ---
         current_round = event.RoundNumber
@@ -0,0 +1,118 @@
+# bench_crawlers.py
+# Mesure du débit des crawlers hors ligne, contre le serveur local mock_f1_server.py.
+#
+# Chaque crawler (résultats, circuits, pilotes) est lancé tel quel, dans un dossier temporaire,
+# pour chaque mode de récupération (http : requête simple puis navigateur si besoin ;
+# browser : navigateur pour toutes les pages). Le rapport de télémétrie du passage
+# (crawl_telemetry.py) donne les pages récupérées ; on affiche les pages par seconde et le
+# temps total de reconstruction des données pour chaque mode.
+#
+#     python generate_dataset/bench_crawlers.py --latency-ms 80 --error-rate 0.02 --out bench.json
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from mock_f1_server import DEFAULT_PADDING_KB, FixtureSite, start_server
+
+CRAWLERS = {
+    'results': Path(__file__).resolve().parent / "prediction" / "crawler_prediction.py",
+    'circuits': Path(__file__).resolve().parent / "circuit" / "crawler_circuit_v2.py",
+    'drivers': Path(__file__).resolve().parent / "team" / "crawler_pilote_v2.py",
+}
+MODES = ['http', 'browser']
+CRAWLER_TIMEOUT_SECONDS = 3600
+
+
+def run_crawler(name, mode, base_url, timeout=CRAWLER_TIMEOUT_SECONDS):
+    """Lance un crawler contre `base_url` et retourne ses mesures (temps, pages, lignes...)."""
+    with tempfile.TemporaryDirectory(prefix=f"bench_{name}_") as work_dir:
+        report_dir = os.path.join(work_dir, "crawl_reports")
+        env = {**os.environ, 'F1_BASE_URL': base_url, 'F1_CRAWLER_FETCH': mode, 'F1_CRAWL_REPORT_DIR': report_dir}
+        start = time.perf_counter()
+        try:
+            process = subprocess.run([sys.executable, str(CRAWLERS[name])], cwd=work_dir, env=env,
+                                     capture_output=True, text=True, timeout=timeout)
+            returncode, output = process.returncode, process.stdout + process.stderr
+        except subprocess.TimeoutExpired:
+            returncode, output = 'timeout', f"durée maximale ({timeout}s) dépassée"
+        wall_time = time.perf_counter() - start
+
+        result = {'crawler': name, 'mode': mode, 'returncode': returncode, 'wall_time_s': round(wall_time, 3)}
+        reports = sorted(glob.glob(os.path.join(report_dir, f"{name}_*.json")))
+        if not reports:
+            result['error'] = output.strip().splitlines()[-1] if output.strip() else "pas de rapport de télémétrie"
+            return result
+        with open(reports[-1], encoding='utf-8') as f:
+            report = json.load(f)
+        summary = report['summary']
+        ok_pages = sum(1 for page in report['pages'] if page['status'] == 'ok')
+        result.update({
+            'pages': summary['pages'],
+            'pages_ok': ok_pages,
+            'pages_failed': summary['pages'] - ok_pages,
+            'methods': summary['methods'],
+            'http_retries': summary['http_retries'],
+            'rows': summary['rows'],
+            'html_mb': round(summary['html_bytes'] / 1e6, 1),
+            'pages_per_s': round(ok_pages / wall_time, 2) if wall_time else None,
+            'page_p50_s': summary['phases'].get('total', {}).get('p50'),
+            'page_p95_s': summary['phases'].get('total', {}).get('p95'),
+        })
+        return result
+
+
+def print_results(results):
+    print(f"\n{'crawler':<10}{'mode':<9}{'pages':>7}{'échecs':>8}{'pages/s':>9}{'p50':>8}{'p95':>8}{'lignes':>8}{'temps':>9}  méthodes")
+    for r in results:
+        if 'pages' not in r:
+            print(f"{r['crawler']:<10}{r['mode']:<9}  échec ({r['returncode']}) : {r['error']}")
+            continue
+        print(f"{r['crawler']:<10}{r['mode']:<9}{r['pages']:>7}{r['pages_failed']:>8}{r['pages_per_s']:>9.1f}"
+              f"{r['page_p50_s'] or 0:>8.3f}{r['page_p95_s'] or 0:>8.3f}{r['rows']:>8}{r['wall_time_s']:>8.1f}s  {r['methods']}")
+    print()
+    for mode in dict.fromkeys(r['mode'] for r in results):
+        mode_results = [r for r in results if r['mode'] == mode]
+        total_time = sum(r['wall_time_s'] for r in mode_results)
+        ok_pages = sum(r.get('pages_ok', 0) for r in mode_results)
+        print(f"Mode {mode} : reconstruction complète en {total_time:.1f}s, {ok_pages} pages récupérées "
+              f"({ok_pages / total_time if total_time else 0:.1f} pages/s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Débit des crawlers contre le serveur F1 local.")
+    parser.add_argument("--crawlers", nargs='+', choices=list(CRAWLERS), default=list(CRAWLERS))
+    parser.add_argument("--modes", nargs='+', choices=MODES, default=MODES)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--padding-kb", type=int, default=DEFAULT_PADDING_KB)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=int, default=CRAWLER_TIMEOUT_SECONDS, help="Durée maximale d'un crawler (s)")
+    parser.add_argument("--out", help="Fichier JSON des résultats")
+    args = parser.parse_args()
+
+    site = FixtureSite(padding_kb=args.padding_kb)
+    server, base_url = start_server(0, site, args.latency_ms, args.jitter_ms, args.error_rate, args.seed)
+    print(f"Serveur F1 local : {base_url} ({len(site.pages)} pages, latence {args.latency_ms:.0f} ms "
+          f"+ {args.jitter_ms:.0f} ms, erreurs {args.error_rate:.0%})")
+
+    results = []
+    try:
+        for mode in args.modes:
+            for name in args.crawlers:
+                print(f"-> {name} ({mode})...", flush=True)
+                results.append(run_crawler(name, mode, base_url, args.timeout))
+    finally:
+        server.shutdown()
+
+    print_results(results)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump({'settings': vars(args), 'base_url': base_url, 'results': results}, f, indent=2)
+        print(f"Résultats : {args.out}")
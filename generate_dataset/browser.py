@@ -0,0 +1,116 @@
+# browser.py
+# Fabrique de navigateurs Chrome commune aux crawlers (crawl_fetch.PageFetcher l'utilise pour
+# les pages qui ont besoin d'un rendu JavaScript).
+#
+# Le navigateur est allégé : la page est rendue dès que le DOM est prêt (stratégie "eager",
+# sans attendre images et scripts tiers), les images, médias, polices et traceurs ne sont pas
+# téléchargés, et les services de Chrome inutiles au scraping sont désactivés.
+# Le chemin du chromedriver résolu par webdriver_manager est mis en cache localement : la
+# résolution (requêtes réseau vers le dépôt des drivers) n'est faite qu'une fois par
+# DRIVER_PATH_MAX_AGE_DAYS au lieu d'à chaque lancement.
+import json
+import os
+import time
+from pathlib import Path
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36'
+# Assez large pour la mise en page "desktop" des tableaux de résultats
+WINDOW_SIZE = "1280,900"
+PAGE_LOAD_TIMEOUT_SECONDS = 30
+
+DRIVER_PATH_CACHE = Path(os.environ.get("F1_CRAWLER_CACHE_DIR", Path.home() / ".cache" / "f1_crawlers")) / "chromedriver.json"
+DRIVER_PATH_MAX_AGE_DAYS = 7
+
+# Requêtes bloquées par le navigateur (motifs de Network.setBlockedURLs)
+BLOCKED_URL_PATTERNS = [
+    # Images, médias et polices
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.mp4", "*.webm", "*.m3u8", "*.mp3",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*media.formula1.com/image*",
+    # Mesure d'audience, publicité, bandeau de consentement
+    "*googletagmanager.com*", "*google-analytics.com*", "*doubleclick.net*", "*googlesyndication.com*",
+    "*facebook.net*", "*hotjar.com*", "*adobedtm.com*", "*omtrdc.net*", "*demdex.net*",
+    "*cookielaw.org*", "*onetrust.com*", "*chartbeat.com*", "*scorecardresearch.com*",
+]
+
+# Fonctions de Chrome inutiles pour le scraping
+DISABLED_FEATURES = [
+    "Translate", "OptimizationHints", "MediaRouter", "DialMediaRouteProvider",
+    "AutofillServerCommunication", "CertificateTransparencyComponentUpdater", "InterestFeedContentSuggestions",
+]
+
+
+def chrome_options(headless=True):
+    """Options Chrome des crawlers."""
+    options = Options()
+    options.page_load_strategy = 'eager'
+    if headless:
+        options.add_argument('--headless=new')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument(f'--window-size={WINDOW_SIZE}')
+    options.add_argument(f'user-agent={USER_AGENT}')
+    options.add_argument('--blink-settings=imagesEnabled=false')
+    options.add_argument(f'--disable-features={",".join(DISABLED_FEATURES)}')
+    for arg in ('--disable-extensions', '--disable-background-networking', '--disable-sync',
+                '--disable-default-apps', '--disable-component-update', '--disable-notifications',
+                '--mute-audio', '--no-first-run', '--no-default-browser-check', '--metrics-recording-only'):
+        options.add_argument(arg)
+    # 2 = bloqué
+    options.add_experimental_option('prefs', {
+        'profile.managed_default_content_settings.images': 2,
+        'profile.managed_default_content_settings.media_stream': 2,
+        'profile.default_content_setting_values.notifications': 2,
+    })
+    return options
+
+
+def driver_path():
+    """Chemin du chromedriver, relu depuis le cache local tant qu'il existe et n'est pas trop ancien."""
+    try:
+        with open(DRIVER_PATH_CACHE, encoding='utf-8') as f:
+            cached = json.load(f)
+        if (os.path.exists(cached['path'])
+                and time.time() - cached['resolved_at'] < DRIVER_PATH_MAX_AGE_DAYS * 86400):
+            return cached['path']
+    except (OSError, ValueError, KeyError):
+        pass
+    path = ChromeDriverManager().install()
+    try:
+        DRIVER_PATH_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = DRIVER_PATH_CACHE.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'path': path, 'resolved_at': time.time()}, f)
+        os.replace(tmp_path, DRIVER_PATH_CACHE)
+    except OSError as e:
+        print(f"Cache du chromedriver non enregistré ({e})")
+    return path
+
+
+def create_driver(headless=True):
+    """Navigateur Chrome allégé, ou None si le lancement échoue."""
+    print("Initialisation du navigateur Selenium...")
+    driver = None
+    try:
+        driver = webdriver.Chrome(service=Service(driver_path()), options=chrome_options(headless))
+        driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT_SECONDS)
+        # Blocage des ressources au niveau réseau (le réglage images ne couvre ni polices ni traceurs)
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
+        return driver
+    except Exception as e:
+        print(f"!!! Erreur lors de l'initialisation du driver : {type(e).__name__} - {e}")
+        if driver is not None:
+            # Chrome déjà lancé : on le ferme pour ne pas laisser de processus orphelin
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        return None
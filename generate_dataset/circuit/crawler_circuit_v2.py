@@ -6,27 +6,24 @@
 import time
 import csv
 import os
+import sys
 import traceback
+from pathlib import Path
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 
-# --- Importations de Selenium Standard ---
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.common.exceptions import TimeoutException
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.by import By
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from crawl_fetch import BASE_URL, HTTP_FETCH_ENABLED, PageFetcher
+from crawl_telemetry import CrawlTelemetry
 
 # --- CONFIGURATION & CONSTANTES ---
-BASE_URL = "https://www.formula1.com"
 YEAR_TO_SCRAPE = 2024
 SEASON_PAGE_URL = f"{BASE_URL}/en/racing/{YEAR_TO_SCRAPE}.html"
 OUTPUT_DIR = "f1_circuit_data"
 OUTPUT_FILENAME = os.path.join(OUTPUT_DIR, f"f1_circuits_{YEAR_TO_SCRAPE}.csv")
 WAIT_SECONDS = 10
+# Requête HTTP simple d'abord, navigateur seulement si l'élément attendu n'est pas dans la réponse
+USE_HTTP_FETCH = HTTP_FETCH_ENABLED
 
 # Dictionnaires manuels (pour les images et le mapping)
 circuits_manual_image_data = {
@@ -55,24 +52,6 @@ URL_SLUG_TO_CIRCUIT_ID = {
 
 # --- FONCTIONS UTILITAIRES ---
 
-def setup_driver():
-    """Configure et retourne une instance de Selenium standard."""
-    print("Initialisation du navigateur Selenium standard...")
-    options = Options()
-    options.add_argument('--headless')
-    options.add_argument('--no-sandbox')
-    options.add_argument('--disable-gpu')
-    options.add_argument('--disable-dev-shm-usage')
-    options.add_argument('--window-size=1920,1080')
-    options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36')
-    try:
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=options)
-        return driver
-    except Exception as e:
-        print(f"!!! Erreur lors de l'initialisation du driver : {e}")
-        return None
-
 def parse_circuit_page(html_content, url):
     """Extrait les informations d'un circuit depuis le code HTML de sa page."""
     soup = BeautifulSoup(html_content, 'html.parser')
@@ -128,26 +107,31 @@ def save_to_csv(data, filename):
 
 # --- FONCTION PRINCIPALE (ORCHESTRATEUR) ---
 
-def run_circuits_crawler(driver, season_url):
+def run_circuits_crawler(fetcher, season_url):
     """Orchestre le processus de scraping des circuits pour une saison."""
     try:
         # Étape 1: Obtenir les URLs des courses
         print(f"Navigation vers la page de la saison : {season_url}")
-        driver.get(season_url)
-        WebDriverWait(driver, WAIT_SECONDS).until(EC.presence_of_element_located((By.CSS_SELECTOR, "a.group[href*='/racing/']")))
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-        race_links = [urljoin(season_url, a['href']) for a in soup.select("a.group[href*='/racing/']") if 'testing' not in a['href']]
+        season_html = fetcher.fetch(season_url, "a.group[href*='/racing/']")
+        if not season_html:
+            print("Page de la saison indisponible. Arrêt.")
+            return
+        with fetcher.telemetry.phase(season_url, 'parse'):
+            soup = BeautifulSoup(season_html, 'html.parser')
+            race_links = [urljoin(season_url, a['href']) for a in soup.select("a.group[href*='/racing/']") if 'testing' not in a['href']]
         unique_race_urls = sorted(list(set(race_links)))
         print(f"-> {len(unique_race_urls)} URLs de courses trouvées.")
 
         # Étape 2: Obtenir les URLs de détail des circuits
         circuit_detail_urls = set()
-        for url in unique_race_urls:
+        race_pages = fetcher.fetch_all(unique_race_urls, "a[href$='/circuit']")
+        for url, race_html in zip(unique_race_urls, race_pages):
             print(f"  - Analyse de la course : {url}")
-            driver.get(url)
-            WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, "a[href$='/circuit']")))
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-            circuit_link = soup.select_one("a[href$='/circuit']")
+            if not race_html:
+                continue
+            with fetcher.telemetry.phase(url, 'parse'):
+                soup = BeautifulSoup(race_html, 'html.parser')
+                circuit_link = soup.select_one("a[href$='/circuit']")
             if circuit_link:
                 circuit_detail_urls.add(urljoin(url, circuit_link['href']))
         
@@ -160,18 +144,23 @@ def run_circuits_crawler(driver, season_url):
 
         # Étape 3: Scraper chaque page de circuit
         all_data = []
-        for url in urls_to_scrape:
+        circuit_pages = fetcher.fetch_all(urls_to_scrape, "h2.f1-heading__body")
+        for url, circuit_html in zip(urls_to_scrape, circuit_pages):
             print(f"--- Traitement de : {url}")
-            driver.get(url)
-            WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, "h2.f1-heading__body")))
-            parsed_data = parse_circuit_page(driver.page_source, url)
+            if not circuit_html:
+                print("-> Page indisponible, données ignorées.")
+                continue
+            with fetcher.telemetry.phase(url, 'parse'):
+                parsed_data = parse_circuit_page(circuit_html, url)
             if parsed_data and parsed_data.get('circuit_name', 'N/A') not in ['N/A', '']:
                 all_data.append(parsed_data)
+                fetcher.telemetry.record(url, rows=1)
                 print(f"-> Données extraites pour {parsed_data['circuit_name']}")
             else:
                 print(f"-> Nom du circuit non trouvé, données ignorées.")
         
         save_to_csv(all_data, OUTPUT_FILENAME)
+        print(f"Pages : {fetcher.summary()}")
 
     except Exception as e:
         print(f"!!! Une erreur est survenue pendant le scraping : {e}")
@@ -184,13 +173,11 @@ if __name__ == "__main__":
     print("="*40)
     start_time = time.time()
     
-    driver = setup_driver()
-    if driver:
-        try:
-            run_circuits_crawler(driver, SEASON_PAGE_URL)
-        finally:
-            driver.quit()
-            print("\nNavigateur fermé.")
+    # Le navigateur n'est lancé qu'au premier besoin (page rendue côté client)
+    with PageFetcher(use_http=USE_HTTP_FETCH, browser_wait=WAIT_SECONDS, browser_delay=0,
+                     telemetry=CrawlTelemetry("circuits")) as fetcher:
+        run_circuits_crawler(fetcher, SEASON_PAGE_URL)
+    fetcher.telemetry.write_report()
             
     end_time = time.time()
     print("\n" + "="*40)
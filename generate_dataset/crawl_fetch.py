@@ -0,0 +1,250 @@
+# crawl_fetch.py
+# Stratégie de récupération des pages commune aux crawlers.
+#
+# La plupart des pages de formula1.com sont rendues côté serveur : le tableau de résultats
+# (ou le titre, la liste des liens...) est déjà dans la réponse HTTP brute. Chaque page est
+# donc d'abord demandée par un client HTTP partagé (connexions keep-alive, gzip) et on vérifie
+# que l'élément attendu par le crawler y est présent. Le navigateur Selenium n'est lancé, une
+# seule fois puis réutilisé, que pour les pages où cet élément n'apparaît qu'après le rendu.
+# Une page inexistante (réponse 404/410) n'est pas envoyée au navigateur.
+#
+# Utilisation :
+#     with PageFetcher() as fetcher:
+#         html = fetcher.fetch(url, "h1.f1-heading__body")
+#         pages = fetcher.fetch_all(urls, "h1.f1-heading__body")   # requêtes HTTP concurrentes
+import asyncio
+import os
+import time
+
+import httpx
+from bs4 import BeautifulSoup
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from browser import USER_AGENT, create_driver
+from crawl_telemetry import CrawlTelemetry
+
+# Site crawlé : formula1.com, ou un serveur local (mock_f1_server.py) via F1_BASE_URL
+BASE_URL = os.environ.get("F1_BASE_URL", "https://www.formula1.com").rstrip('/')
+# F1_CRAWLER_FETCH=browser : rendu navigateur pour toutes les pages (ancien comportement)
+HTTP_FETCH_ENABLED = os.environ.get("F1_CRAWLER_FETCH", "http").lower() != "browser"
+HTTP_TIMEOUT_SECONDS = 20
+# Requêtes HTTP simultanées de fetch_all (reste raisonnable pour le site)
+HTTP_CONCURRENCY = 4
+HTTP_MAX_CONNECTIONS = 8
+BROWSER_WAIT_SECONDS = 15
+# Pause avant chaque rendu par le navigateur (les requêtes HTTP simples n'en ont pas besoin)
+BROWSER_DELAY_SECONDS = 2
+# Nouvelles tentatives HTTP sur erreur réseau ou réponse 429/5xx, avant le passage au navigateur
+HTTP_RETRIES = 2
+HTTP_RETRY_BACKOFF_SECONDS = 0.5
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# Page inexistante : inutile de la rendre avec le navigateur
+NOT_FOUND_STATUS_CODES = {404, 410}
+
+
+def has_selector(html_content, selector):
+    """Vrai si le HTML contient un élément correspondant au sélecteur CSS."""
+    if not html_content:
+        return False
+    return BeautifulSoup(html_content, 'html.parser').select_one(selector) is not None
+
+
+def _client_options():
+    return {
+        'headers': {'User-Agent': USER_AGENT, 'Accept-Encoding': 'gzip, deflate'},
+        'timeout': HTTP_TIMEOUT_SECONDS,
+        'follow_redirects': True,
+        'limits': httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS, max_keepalive_connections=HTTP_MAX_CONNECTIONS),
+    }
+
+
+class PageFetcher:
+    """
+    Récupère le HTML d'une page : requête HTTP simple si l'élément attendu est dans la
+    réponse, sinon rendu par un navigateur Selenium créé à la demande par `browser_factory`
+    (fonction sans argument retournant un webdriver, ou None en cas d'échec ; par défaut
+    browser.create_driver).
+    `use_http=False` force le navigateur pour toutes les pages (ancien comportement).
+    Chaque phase est mesurée dans `telemetry` (voir crawl_telemetry.py) ; le crawler y ajoute
+    la phase parse et les lignes extraites, puis écrit le rapport en fin de passage.
+    """
+
+    def __init__(self, browser_factory=create_driver, use_http=True, browser_wait=BROWSER_WAIT_SECONDS,
+                 browser_delay=BROWSER_DELAY_SECONDS, telemetry=None):
+        self.browser_factory = browser_factory
+        self.use_http = use_http
+        self.browser_wait = browser_wait
+        self.browser_delay = browser_delay
+        self.telemetry = telemetry or CrawlTelemetry("crawl")
+        self.client = httpx.Client(**_client_options()) if use_http else None
+        self.driver = None
+        self.browser_unavailable = False
+        # URL -> code HTTP des pages inexistantes (404/410)
+        self.not_found = {}
+        self.counts = {'http': 0, 'browser': 0, 'not_found': 0, 'failed': 0}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self.client is not None:
+            self.client.close()
+        if self.driver is not None:
+            self.driver.quit()
+            self.driver = None
+            print("Navigateur fermé.")
+
+    def fetch(self, url, selector, wait_for=None, timeout=None):
+        """
+        HTML de la page, ou None si elle n'a pas pu être obtenue. La réponse HTTP est gardée si
+        elle contient `selector` ; sinon le navigateur attend `wait_for` (par défaut `selector`).
+        """
+        self.telemetry.start(url)
+        if self.use_http:
+            html_content = self._fetch_http(url)
+            if self._accept_http(url, html_content, selector):
+                return html_content
+            if self._is_not_found(url):
+                return None
+        return self.fetch_browser(url, wait_for or selector, timeout)
+
+    def fetch_all(self, urls, selector, wait_for=None, concurrency=HTTP_CONCURRENCY):
+        """
+        HTML de plusieurs pages, dans l'ordre de `urls` (mêmes règles que fetch). Les requêtes
+        HTTP sont envoyées en parallèle (au plus `concurrency` à la fois) ; seules les pages
+        sans l'élément attendu passent ensuite, une par une, par le navigateur.
+        """
+        urls = list(urls)
+        for url in urls:
+            self.telemetry.start(url)
+        if self.use_http and urls:
+            responses = asyncio.run(self._fetch_http_many(urls, concurrency))
+        else:
+            responses = [None] * len(urls)
+        pages = []
+        for url, html_content in zip(urls, responses):
+            if self._accept_http(url, html_content, selector):
+                pages.append(html_content)
+            elif self._is_not_found(url):
+                pages.append(None)
+            else:
+                pages.append(self.fetch_browser(url, wait_for or selector))
+        return pages
+
+    def fetch_browser(self, url, selector, timeout=None):
+        """Rendu de la page par le navigateur partagé, en attendant `selector`."""
+        telemetry = self.telemetry
+        if self.driver is None and not self.browser_unavailable:
+            with telemetry.phase(url, 'browser_start'):
+                self.driver = self.browser_factory()
+            # Pas de nouveau lancement après un échec (Chrome absent, hôte hors ligne...)
+            self.browser_unavailable = self.driver is None
+        if self.driver is None:
+            self.counts['failed'] += 1
+            telemetry.record(url, method='browser', status='browser_unavailable')
+            return None
+        if self.browser_delay:
+            with telemetry.phase(url, 'delay'):
+                time.sleep(self.browser_delay)
+        print(f"Rendu navigateur : {url} (attente de '{selector}')")
+        try:
+            with telemetry.phase(url, 'navigation'):
+                self.driver.get(url)
+            with telemetry.phase(url, 'wait'):
+                WebDriverWait(self.driver, timeout or self.browser_wait).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, selector))
+                )
+            with telemetry.phase(url, 'page_source'):
+                html_content = self.driver.page_source
+            self.counts['browser'] += 1
+            telemetry.record(url, method='browser', status='ok', html_bytes=len(html_content.encode('utf-8')))
+            return html_content
+        except TimeoutException:
+            print(f"!!! TIMEOUT en attendant '{selector}' sur {url}")
+            telemetry.record(url, method='browser', status='timeout')
+        except Exception as e:
+            print(f"!!! Erreur navigateur sur {url}: {type(e).__name__} - {e}")
+            telemetry.record(url, method='browser', status=type(e).__name__)
+        self.counts['failed'] += 1
+        return None
+
+    def _accept_http(self, url, html_content, selector):
+        with self.telemetry.phase(url, 'selector_check'):
+            found = has_selector(html_content, selector)
+        if found:
+            self.counts['http'] += 1
+            self.telemetry.record(url, method='http', status='ok')
+        return found
+
+    def _is_not_found(self, url):
+        """Vrai si la requête HTTP a reçu 404/410 (la page est alors comptée sans passer par le navigateur)."""
+        if url not in self.not_found:
+            return False
+        print(f"Page inexistante (HTTP {self.not_found[url]}) : {url}")
+        self.counts['not_found'] += 1
+        self.telemetry.record(url, method='http')
+        return True
+
+    def _http_result(self, url, response, error):
+        """HTML d'une réponse, None si elle est inutilisable ; True si la requête doit être retentée."""
+        self.telemetry.http_attempt(url)
+        if error is not None:
+            print(f"Requête HTTP échouée pour {url} ({type(error).__name__}).")
+            self.telemetry.record(url, status=type(error).__name__)
+            return None, True
+        self.telemetry.record(url, status=str(response.status_code), html_bytes=len(response.content))
+        if response.status_code in NOT_FOUND_STATUS_CODES:
+            self.not_found[url] = response.status_code
+        else:
+            self.not_found.pop(url, None)
+        if response.status_code == 200:
+            return response.text, False
+        return None, response.status_code in RETRY_STATUS_CODES
+
+    def _fetch_http(self, url):
+        for attempt in range(HTTP_RETRIES + 1):
+            if attempt:
+                with self.telemetry.phase(url, 'delay'):
+                    time.sleep(HTTP_RETRY_BACKOFF_SECONDS * attempt)
+            response, error = None, None
+            with self.telemetry.phase(url, 'http'):
+                try:
+                    response = self.client.get(url)
+                except httpx.HTTPError as e:
+                    error = e
+            html_content, retry = self._http_result(url, response, error)
+            if not retry:
+                return html_content
+        return None
+
+    async def _fetch_http_many(self, urls, concurrency):
+        semaphore = asyncio.Semaphore(concurrency)
+        async with httpx.AsyncClient(**_client_options()) as client:
+            async def fetch_one(url):
+                async with semaphore:
+                    for attempt in range(HTTP_RETRIES + 1):
+                        if attempt:
+                            await asyncio.sleep(HTTP_RETRY_BACKOFF_SECONDS * attempt)
+                            self.telemetry.add_phase(url, 'delay', HTTP_RETRY_BACKOFF_SECONDS * attempt)
+                        response, error = None, None
+                        start = time.perf_counter()
+                        try:
+                            response = await client.get(url)
+                        except httpx.HTTPError as e:
+                            error = e
+                        self.telemetry.add_phase(url, 'http', time.perf_counter() - start)
+                        html_content, retry = self._http_result(url, response, error)
+                        if not retry:
+                            return html_content
+                    return None
+            return await asyncio.gather(*(fetch_one(url) for url in urls))
+
+    def summary(self):
+        return (f"{self.counts['http']} page(s) en HTTP simple, {self.counts['browser']} via le navigateur, "
+                f"{self.counts['not_found']} inexistante(s), {self.counts['failed']} échec(s)")
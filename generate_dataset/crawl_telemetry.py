@@ -0,0 +1,135 @@
+# crawl_telemetry.py
+# Mesures d'un passage de crawler, page par page : durée de chaque phase, taille du HTML,
+# lignes extraites, nombre de requêtes HTTP (nouvelles tentatives comprises) et méthode
+# retenue (HTTP simple ou navigateur).
+#
+# Phases mesurées :
+#     http            requête HTTP simple (téléchargement compris)
+#     selector_check  vérification de l'élément attendu dans la réponse HTTP
+#     browser_start   lancement du navigateur (attribué à la première page qui en a besoin)
+#     delay           pauses : politesse avant un rendu navigateur, attente avant une nouvelle tentative HTTP
+#     navigation      driver.get (jusqu'au DOM prêt)
+#     wait            WebDriverWait sur l'élément attendu
+#     page_source     récupération du HTML rendu
+#     parse           extraction des données par le crawler
+# En fin de passage, write_report écrit le détail par page (CSV) et un résumé avec les
+# percentiles de chaque phase (JSON) dans CRAWL_REPORT_DIR.
+import csv
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+CRAWL_REPORT_DIR = os.environ.get("F1_CRAWL_REPORT_DIR", "crawl_reports")
+PHASES = ['http', 'selector_check', 'browser_start', 'delay', 'navigation', 'wait', 'page_source', 'parse']
+PERCENTILES = [50, 90, 95, 99]
+
+
+def percentile(sorted_values, q):
+    """Percentile `q` (0-100) par interpolation linéaire d'une liste triée."""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+class CrawlTelemetry:
+    """Mesures par URL d'un passage de crawler."""
+
+    def __init__(self, crawler_name):
+        self.crawler_name = crawler_name
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.pages = []
+        self._current = {}
+
+    def start(self, url):
+        """Nouvelle mesure pour `url` (une page récupérée plusieurs fois a une ligne par passage)."""
+        page = {'url': url, 'method': '', 'status': '', 'http_attempts': 0, 'html_bytes': 0, 'rows': 0,
+                'phases': dict.fromkeys(PHASES, 0.0)}
+        self.pages.append(page)
+        self._current[url] = page
+        return page
+
+    def _page(self, url):
+        page = self._current.get(url)
+        return page if page is not None else self.start(url)
+
+    @contextmanager
+    def phase(self, url, name):
+        """Chronomètre une phase d'une page (les durées d'une même phase s'additionnent)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._page(url)['phases'][name] += time.perf_counter() - start
+
+    def add_phase(self, url, name, seconds):
+        self._page(url)['phases'][name] += seconds
+
+    def http_attempt(self, url):
+        self._page(url)['http_attempts'] += 1
+
+    def record(self, url, **fields):
+        """Renseigne method, status, html_bytes ou rows pour une page."""
+        self._page(url).update(fields)
+
+    def summary(self):
+        """Résumé du passage : pages par méthode, volumes, percentiles des phases (secondes)."""
+        pages = self.pages
+        totals = sorted(sum(page['phases'].values()) for page in pages)
+        phases = {}
+        for name in PHASES + ['total']:
+            if name == 'total':
+                values = totals
+            else:
+                values = sorted(page['phases'][name] for page in pages if page['phases'][name] > 0)
+            if not values:
+                continue
+            phases[name] = {
+                'pages': len(values),
+                'sum': round(sum(values), 4),
+                'mean': round(sum(values) / len(values), 4),
+                **{f'p{q}': round(percentile(values, q), 4) for q in PERCENTILES},
+                'max': round(values[-1], 4),
+            }
+        methods = {}
+        for page in pages:
+            methods[page['method'] or 'unknown'] = methods.get(page['method'] or 'unknown', 0) + 1
+        return {
+            'crawler': self.crawler_name,
+            'started_at': datetime.fromtimestamp(self.started_at).isoformat(timespec='seconds'),
+            'wall_time_s': round(time.perf_counter() - self._start, 3),
+            'pages': len(pages),
+            'methods': methods,
+            'http_retries': sum(max(page['http_attempts'] - 1, 0) for page in pages),
+            'html_bytes': sum(page['html_bytes'] for page in pages),
+            'rows': sum(page['rows'] for page in pages),
+            'phases': phases,
+        }
+
+    def write_report(self, output_dir=CRAWL_REPORT_DIR):
+        """Écrit le détail par page (CSV) et le résumé (JSON). Retourne le chemin du JSON."""
+        summary = self.summary()
+        os.makedirs(output_dir, exist_ok=True)
+        stem = os.path.join(output_dir, f"{self.crawler_name}_{datetime.fromtimestamp(self.started_at):%Y%m%d_%H%M%S}")
+        with open(f"{stem}.csv", 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['url', 'method', 'status', 'http_attempts', 'html_bytes', 'rows', 'total_s']
+                            + [f'{name}_s' for name in PHASES])
+            for page in self.pages:
+                writer.writerow([page['url'], page['method'], page['status'], page['http_attempts'], page['html_bytes'],
+                                 page['rows'], round(sum(page['phases'].values()), 4)]
+                                + [round(page['phases'][name], 4) for name in PHASES])
+        with open(f"{stem}.json", 'w', encoding='utf-8') as f:
+            json.dump({'summary': summary, 'pages': self.pages}, f, indent=2)
+
+        print(f"\nTélémétrie : {summary['pages']} pages {summary['methods']}, {summary['http_retries']} nouvelle(s) tentative(s) HTTP, "
+              f"{summary['html_bytes'] / 1e6:.1f} Mo de HTML, {summary['rows']} lignes, {summary['wall_time_s']:.1f}s")
+        for name, stats in summary['phases'].items():
+            print(f"  - {name:<15} total {stats['sum']:8.2f}s  p50 {stats['p50']:.3f}s  p95 {stats['p95']:.3f}s  max {stats['max']:.3f}s")
+        print(f"Rapport : {stem}.json, {stem}.csv")
+        return f"{stem}.json"
@@ -0,0 +1,286 @@
+# mock_f1_server.py
+# Serveur HTTP local qui remplace formula1.com pour tester et mesurer les crawlers hors ligne.
+#
+# Il répond aux mêmes chemins que le site :
+#     /en/results.html/<année>/races.html                          (liste des courses)
+#     /en/results.html/<année>/races/<id>/<lieu>/<type>.html       (tableaux de résultats)
+#     /en/racing/<année>.html, /en/racing/<année>/<lieu>[/circuit]  (saison, course, circuit)
+#     /en/drivers.html, /en/drivers/<pilote>                        (pilotes)
+# Une page enregistrée dans le dossier des fixtures (même chemin, voir --record) est servie
+# telle quelle ; sinon la page est générée à partir des CSV de app/data, avec la structure HTML
+# (sélecteurs CSS) attendue par les crawlers.
+#
+#     python generate_dataset/mock_f1_server.py --port 8765 --latency-ms 80 --error-rate 0.02
+#     F1_BASE_URL=http://127.0.0.1:8765 python generate_dataset/team/crawler_pilote_v2.py
+import argparse
+import gzip
+import html
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse
+
+import pandas as pd
+
+DEFAULT_DATA_DIR = Path(__file__).resolve().parent.parent / "app" / "data"
+DEFAULT_FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+DEFAULT_PORT = 8765
+REAL_BASE_URL = "https://www.formula1.com"
+CIRCUITS_YEAR = 2024
+# Remplissage (Ko) ajouté à chaque page générée pour approcher la taille des pages réelles
+DEFAULT_PADDING_KB = 150
+# Emplacement du remplissage, inséré à l'envoi pour ne pas le garder en mémoire dans chaque page
+PADDING_SLOT = "<script></script>"
+
+# Fichiers de résultats et colonnes des tableaux, dans l'ordre attendu par crawler_prediction.py
+RESULT_TABLES = {
+    'race_all_years.csv': ['position', 'driver_number', 'driver', 'team', 'laps', 'time_or_retired', 'points'],
+    'fastest_lap_all_years.csv': ['position', 'driver_number', 'driver', 'team', 'lap', 'time_of_day', 'lap_time', 'avg_speed'],
+    'qualifying_all_years.csv': ['position', 'driver_number', 'driver', 'team', 'q1_time', 'q2_time', 'q3_time', 'laps'],
+    'starting_grid_all_years.csv': ['position', 'driver_number', 'driver', 'team', 'sg_time'],
+    'pit_stop_all_years.csv': ['stops', 'driver_number', 'driver', 'team', 'lap', 'time_of_day', 'pit_time', 'total_pit_time'],
+    'practice_1_all_years.csv': ['position', 'driver_number', 'driver', 'team', 'lap_time', 'gap', 'laps'],
+    'practice_2_all_years.csv': ['position', 'driver_number', 'driver', 'team', 'lap_time', 'gap', 'laps'],
+    'practice_3_all_years.csv': ['position', 'driver_number', 'driver', 'team', 'lap_time', 'gap', 'laps'],
+}
+RESULT_PATH_PATTERN = re.compile(r'^/en/results\.html/(\d{4})/races/(\d+)/([^/]+)/[^/]+\.html$')
+
+DRIVER_STATS = {
+    'team': 'Team', 'country': 'Country', 'podiums': 'Podiums', 'points': 'Points',
+    'grands_prix_entered': 'Grands Prix entered', 'world_championships': 'World Championships',
+    'highest_race_finish': 'Highest race finish', 'highest_grid_position': 'Highest grid position',
+    'date_of_birth': 'Date of birth', 'place_of_birth': 'Place of birth',
+}
+CIRCUIT_STATS = {
+    'first_gp': 'First Grand Prix', 'laps': 'Number of Laps', 'length_km': 'Circuit Length',
+    'race_distance_km': 'Race Distance',
+}
+
+
+def _text(value):
+    return "" if pd.isna(value) else html.escape(str(value).removesuffix('.0') if isinstance(value, float) else str(value))
+
+
+def _page(title, body):
+    return (f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{html.escape(title)}</title>"
+            f"{PADDING_SLOT}</head><body><main>{body}</main><footer>F1</footer></body></html>")
+
+
+def _driver_cell(name, code):
+    first, _, last = str(name if not pd.isna(name) else "").partition(" ")
+    return (f"<span class='hide-for-mobile'>{html.escape(first)}</span> "
+            f"<span class='hide-for-tablet'>{html.escape(last)}</span>"
+            f"<span class='hide-for-desktop'>{_text(code)}</span>")
+
+
+class FixtureSite:
+    """Pages du site, indexées par chemin : fichiers enregistrés, sinon générées depuis les CSV."""
+
+    def __init__(self, data_dir=DEFAULT_DATA_DIR, fixtures_dir=DEFAULT_FIXTURES_DIR, padding_kb=DEFAULT_PADDING_KB):
+        self.data_dir = Path(data_dir)
+        self.fixtures_dir = Path(fixtures_dir)
+        # Le remplissage imite les scripts embarqués des pages réelles (coût de téléchargement et d'analyse)
+        self.padding = ("<script>" + ("/* " + "x" * 1018 + " */\n") * padding_kb + "</script>").encode('utf-8')
+        self.pages = {}
+        self._build_results()
+        self._build_circuits()
+        self._build_drivers()
+
+    def get(self, path):
+        """Contenu (bytes) de la page `path`, ou None si elle n'existe pas."""
+        path = path.rstrip('/') or '/'
+        # Chemin résolu (.., liens) : rien n'est servi en dehors du dossier des fixtures
+        fixtures_root = self.fixtures_dir.resolve()
+        recorded = (fixtures_root / path.lstrip('/')).resolve()
+        if not recorded.is_relative_to(fixtures_root):
+            return None
+        if recorded.is_file():
+            return recorded.read_bytes()
+        page = self.pages.get(path)
+        if page is None:
+            return None
+        return page.encode('utf-8').replace(PADDING_SLOT.encode('utf-8'), self.padding, 1)
+
+    def _read(self, filename):
+        path = self.data_dir / filename
+        return pd.read_csv(path) if path.exists() else pd.DataFrame()
+
+    def _build_results(self):
+        races_by_year = {}
+        for filename, columns in RESULT_TABLES.items():
+            df = self._read(filename)
+            if df.empty:
+                continue
+            df['path'] = df['url'].map(lambda url: urlparse(url).path)
+            for path, rows in df.groupby('path', sort=False):
+                match = RESULT_PATH_PATTERN.match(path)
+                if not match:
+                    continue
+                # L'année vient de l'URL (certaines lignes des CSV ont une année erronée)
+                year, race_id, _ = match.groups()
+                race_name = rows['race_name'].iloc[0]
+                body_rows = "".join(
+                    "<tr>" + "".join(
+                        f"<td>{_driver_cell(row.get('driver_name'), row.get('driver_code'))}</td>" if col == 'driver'
+                        else f"<td>{_text(row.get(col))}</td>"
+                        for col in columns
+                    ) + "</tr>"
+                    for row in rows.to_dict('records')
+                )
+                header = "".join(f"<th>{col}</th>" for col in columns)
+                title = f"{race_name} {year} - {rows['result_type'].iloc[0].replace('_', ' ').upper()}"
+                self.pages[path] = _page(title, (
+                    f"<h1 class='f1-heading'>{html.escape(title)}</h1>"
+                    f"<table class='f1-table f1-table-with-data'><thead><tr>{header}</tr></thead><tbody>{body_rows}</tbody></table>"
+                ))
+                # Liste de la saison : toute course présente dans au moins un type de résultat
+                races_by_year.setdefault(year, {}).setdefault(int(race_id), (race_name, path))
+
+        for year, races in races_by_year.items():
+            links = "".join(
+                f"<tr><td><a href='{path}'>{html.escape(race_name)}</a></td></tr>"
+                for _, (race_name, path) in sorted(races.items())
+            )
+            self.pages[f"/en/results.html/{year}/races.html"] = _page(f"{year} RACE RESULTS", (
+                f"<h1 class='f1-heading'>{year} RACE RESULTS</h1>"
+                f"<table class='f1-table f1-table-with-data'><tbody>{links}</tbody></table>"
+            ))
+
+    def _build_circuits(self):
+        df = self._read(f"f1_circuits_{CIRCUITS_YEAR}.csv")
+        if df.empty:
+            return
+        season_links = []
+        for row in df.to_dict('records'):
+            circuit_path = urlparse(row['url']).path.rstrip('/')
+            race_path = circuit_path.rsplit('/', 1)[0]
+            slug = race_path.rsplit('/', 1)[1]
+            season_links.append(f"<a class='group' href='{race_path}'>{html.escape(slug)}</a>")
+            self.pages[race_path] = _page(slug, f"<a href='{circuit_path}'>Circuit</a>")
+            stats = "".join(
+                f"<div class='border-r'><span class='f1-text'>{label}</span><h2 class='f1-heading'>{_text(row.get(col))}</h2></div>"
+                for col, label in CIRCUIT_STATS.items()
+            )
+            stats += (f"<div class='border-r'><span class='f1-text'>Lap Record</span><h2 class='f1-heading'>"
+                      f"{_text(row.get('lap_record_time'))}<span class='f1-text'>({_text(row.get('lap_record_driver'))})</span></h2></div>")
+            self.pages[circuit_path] = _page(row['circuit_name'], (
+                f"<h2 class='f1-heading__body'><div>{_text(row['circuit_name'])}</div></h2>"
+                f"<img alt='{html.escape(slug)}-flag.png' src='{_text(row.get('country_flag_url'))}'>"
+                f"<div class='f1-grid'>{stats}</div>"
+            ))
+        self.pages[f"/en/racing/{CIRCUITS_YEAR}.html"] = _page(f"{CIRCUITS_YEAR} season", "".join(season_links))
+
+    def _build_drivers(self):
+        df = self._read("f1_drivers_all.csv")
+        if df.empty:
+            return
+        links = []
+        for row in df.to_dict('records'):
+            path = urlparse(row['url']).path.rstrip('/')
+            links.append(f"<a href='{path}'>{_text(row['full_name'])}</a>")
+            stats = "".join(f"<dt>{label}</dt><dd>{_text(row.get(col))}</dd>" for col, label in DRIVER_STATS.items())
+            self.pages[path] = _page(row['full_name'], (
+                f"<h1 class='f1-heading__body'>{_text(row['full_name'])}</h1>"
+                f"<div class='f1-driver-position'><p class='f1-heading'>{_text(row.get('driver_number'))}</p></div>"
+                f"<img class='f1-c-image aspect-square' src='{_text(row.get('main_image_url'))}'>"
+                f"<dl class='f1-grid'>{stats}</dl>"
+            ))
+        self.pages["/en/drivers.html"] = _page("F1 Drivers", "".join(links))
+
+
+def make_handler(site, latency_ms=0, jitter_ms=0, error_rate=0.0, seed=None):
+    """Gestionnaire HTTP : latence (+ gigue aléatoire) et erreurs 503 injectées à la demande."""
+    rng = random.Random(seed)
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+
+        def do_GET(self):
+            with lock:
+                delay = (latency_ms + rng.uniform(0, jitter_ms)) / 1000
+                fail = rng.random() < error_rate
+            if delay:
+                time.sleep(delay)
+            if fail:
+                self._send(503, b"Service Unavailable")
+                return
+            content = site.get(urlparse(self.path).path)
+            if content is None:
+                self._send(404, b"Not Found")
+                return
+            self._send(200, content)
+
+        def _send(self, status, content):
+            headers = {'Content-Type': 'text/html; charset=utf-8'}
+            if 'gzip' in self.headers.get('Accept-Encoding', '') and len(content) > 1024:
+                content = gzip.compress(content, compresslevel=5)
+                headers['Content-Encoding'] = 'gzip'
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def start_server(port=0, site=None, latency_ms=0, jitter_ms=0, error_rate=0.0, seed=None):
+    """Lance le serveur dans un thread. Retourne (serveur, URL de base) ; serveur.shutdown() l'arrête."""
+    site = site or FixtureSite()
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(site, latency_ms, jitter_ms, error_rate, seed))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def record_fixtures(paths, fixtures_dir=DEFAULT_FIXTURES_DIR, base_url=REAL_BASE_URL):
+    """Enregistre les pages réelles `paths` dans le dossier des fixtures (nécessite un accès réseau)."""
+    import httpx
+
+    from browser import USER_AGENT
+
+    with httpx.Client(headers={'User-Agent': USER_AGENT}, follow_redirects=True, timeout=30) as client:
+        for path in paths:
+            response = client.get(base_url + path)
+            if response.status_code != 200:
+                print(f"!!! {path} : HTTP {response.status_code}")
+                continue
+            target = Path(fixtures_dir) / path.strip('/')
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(response.content)
+            print(f"-> {path} enregistrée ({len(response.content) / 1000:.0f} Ko)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serveur local imitant formula1.com pour les crawlers.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    parser.add_argument("--fixtures-dir", default=DEFAULT_FIXTURES_DIR)
+    parser.add_argument("--latency-ms", type=float, default=0, help="Latence ajoutée à chaque réponse")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Latence aléatoire supplémentaire (0 à N ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Part des requêtes en erreur 503")
+    parser.add_argument("--padding-kb", type=int, default=DEFAULT_PADDING_KB)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--record", nargs='+', metavar="PATH", help="Enregistre ces pages de formula1.com puis quitte")
+    args = parser.parse_args()
+
+    if args.record:
+        record_fixtures(args.record, args.fixtures_dir)
+    else:
+        site = FixtureSite(args.data_dir, args.fixtures_dir, args.padding_kb)
+        server, base_url = start_server(args.port, site, args.latency_ms, args.jitter_ms, args.error_rate, args.seed)
+        print(f"Serveur F1 local : {base_url} ({len(site.pages)} pages générées)")
+        print(f"Crawlers : F1_BASE_URL={base_url}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            server.shutdown()
@@ -5,21 +5,19 @@ from urllib.parse import urljoin, urlparse
 import time
 import csv
 import os
+import sys
 import traceback
+from functools import partial
+from pathlib import Path
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
-from webdriver_manager.chrome import ChromeDriverManager
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from browser import create_driver
+from crawl_fetch import BASE_URL, HTTP_FETCH_ENABLED, PageFetcher
+from crawl_telemetry import CrawlTelemetry
 
 START_YEAR = 2019
 END_YEAR = 2024
 
-BASE_URL = "https://www.formula1.com"
 RESULTS_BASE_URL = f"{BASE_URL}/en/results.html"
 ALLOWED_DOMAIN = urlparse(BASE_URL).netloc
 OUTPUT_DIR = "f1_results_by_type_simple"
@@ -27,6 +25,8 @@ OUTPUT_DIR = "f1_results_by_type_simple"
 SELENIUM_WAIT_TIMEOUT = 30
 REQUEST_DELAY_SECONDS = 2
 RUN_HEADLESS = True
+# Requête HTTP simple d'abord, navigateur seulement si le tableau n'est pas dans la réponse
+USE_HTTP_FETCH = HTTP_FETCH_ENABLED
 max_requests_per_type = 500 
 
 YEARLY_OVERVIEW_PATTERN = re.compile(r'/en/results\.html/(\d{4})/races\.html$', re.IGNORECASE)
@@ -36,38 +36,6 @@ DEFAULT_WAIT_ELEMENT = "footer"
 OVERVIEW_TABLE_SELECTOR = "table.f1-table.f1-table-with-data"
 DATA_TABLE_SELECTOR = "table.resultsarchive-table, table.f1-table.f1-table-with-data"
 
-SELENIUM_OPTIONS = Options()
-if RUN_HEADLESS:
-    SELENIUM_OPTIONS.add_argument('--headless')
-SELENIUM_OPTIONS.add_argument('--disable-gpu')
-SELENIUM_OPTIONS.add_argument('--no-sandbox')
-SELENIUM_OPTIONS.add_argument('--window-size=1920,1080')
-SELENIUM_OPTIONS.add_argument('--disable-dev-shm-usage')
-SELENIUM_OPTIONS.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36')
-
-def get_rendered_html_selenium(url, wait_for_selector, timeout=SELENIUM_WAIT_TIMEOUT):
-    print(f"Fetching: {url} (Wait: '{wait_for_selector}', Timeout: {timeout}s)")
-    driver = None
-    service = None
-    html_content = None
-    try:
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=SELENIUM_OPTIONS)
-        driver.get(url)
-        WebDriverWait(driver, timeout).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, wait_for_selector))
-        )
-        html_content = driver.page_source
-        print("-> Fetch successful.")
-    except TimeoutException:
-        print(f"!!! TIMEOUT waiting for element '{wait_for_selector}' on {url}")
-    except Exception as e:
-        print(f"!!! ERROR fetching {url}: {type(e).__name__} - {e}")
-    finally:
-        if driver:
-            driver.quit()
-    return html_content
-
 def extract_metadata(soup, url):
     year, race_name, race_id_str, location = "Unknown", "Unknown", "Unknown", "Unknown"
     url_match_result = re.search(r'/en/results\.html/(\d{4})/races/(\d+)/([^/]+)/', url)
@@ -211,7 +179,7 @@ def save_to_csv(data, filename):
         print(f"Successfully saved data to {filename}")
     except Exception as e: print(f"!!! ERROR saving data to CSV {filename}: {e}")
 
-def crawl_single_result_type(years_to_scrape_list, target_suffix, result_type_name, column_mapping, parse_function):
+def crawl_single_result_type(years_to_scrape_list, target_suffix, result_type_name, column_mapping, parse_function, fetcher):
     visited_specific_urls_this_call = set() 
     collected_data_for_this_task = []
     requests_made_this_call = 0
@@ -219,15 +187,15 @@ def crawl_single_result_type(years_to_scrape_list, target_suffix, result_type_na
     for year_to_process in years_to_scrape_list:
         print(f"Processing Year: {year_to_process}")
         overview_url = f"{RESULTS_BASE_URL}/{year_to_process}/races.html"
-        if requests_made_this_call > 0: time.sleep(REQUEST_DELAY_SECONDS)
-        overview_html = get_rendered_html_selenium(overview_url, OVERVIEW_TABLE_SELECTOR)
+        overview_html = fetcher.fetch(overview_url, OVERVIEW_TABLE_SELECTOR, timeout=SELENIUM_WAIT_TIMEOUT)
         requests_made_this_call += 1
         if not overview_html:
             print(f"Failed to get overview page {overview_url}. Skipping for {result_type_name}.")
             continue
-        soup_overview = BeautifulSoup(overview_html, 'html.parser')
+        with fetcher.telemetry.phase(overview_url, 'parse'):
+            soup_overview = BeautifulSoup(overview_html, 'html.parser')
+            content_area = soup_overview.select_one(OVERVIEW_TABLE_SELECTOR)
         discovered_race_targets_for_year = []
-        content_area = soup_overview.select_one(OVERVIEW_TABLE_SELECTOR)
         if content_area:
             links = content_area.find_all('a', href=True)
             for link_tag in links:
@@ -247,16 +215,21 @@ def crawl_single_result_type(years_to_scrape_list, target_suffix, result_type_na
         discovered_race_targets_for_year.sort(key=lambda x: x[0])
         race_count = len(discovered_race_targets_for_year)
         print(f"Found {race_count} races for {year_to_process}, type '{result_type_name}'. Processing in Race ID order.")
-        for i, (race_id_val, specific_url_to_process) in enumerate(discovered_race_targets_for_year):
+        urls_to_process = []
+        for race_id_val, specific_url_to_process in discovered_race_targets_for_year:
             if requests_made_this_call >= max_requests_per_type :
                 print(f"Request limit ({max_requests_per_type}) reached for {result_type_name}. Stopping."); break
             if specific_url_to_process in visited_specific_urls_this_call: continue
-            time.sleep(REQUEST_DELAY_SECONDS)
-            html_specific = get_rendered_html_selenium(specific_url_to_process, DEFAULT_WAIT_ELEMENT)
             requests_made_this_call += 1
             visited_specific_urls_this_call.add(specific_url_to_process)
+            urls_to_process.append(specific_url_to_process)
+        # Pages de résultats : le tableau est en général dans la réponse HTTP ; sinon rendu complet (attente du footer)
+        pages = fetcher.fetch_all(urls_to_process, DATA_TABLE_SELECTOR, wait_for=DEFAULT_WAIT_ELEMENT)
+        for specific_url_to_process, html_specific in zip(urls_to_process, pages):
             if html_specific:
-                parsed_data = parse_function(html_specific, specific_url_to_process, result_type_name, column_mapping) if column_mapping else parse_function(html_specific, specific_url_to_process)
+                with fetcher.telemetry.phase(specific_url_to_process, 'parse'):
+                    parsed_data = parse_function(html_specific, specific_url_to_process, result_type_name, column_mapping) if column_mapping else parse_function(html_specific, specific_url_to_process)
+                fetcher.telemetry.record(specific_url_to_process, rows=len(parsed_data))
                 if parsed_data: collected_data_for_this_task.extend(parsed_data)
     return collected_data_for_this_task
 
@@ -275,17 +248,25 @@ if __name__ == "__main__":
         ("/practice-3.html", 'practice_3', {'position': 0, 'driver_number': 1, 'driver': 2, 'team': 3, 'lap_time': 4, 'gap': 5, 'laps': 6}, parse_results_table),
     ]
     total_rows_collected = 0
-    for year in range(START_YEAR, END_YEAR + 1):
-        print(f"\n{'='*20} Processing Year: {year} {'='*20}"); year_start_time = time.time(); year_rows_collected = 0
-        for suffix, type_name, col_map, parse_func in tasks:
-            task_start_time = time.time()
-            data_for_type = crawl_single_result_type([year], suffix, type_name, col_map, parse_func)
-            output_filename = os.path.join(OUTPUT_DIR, f"f1_{year}_{type_name}.csv"); save_to_csv(data_for_type, output_filename)
-            task_end_time = time.time(); rows_in_task = len(data_for_type)
-            print(f"----- Finished: {type_name} ({year}), Suffix: {suffix} -----")
-            print(f"Collected {rows_in_task} rows. Time: {task_end_time - task_start_time:.2f}s. Saved: {output_filename}\n" + "-"*40)
-            total_rows_collected += rows_in_task; year_rows_collected += rows_in_task
-        year_end_time = time.time()
-        print(f"\n{'='*20} Finished Year: {year} {'='*20}\nRows for {year}: {year_rows_collected}. Time: {year_end_time - year_start_time:.2f}s.")
+    telemetry = CrawlTelemetry("results")
+    try:
+        # Navigateur et client HTTP fermés même en cas d'erreur ou d'interruption
+        with PageFetcher(partial(create_driver, headless=RUN_HEADLESS), use_http=USE_HTTP_FETCH, browser_wait=SELENIUM_WAIT_TIMEOUT,
+                         browser_delay=REQUEST_DELAY_SECONDS, telemetry=telemetry) as fetcher:
+            for year in range(START_YEAR, END_YEAR + 1):
+                print(f"\n{'='*20} Processing Year: {year} {'='*20}"); year_start_time = time.time(); year_rows_collected = 0
+                for suffix, type_name, col_map, parse_func in tasks:
+                    task_start_time = time.time()
+                    data_for_type = crawl_single_result_type([year], suffix, type_name, col_map, parse_func, fetcher)
+                    output_filename = os.path.join(OUTPUT_DIR, f"f1_{year}_{type_name}.csv"); save_to_csv(data_for_type, output_filename)
+                    task_end_time = time.time(); rows_in_task = len(data_for_type)
+                    print(f"----- Finished: {type_name} ({year}), Suffix: {suffix} -----")
+                    print(f"Collected {rows_in_task} rows. Time: {task_end_time - task_start_time:.2f}s. Saved: {output_filename}\n" + "-"*40)
+                    total_rows_collected += rows_in_task; year_rows_collected += rows_in_task
+                year_end_time = time.time()
+                print(f"\n{'='*20} Finished Year: {year} {'='*20}\nRows for {year}: {year_rows_collected}. Time: {year_end_time - year_start_time:.2f}s.")
+        print(f"Pages: {fetcher.summary()}")
+    finally:
+        telemetry.write_report()
     end_run_time = time.time()
     print("\n" + "="*40 + "\nAll Scraping Tasks Finished!\n" + f"Total rows: {total_rows_collected}. Total time: {end_run_time - start_run_time:.2f}s.\nData in: {OUTPUT_DIR}\n" + "="*40)
\ No newline at end of file
@@ -1,4 +1,5 @@
 # merge_all_data.py
+import numpy as np
 import pandas as pd
 from pathlib import Path # Import the Path class
 
@@ -12,68 +13,98 @@ MERGED_P2_PATH = HISTORICAL_DATA_DIR / "practice_2_all_years.csv"
 MERGED_P3_PATH = HISTORICAL_DATA_DIR / "practice_3_all_years.csv"
 MERGED_GRID_PATH = HISTORICAL_DATA_DIR / "starting_grid_all_years.csv"
 
+# Clés de fusion communes
+MERGE_KEYS = ['race_id', 'driver_number']
+
+# Sources jointes aux résultats de course : (nom, chemin, {colonne source: colonne finale}).
+# Seules les clés et les colonnes listées sont lues (usecols). Pour ajouter les pitstops
+# ou les meilleurs tours, il suffit d'ajouter une entrée ici.
+JOIN_SOURCES = [
+    ("starting_grid", MERGED_GRID_PATH, {'position': 'grid'}),
+    ("qualifying", MERGED_QUALI_PATH, {'q1_time': 'q1_time', 'q2_time': 'q2_time', 'q3_time': 'q3_time'}),
+    ("practice_1", MERGED_P1_PATH, {'lap_time': 'fp1_time'}),
+    ("practice_2", MERGED_P2_PATH, {'lap_time': 'fp2_time'}),
+    ("practice_3", MERGED_P3_PATH, {'lap_time': 'fp3_time'}),
+]
+
+def encode_merge_keys(df):
+    """
+    Encode le couple (race_id, driver_number) en un seul entier int64.
+    Les clés invalides (non numériques) sont encodées à -1 et ne matchent jamais.
+    """
+    race_id = pd.to_numeric(df['race_id'], errors='coerce')
+    driver_number = pd.to_numeric(df['driver_number'], errors='coerce')
+    keys = race_id * 1000 + driver_number
+    return keys.fillna(-1).astype(np.int64).to_numpy()
+
+def join_source(base_keys, source_df, columns):
+    """
+    Jointure par hachage d'une source sur les clés de base : on indexe la source
+    (une seule fois) puis on "gather" chaque colonne à la position trouvée.
+    Retourne les colonnes alignées sur la base et un petit rapport des clés non appariées.
+    """
+    source_keys = encode_merge_keys(source_df)
+    valid = source_keys >= 0
+    source_keys = source_keys[valid]
+    # En cas de doublon dans la source, on garde la première ligne (pas de multiplication des lignes)
+    source_keys, first_pos = np.unique(source_keys, return_index=True)
+    rows = np.flatnonzero(valid)[first_pos]
+
+    positions = pd.Index(source_keys).get_indexer(base_keys)
+    matched = positions >= 0
+
+    joined = {}
+    for source_col, target_col in columns.items():
+        values = source_df[source_col].to_numpy()[rows]
+        joined[target_col] = pd.api.extensions.take(values, positions, allow_fill=True)
+
+    report = {
+        'base_unmatched': int((~matched).sum()),
+        'source_unmatched': int((~np.isin(source_keys, base_keys)).sum()),
+        'source_invalid': int((~valid).sum()),
+    }
+    return joined, report
+
 def merge_all_historical_data():
     """
     Charge tous les fichiers CSV historiques par type (race_all_years, etc.)
     et les fusionne en un seul grand DataFrame, sauvegardé en CSV.
     """
     print("--- Lancement de la fusion de toutes les données historiques ---")
-    
+
     try:
-        # --- 1. Charger chaque fichier de données ---
+        # --- 1. Charger la base (résultats de course) ---
         print("Chargement des fichiers CSV de base...")
         races = pd.read_csv(MERGED_RACES_PATH)
-        qualis = pd.read_csv(MERGED_QUALI_PATH)
-        grids = pd.read_csv(MERGED_GRID_PATH)
-        fp1 = pd.read_csv(MERGED_P1_PATH)
-        fp2 = pd.read_csv(MERGED_P2_PATH)
-        fp3 = pd.read_csv(MERGED_P3_PATH)
-        # Vous pouvez charger d'autres fichiers comme les pitstops ici
-
-        # --- 2. Préparer et fusionner les DataFrames ---
+        base_keys = encode_merge_keys(races)
+
+        # --- 2. Jointure multi-sources sur la clé entière partagée ---
         print("Fusion des données en cours...")
+        joined_columns, unmatched_report = {}, {}
+        for name, path, columns in JOIN_SOURCES:
+            source_df = pd.read_csv(path, usecols=MERGE_KEYS + list(columns))
+            joined, report = join_source(base_keys, source_df, columns)
+            joined_columns.update(joined)
+            unmatched_report[name] = report
+            del source_df
+
+        # Une seule matérialisation du DataFrame final
+        merged_df = pd.concat([races, pd.DataFrame(joined_columns, index=races.index)], axis=1)
+
+        print("\nRapport des clés non appariées (race_id, driver_number) :")
+        for name, report in unmatched_report.items():
+            print(f"  - {name:<14} : {report['base_unmatched']} course(s) sans donnée, "
+                  f"{report['source_unmatched']} ligne(s) source sans course, "
+                  f"{report['source_invalid']} clé(s) invalide(s)")
 
-        # Clés de fusion communes
-        merge_keys = ['race_id', 'driver_number']
-        
-        # On part des résultats de course comme base
-        # On s'assure que la colonne 'team' est bien là
-        merged_df = races.copy()
-
-        # Fusionner avec la grille de départ
-        # On ne garde que les colonnes utiles pour éviter les colonnes en double
-        grid_cols_to_merge = ['race_id', 'driver_number', 'position']
-        merged_df = pd.merge(
-            merged_df, 
-            grids[grid_cols_to_merge], 
-            on=merge_keys, 
-            how='left',
-            suffixes=('', '_grid') # Suffixe pour la colonne position
-        )
-        merged_df.rename(columns={'position_grid': 'grid', 'position': 'position'}, inplace=True)
-
-
-        # Fusionner avec les qualifications
-        quali_cols_to_merge = ['race_id', 'driver_number', 'q1_time', 'q2_time', 'q3_time']
-        merged_df = pd.merge(merged_df, qualis[quali_cols_to_merge], on=merge_keys, how='left')
-
-        # Fusionner avec les essais libres, en renommant les colonnes pour les distinguer
-        fp1.rename(columns={'lap_time': 'fp1_time'}, inplace=True)
-        fp2.rename(columns={'lap_time': 'fp2_time'}, inplace=True)
-        fp3.rename(columns={'lap_time': 'fp3_time'}, inplace=True)
-        
-        merged_df = pd.merge(merged_df, fp1[['race_id', 'driver_number', 'fp1_time']], on=merge_keys, how='left')
-        merged_df = pd.merge(merged_df, fp2[['race_id', 'driver_number', 'fp2_time']], on=merge_keys, how='left')
-        merged_df = pd.merge(merged_df, fp3[['race_id', 'driver_number', 'fp3_time']], on=merge_keys, how='left')
-        
         # --- 3. Sauvegarder le grand fichier final ---
         # On le sauvegarde dans le même dossier pour la simplicité
         output_path = HISTORICAL_DATA_DIR / "F1_ALL_DATA_2019_2024.csv"
         merged_df.to_csv(output_path, index=False)
-        
+
         print(f"\n✅ Fusion terminée ! Le jeu de données complet est sauvegardé ici :")
         print(output_path)
-        
+
     except FileNotFoundError as e:
         print(f"\n❌ ERREUR: Fichier non trouvé : {e.filename}")
         print("Veuillez vous assurer que tous vos fichiers CSV mergés (race_all_years.csv, etc.) se trouvent bien dans le dossier défini dans config.py.")
@@ -81,4 +112,4 @@ def merge_all_historical_data():
         print(f"\n❌ Une erreur inattendue est survenue : {e}")
 
 if __name__ == "__main__":
-    merge_all_historical_data()
\ No newline at end of file
+    merge_all_historical_data()
@@ -2,82 +2,217 @@ import pandas as pd
 import glob
 import os
 import re
+import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 
-def group_yearly_files(input_dir="f1_results_by_type_simple", output_dir="f1_summary_files"):
+MANIFEST_FILENAME = "_manifest.json"
+YEARLY_FILE_PATTERN = re.compile(r'f1_(\d{4})_(.+)\.csv')
+# Année de la page crawlée, donc du fichier annuel d'origine (la colonne 'year' peut être erronée)
+URL_YEAR_PATTERN = re.compile(r'/results\.html/(\d{4})/')
+
+def file_fingerprint(path, previous=None):
+    """
+    Empreinte d'un fichier d'entrée (mtime, taille, sha256).
+    Si mtime et taille n'ont pas bougé, on réutilise le hash précédent sans relire le fichier.
+    """
+    stat = os.stat(path)
+    if previous and previous.get('mtime') == stat.st_mtime and previous.get('size') == stat.st_size:
+        return previous
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha.update(chunk)
+    return {'mtime': stat.st_mtime, 'size': stat.st_size, 'sha256': sha.hexdigest()}
+
+def load_manifest(output_dir):
+    """Charge le manifeste des fichiers déjà regroupés (vide si absent ou illisible)."""
+    path = os.path.join(output_dir, MANIFEST_FILENAME)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def save_manifest(output_dir, manifest):
+    """Écrit le manifeste de façon atomique (fichier temporaire puis renommage)."""
+    path = os.path.join(output_dir, MANIFEST_FILENAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def source_years(df):
+    """
+    Année du fichier annuel d'origine de chaque ligne, tirée de l'URL.
+    Retourne None si une ligne n'a pas d'URL exploitable.
+    """
+    if 'url' not in df.columns:
+        return None
+    years = df['url'].astype(str).str.extract(URL_YEAR_PATTERN, expand=False)
+    if years.isna().any():
+        return None
+    return years.astype(int)
+
+def read_yearly_files(files_by_year, log):
+    """
+    Lit les fichiers annuels donnés. Retourne un dict {année: DataFrame} trié par année
+    et la liste des années dont le fichier n'a pas pu être lu.
+    """
+    dfs_by_year, failed_years = {}, []
+    for year in sorted(files_by_year):
+        f = files_by_year[year]
+        try:
+            dfs_by_year[year] = pd.read_csv(f)
+        except pd.errors.EmptyDataError:
+            log.append(f"    - Avertissement : Le fichier '{os.path.basename(f)}' est vide et a été ignoré.")
+        except Exception as e:
+            log.append(f"    - Erreur lors de la lecture de '{os.path.basename(f)}': {e}")
+            failed_years.append(year)
+    return dfs_by_year, failed_years
+
+def process_data_type(data_type, files_by_year, previous_entries, output_dir):
+    """
+    Met à jour le fichier de synthèse d'un type de donnée.
+    Seules les années dont le fichier a changé sont relues : une nouvelle année est
+    ajoutée en fin de fichier, une année modifiée remplace son bloc, et un fichier
+    supprimé entraîne une reconstruction complète.
+    Retourne (type, entrées du manifeste, lignes de log).
+    """
+    log = ["-" * 50, f"Traitement du type de donnée : '{data_type}'"]
+    output_filename = os.path.join(output_dir, f"{data_type}_all_years.csv")
+
+    entries = {
+        os.path.basename(f): file_fingerprint(f, previous_entries.get(os.path.basename(f)))
+        for f in files_by_year.values()
+    }
+    changed_years = sorted(
+        year for year, f in files_by_year.items()
+        if previous_entries.get(os.path.basename(f), {}).get('sha256') != entries[os.path.basename(f)]['sha256']
+    )
+    removed_files = set(previous_entries) - set(entries)
+
+    if not changed_years and not removed_files and os.path.exists(output_filename):
+        log.append("  - Aucun changement détecté. Fichier de synthèse conservé.")
+        return data_type, entries, log
+
+    full_rebuild = bool(removed_files) or not previous_entries or not os.path.exists(output_filename)
+    existing_df, existing_years = None, None
+    if not full_rebuild:
+        try:
+            existing_df = pd.read_csv(output_filename)
+            existing_years = source_years(existing_df)
+            # Les blocs sont repérés par l'année de l'URL : elle doit correspondre aux fichiers d'entrée
+            full_rebuild = existing_years is None or not set(existing_years) <= set(files_by_year)
+        except Exception:
+            full_rebuild = True
+
+    if full_rebuild:
+        log.append(f"  - Reconstruction complète : {len(files_by_year)} fichier(s) à regrouper.")
+        dfs_by_year, failed_years = read_yearly_files(files_by_year, log)
+        # Fichier illisible : absent du manifeste, pour être relu au prochain passage
+        for year in failed_years:
+            entries.pop(os.path.basename(files_by_year[year]))
+        if not dfs_by_year:
+            log.append("  - Aucun DataFrame valide n'a pu être chargé. Passage au suivant.")
+            return data_type, previous_entries, log
+        combined_df = pd.concat(dfs_by_year.values(), ignore_index=True)
+        mode = 'w'
+    else:
+        log.append(f"  - Année(s) modifiée(s) : {', '.join(map(str, changed_years))}")
+        new_dfs, failed_years = read_yearly_files({y: files_by_year[y] for y in changed_years}, log)
+        # Fichier illisible : l'ancien bloc et l'ancienne empreinte sont conservés (relu au prochain passage)
+        for year in failed_years:
+            name = os.path.basename(files_by_year[year])
+            if name in previous_entries:
+                entries[name] = previous_entries[name]
+            else:
+                entries.pop(name)
+        replaced_years = [year for year in changed_years if year not in failed_years]
+        if not replaced_years:
+            log.append("  - Aucune année modifiée n'a pu être lue. Fichier de synthèse conservé.")
+            return data_type, entries, log
+        new_df = pd.concat(new_dfs.values(), ignore_index=True) if new_dfs else pd.DataFrame(columns=existing_df.columns)
+        only_appends = (
+            min(replaced_years) > existing_years.max()
+            and list(new_df.columns) == list(existing_df.columns)
+        )
+        if only_appends:
+            # Cas le plus courant : une nouvelle saison, on ajoute simplement le bloc en fin de fichier
+            combined_df = new_df
+            mode = 'a'
+        else:
+            # Un bloc par fichier annuel, dans l'ordre des années ; les années modifiées sont remplacées
+            blocks = {
+                year: block for year, block in existing_df.groupby(existing_years, sort=False)
+                if year not in replaced_years
+            }
+            blocks.update(new_dfs)
+            if blocks:
+                combined_df = pd.concat([blocks[year] for year in sorted(blocks)], ignore_index=True)
+            else:
+                combined_df = existing_df.iloc[0:0]
+            mode = 'w'
+
+    try:
+        combined_df.to_csv(output_filename, index=False, encoding='utf-8', mode=mode, header=(mode == 'w'))
+        action = "ajoutées à" if mode == 'a' else "sauvegardées dans"
+        log.append(f"  - {len(combined_df)} lignes {action} '{output_filename}'")
+    except Exception as e:
+        log.append(f"  - Erreur lors de la sauvegarde du fichier '{output_filename}': {e}")
+        return data_type, previous_entries, log
+
+    return data_type, entries, log
+
+def group_yearly_files(input_dir="f1_results_by_type_simple", output_dir="f1_summary_files", max_workers=None):
     """
-    Regroupe tous les fichiers CSV annuels pour chaque type de donnée en un seul 
+    Regroupe tous les fichiers CSV annuels pour chaque type de donnée en un seul
     fichier de synthèse par type.
 
     Par exemple:
     - f1_2020_race.csv, f1_2021_race.csv -> race_all_years.csv
     - f1_2020_pit_stop.csv, f1_2021_pit_stop.csv -> pit_stop_all_years.csv
+
+    Un manifeste (mtime, taille, sha256 de chaque fichier d'entrée) est conservé dans
+    le répertoire de sortie : seuls les types dont les entrées ont changé sont
+    retraités, en parallèle.
     """
     print(f"Lancement du regroupement des fichiers du répertoire '{input_dir}'...")
-    
+
     # S'assurer que le répertoire de sortie existe
     os.makedirs(output_dir, exist_ok=True)
     print(f"Les fichiers de synthèse seront sauvegardés dans '{output_dir}'.")
 
-    # 1. Trouver tous les fichiers CSV dans le répertoire d'entrée
+    # 1. Trouver tous les fichiers CSV dans le répertoire d'entrée (un seul parcours)
     all_files = glob.glob(os.path.join(input_dir, "f1_*.csv"))
 
     if not all_files:
         print("Aucun fichier CSV trouvé. Veuillez vérifier le répertoire d'entrée.")
         return
 
-    # 2. Identifier tous les types de données uniques (race, qualifying, etc.)
-    data_types = set()
+    # 2. Regrouper les fichiers par type de donnée (race, qualifying, etc.) puis par année
+    files_by_type = {}
     for f in all_files:
-        filename = os.path.basename(f)
-        match = re.search(r'f1_\d{4}_(.+)\.csv', filename)
+        match = YEARLY_FILE_PATTERN.fullmatch(os.path.basename(f))
         if match:
-            data_types.add(match.group(1))
-
-    print(f"\nTypes de données trouvés : {', '.join(sorted(list(data_types)))}")
-
-    # 3. Traiter chaque type de donnée
-    for data_type in sorted(list(data_types)):
-        print("-" * 50)
-        print(f"Traitement du type de donnée : '{data_type}'")
-
-        # Trouver tous les fichiers correspondant à ce type de donnée pour toutes les années
-        type_specific_files = glob.glob(os.path.join(input_dir, f"f1_*_{data_type}.csv"))
-        
-        if not type_specific_files:
-            print("  - Aucun fichier trouvé pour ce type. Passage au suivant.")
-            continue
-            
-        print(f"  - {len(type_specific_files)} fichier(s) trouvé(s) à regrouper.")
-
-        # Liste pour stocker les DataFrames de chaque année
-        list_of_dfs = []
-        for f in sorted(type_specific_files):
-            try:
-                df = pd.read_csv(f)
-                list_of_dfs.append(df)
-            except pd.errors.EmptyDataError:
-                print(f"    - Avertissement : Le fichier '{os.path.basename(f)}' est vide et a été ignoré.")
-            except Exception as e:
-                print(f"    - Erreur lors de la lecture de '{os.path.basename(f)}': {e}")
-        
-        if not list_of_dfs:
-            print("  - Aucun DataFrame valide n'a pu être chargé. Passage au suivant.")
-            continue
-
-        # Concaténer tous les DataFrames en un seul
-        combined_df = pd.concat(list_of_dfs, ignore_index=True)
-        print(f"  - Toutes les années ont été combinées. Total de {len(combined_df)} lignes.")
-
-        # Définir le nom du fichier de sortie
-        output_filename = os.path.join(output_dir, f"{data_type}_all_years.csv")
-
-        # Sauvegarder le DataFrame combiné
-        try:
-            combined_df.to_csv(output_filename, index=False, encoding='utf-8')
-            print(f"  - Fichier de synthèse sauvegardé avec succès : '{output_filename}'")
-        except Exception as e:
-            print(f"  - Erreur lors de la sauvegarde du fichier '{output_filename}': {e}")
-            
+            year, data_type = int(match.group(1)), match.group(2)
+            files_by_type.setdefault(data_type, {})[year] = f
+
+    print(f"\nTypes de données trouvés : {', '.join(sorted(files_by_type))}")
+
+    # 3. Traiter chaque type de donnée en parallèle
+    manifest = load_manifest(output_dir)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(process_data_type, data_type, files_by_type[data_type], manifest.get(data_type, {}), output_dir)
+            for data_type in sorted(files_by_type)
+        ]
+        for future in futures:
+            data_type, entries, log = future.result()
+            print("\n".join(log))
+            manifest[data_type] = entries
+
+    save_manifest(output_dir, manifest)
     print("-" * 50)
     print("\nRegroupement terminé.")
 
@@ -85,9 +220,8 @@ def group_yearly_files(input_dir="f1_results_by_type_simple", output_dir="f1_sum
 if __name__ == "__main__":
     # Le répertoire où se trouvent vos fichiers CSV par année
     INPUT_DIRECTORY = "f1_results_by_type_simple"
-    
+
     # Le répertoire où les nouveaux fichiers de synthèse seront créés
     OUTPUT_DIRECTORY = "f1_summary_files"
-    
-    group_yearly_files(input_dir=INPUT_DIRECTORY, output_dir=OUTPUT_DIRECTORY)
 
+    group_yearly_files(input_dir=INPUT_DIRECTORY, output_dir=OUTPUT_DIRECTORY)
@@ -6,64 +6,38 @@
 import time
 import csv
 import os
+import sys
 import traceback
+from pathlib import Path
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 
-# --- Importations de Selenium Standard ---
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.common.exceptions import TimeoutException
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.by import By
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from crawl_fetch import BASE_URL, HTTP_FETCH_ENABLED, PageFetcher
+from crawl_telemetry import CrawlTelemetry
 
 
 # --- CONFIGURATION & CONSTANTES ---
-BASE_URL = "https://www.formula1.com"
 DRIVERS_PAGE_URL = f"{BASE_URL}/en/drivers.html"
 OUTPUT_DIR = "f1_driver_data"
 OUTPUT_FILENAME = os.path.join(OUTPUT_DIR, "f1_drivers_all.csv")
 WAIT_SECONDS = 15 # Temps d'attente pour le chargement initial de la page
+# Requête HTTP simple d'abord, navigateur seulement si l'élément attendu n'est pas dans la réponse
+USE_HTTP_FETCH = HTTP_FETCH_ENABLED
 
 # --- FONCTIONS UTILITAIRES ---
 
-def setup_driver():
-    """Configure et retourne une instance de Selenium standard."""
-    print("Initialisation du navigateur Selenium standard...")
-    options = Options()
-    options.add_argument('--headless')
-    options.add_argument('--no-sandbox')
-    options.add_argument('--disable-gpu')
-    options.add_argument('--disable-dev-shm-usage')
-    options.add_argument('--window-size=1920,1080')
-    options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36')
-    
-    try:
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=options)
-        return driver
-    except Exception as e:
-        print(f"!!! Erreur lors de l'initialisation du driver : {e}")
-        return None
-
-def get_driver_urls(driver, overview_url):
-    """Navigue vers la page principale et extrait les URLs des pages de détail des pilotes."""
+def get_driver_urls(fetcher, overview_url):
+    """Récupère la page principale et extrait les URLs des pages de détail des pilotes."""
     print(f"Navigation vers : {overview_url}")
     try:
-        driver.get(overview_url)
-        print(f"Attente de {WAIT_SECONDS} secondes pour le chargement...")
-        # NOTE : Une attente explicite est souvent nécessaire pour les pages complexes
-        WebDriverWait(driver, WAIT_SECONDS).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, 'a[href*="/en/drivers/"]'))
-        )
-        
-        html_content = driver.page_source
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        links = soup.select('a[href*="/en/drivers/"]')
+        html_content = fetcher.fetch(overview_url, 'a[href*="/en/drivers/"]', timeout=WAIT_SECONDS)
+        if not html_content:
+            print("!!! Le contenu de la page des pilotes n'a pas pu être récupéré.")
+            return []
+        with fetcher.telemetry.phase(overview_url, 'parse'):
+            soup = BeautifulSoup(html_content, 'html.parser')
+            links = soup.select('a[href*="/en/drivers/"]')
         if not links:
             print("!!! Aucun lien de pilote trouvé.")
             return []
@@ -78,9 +52,6 @@ def get_driver_urls(driver, overview_url):
         urls = sorted(list(unique_urls))
         print(f"-> {len(urls)} URLs de pilotes uniques trouvées.")
         return urls
-    except TimeoutException:
-        print("!!! TIMEOUT: Le contenu de la page des pilotes n'a pas chargé à temps.")
-        return []
     except Exception as e:
         print(f"!!! Une erreur est survenue lors de la récupération des URLs : {type(e).__name__} - {e}")
         return []
@@ -137,30 +108,31 @@ def save_to_csv(data, filename):
     print(f"-> Données sauvegardées avec succès.")
 
 # --- FONCTION PRINCIPALE (ORCHESTRATEUR) ---
-def run_pilots_crawler():
+def run_pilots_crawler(telemetry):
     """Orchestre le processus complet de scraping des pilotes."""
-    driver = setup_driver()
-    if not driver:
-        return
-
-    try:
-        urls_to_scrape = get_driver_urls(driver, DRIVERS_PAGE_URL)
+    # Le navigateur n'est lancé qu'au premier besoin (page rendue côté client)
+    with PageFetcher(use_http=USE_HTTP_FETCH, browser_wait=10, browser_delay=0,
+                     telemetry=telemetry) as fetcher:
+        urls_to_scrape = get_driver_urls(fetcher, DRIVERS_PAGE_URL)
         
         if not urls_to_scrape:
             print("Aucune URL à scraper. Arrêt du script.")
             return
 
         all_data = []
-        for url in urls_to_scrape:
+        pages = fetcher.fetch_all(urls_to_scrape, "h1.f1-heading__body")
+        for url, html in zip(urls_to_scrape, pages):
             print(f"--- Traitement de : {url}")
+            if not html:
+                print(f"!!! Page indisponible : {url}")
+                continue
             try:
-                driver.get(url)
-                WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, "h1.f1-heading__body")))
-                html = driver.page_source
-                parsed_data = parse_driver_page(html, url)
+                with fetcher.telemetry.phase(url, 'parse'):
+                    parsed_data = parse_driver_page(html, url)
                 
                 if parsed_data and parsed_data.get('full_name', 'N/A') != 'N/A':
                     all_data.append(parsed_data)
+                    fetcher.telemetry.record(url, rows=1)
                     print(f"-> Données extraites pour {parsed_data['full_name']}")
                 else:
                     print(f"-> Nom du pilote non trouvé, données ignorées.")
@@ -168,11 +140,7 @@ def run_pilots_crawler():
                 print(f"!!! Erreur lors du scraping de la page {url}: {e}")
 
         save_to_csv(all_data, OUTPUT_FILENAME)
-
-    finally:
-        if driver:
-            driver.quit()
-            print("\nNavigateur fermé.")
+        print(f"Pages : {fetcher.summary()}")
 
 # --- POINT D'ENTRÉE DU SCRIPT ---
 if __name__ == "__main__":
@@ -181,7 +149,9 @@ if __name__ == "__main__":
     print("="*40)
     start_time = time.time()
     
-    run_pilots_crawler()
+    telemetry = CrawlTelemetry("drivers")
+    run_pilots_crawler(telemetry)
+    telemetry.write_report()
     
     end_time = time.time()
     print("\n" + "="*40)